@@ -20,7 +20,11 @@ from webargs import falconparser
 from mcod import settings
 from mcod.core.api import middlewares
 from mcod.core.api.apm import get_client, get_data_from_request
-from mcod.core.api.converters import ExportFormatConverter, RDFFormatConverter
+from mcod.core.api.converters import (
+    DataExportFormatConverter,
+    ExportFormatConverter,
+    RDFFormatConverter,
+)
 from mcod.core.api.health_check import start_health_monitoring
 from mcod.core.api.media import ExportHandler, RDFHandler, SparqlHandler, XMLHandler, ZipHandler
 from mcod.core.api.middleware_loader import middleware_loader
@@ -131,6 +135,7 @@ def get_api_app(middleware: Optional[list] = None):
 
     app.router_options.converters["export_format"] = ExportFormatConverter
     app.router_options.converters["rdf_format"] = RDFFormatConverter
+    app.router_options.converters["data_export_format"] = DataExportFormatConverter
     app.add_error_handler(Exception, error_500_handler)
     app.add_error_handler(falcon.HTTPError, error_handler)
     app.add_error_handler(falcon.HTTPNotFound, error_404_handler)
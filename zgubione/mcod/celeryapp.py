@@ -60,6 +60,32 @@ def get_beat_schedule(
             "options": default_options,
             "schedule": 120,
         },
+        "update_daily_stats": {
+            "task": "mcod.counters.tasks.update_daily_stats",
+            "options": default_options,
+            "schedule": settings.DAILY_STATS_UPDATE_INTERVAL,
+        },
+        "rebuild_daily_stats": {
+            "task": "mcod.counters.tasks.update_daily_stats",
+            "kwargs": {"full": True},
+            "options": default_options,
+            "schedule": crontab(minute=0, hour=1),
+        },
+        "update_resources_availability": {
+            "task": "mcod.histories.tasks.update_resources_availability_task",
+            "options": default_options,
+            "schedule": crontab(minute=30, hour=1),
+        },
+        "flush_search_update_queue": {
+            "task": "mcod.core.api.search.tasks.flush_update_queue_task",
+            "options": {"queue": "indexing"},
+            "schedule": settings.ELASTICSEARCH_UPDATE_QUEUE_FLUSH_INTERVAL,
+        },
+        "flush_graph_update_queue": {
+            "task": "mcod.core.api.rdf.tasks.flush_graph_update_queue_task",
+            "options": {"queue": "graphs"},
+            "schedule": settings.SPARQL_UPDATE_QUEUE_FLUSH_INTERVAL,
+        },
         "save_searchhistories_task": {
             "task": "mcod.searchhistories.tasks.save_searchhistories_task",
             "options": default_options,
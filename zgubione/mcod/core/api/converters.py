@@ -1,6 +1,10 @@
 from falcon.routing import BaseConverter
 
-from mcod.settings import EXPORT_FORMAT_TO_MIMETYPE, RDF_FORMAT_TO_MIMETYPE
+from mcod.settings import (
+    EXPORT_FORMAT_TO_MIMETYPE,
+    RDF_FORMAT_TO_MIMETYPE,
+    RESOURCE_DATA_EXPORT_FORMAT_TO_MIMETYPE,
+)
 
 
 class ExportFormatConverter(BaseConverter):
@@ -11,3 +15,8 @@ class ExportFormatConverter(BaseConverter):
 class RDFFormatConverter(BaseConverter):
     def convert(self, value):
         return value if value in list(RDF_FORMAT_TO_MIMETYPE.keys()) else None
+
+
+class DataExportFormatConverter(BaseConverter):
+    def convert(self, value):
+        return value if value in RESOURCE_DATA_EXPORT_FORMAT_TO_MIMETYPE else None
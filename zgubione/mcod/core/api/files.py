@@ -0,0 +1,135 @@
+"""
+Responses with files from the local storage, sent without reading them into memory.
+
+- If `FILE_RESPONSE_X_ACCEL_REDIRECT` is enabled and the file is located in one of
+  `FILE_RESPONSE_X_ACCEL_LOCATIONS`, the response contains only `X-Accel-Redirect` header and the file
+  is sent by nginx (which handles range and conditional requests itself).
+- Otherwise the opened file is set as the response stream, so it's sent by the WSGI server with
+  `wsgi.file_wrapper` (sendfile in gunicorn). Single range requests (Range, If-Range) and conditional
+  requests (If-None-Match, If-Modified-Since) are supported.
+"""
+
+import os
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+import falcon
+
+from mcod import settings
+
+
+class FileRange:
+    """File object limited to `length` bytes from its current position."""
+
+    def __init__(self, file, length):
+        self._file = file
+        self._remaining = length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self):
+        # sendfile in gunicorn starts from the current position and sends Content-Length bytes.
+        return self._file.fileno()
+
+    def close(self):
+        self._file.close()
+
+
+def get_etag(stat):
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def _as_utc(dt):
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def _is_not_modified(request, etag, last_modified):
+    if request.if_none_match:
+        return any(tag == "*" or tag == etag for tag in request.if_none_match)
+    if request.if_modified_since:
+        return last_modified <= _as_utc(request.if_modified_since)
+    return False
+
+
+def _get_range(request, size, etag, last_modified):
+    if not request.range or request.range_unit != "bytes":
+        return None
+    if_range = request.get_header("If-Range")
+    if if_range and if_range.strip('"') != etag and if_range != falcon.dt_to_http(last_modified):
+        # file has changed since the client fetched its part - whole file is sent.
+        return None
+    start, end = request.range
+    if start < 0:
+        start, end = max(size + start, 0), size - 1
+    elif end < 0 or end >= size:
+        end = size - 1
+    if start >= size or start > end:
+        raise falcon.HTTPRangeNotSatisfiable(size)
+    return start, end
+
+
+def _get_x_accel_uri(path):
+    if not settings.FILE_RESPONSE_X_ACCEL_REDIRECT:
+        return None
+    for root, location in settings.FILE_RESPONSE_X_ACCEL_LOCATIONS.items():
+        root = os.path.realpath(root)
+        if os.path.commonpath([root, path]) == root:
+            return location.rstrip("/") + "/" + quote(os.path.relpath(path, root))
+    return None
+
+
+def send_file(request, response, path, filename=None, content_type=None):
+    """
+    Sets the response sending the file located at `path`. Symlink is resolved once, so the file which is
+    replaced during the download (e.g. by rotation of the symlink) is still sent completely.
+
+    Returns True if the beginning of the file is sent (the request should be counted as a download),
+    False otherwise (HEAD request, not modified file, next part of the file).
+    """
+    path = os.path.realpath(path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise falcon.HTTPNotFound
+    if content_type:
+        response.content_type = content_type
+    if filename:
+        response.downloadable_as = filename
+    is_get = request.method == "GET"
+
+    x_accel_uri = _get_x_accel_uri(path)
+    if x_accel_uri:
+        response.set_header("X-Accel-Redirect", x_accel_uri)
+        return is_get and (not request.range or request.range[0] == 0)
+
+    etag = get_etag(stat)
+    last_modified = datetime.fromtimestamp(int(stat.st_mtime), timezone.utc)
+    response.etag = etag
+    response.last_modified = last_modified
+    response.accept_ranges = "bytes"
+    if _is_not_modified(request, etag, last_modified):
+        response.status = falcon.HTTP_304
+        return False
+
+    byte_range = _get_range(request, stat.st_size, etag, last_modified)
+    start, end = byte_range or (0, stat.st_size - 1)
+    length = end - start + 1
+    if byte_range:
+        response.status = falcon.HTTP_206
+        response.content_range = (start, end, stat.st_size)
+    if not is_get:
+        response.content_length = length
+        return False
+
+    file = open(path, "rb")
+    if byte_range:
+        file.seek(start)
+        response.set_stream(FileRange(file, length), length)
+    else:
+        response.set_stream(file, length)
+    return start == 0
@@ -153,6 +153,9 @@ class SearchHdlr(IncludeMixin, BaseHdlr):
         queryset = self.deserializer.get_queryset(self._search_document, cleaned)
         queryset = self._queryset_extra(queryset, *args, **kwargs)
         page, per_page = cleaned.get("page", 1), cleaned.get("per_page", 20)
+        if cleaned.get("after"):
+            # cursor (search_after) pagination - page number is ignored.
+            return queryset.extra(from_=0, size=per_page)
         start = (page - 1) * per_page
         return queryset.extra(from_=start, size=per_page)
 
@@ -0,0 +1,139 @@
+"""
+Batched writes into the Graph Store.
+
+`SparqlBatchWriter` collects triples of many subjects and sends them in few large update requests instead of
+a separate request per instance. Collected subjects are deduplicated (in the replace mode the last added
+version of the subject is written, otherwise triples of the subject are merged) and the request is sent
+whenever the number of collected triples reaches `max_triples`.
+
+Writer is used by the periodic flush of the graph update queue (`flush_graph_update_queue_task`) and by
+the bulk load mode of the `rdf_db` command (`--bulk`), which additionally sends requests from a thread pool.
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from django.db.models import Model
+
+from mcod import settings
+from mcod.core.api.rdf.sparql_graphs import SparqlGraph, get_graph_nodes
+from mcod.lib.rdf.store import get_sparql_store
+
+
+def count_triples(triples: str) -> int:
+    # approximate (a literal may contain the separator) - it's used only to decide when to send a request.
+    return triples.count(" . ")
+
+
+class SparqlBatchWriter:
+    """
+    If `replace` is True, triples of the collected subjects are removed from the store before inserting
+    the new ones (update), otherwise triples are only inserted (bulk load).
+    With `workers` > 1 requests are sent in parallel - their order is not preserved then, so it should be used
+    only when the same subject is not written twice (e.g. bulk load into an empty store).
+    """
+
+    def __init__(self, named_graph=None, replace=True, max_triples=None, workers=1):
+        self.replace = replace
+        self.max_triples = max_triples or settings.SPARQL_BATCH_MAX_TRIPLES
+        self.requests_count = 0
+        self._query_builder = SparqlGraph(named_graph=named_graph)
+        self._nodes = OrderedDict()
+        self._ns = {}
+        self._triples_count = 0
+        self._workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        self._futures = []
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        elif self._executor:
+            for future in self._futures:
+                future.cancel()
+            self._executor.shutdown()
+
+    def add_nodes(self, nodes: Dict[str, str], ns: Optional[dict] = None) -> None:
+        """Adds nodes - dict of subject (n3) -> triples (n3 string), as returned by `get_graph_nodes`."""
+        for subject, triples in nodes.items():
+            if not self.replace:
+                # triples are only inserted, so triples of the subject added from other graphs are kept.
+                previous = self._nodes.get(subject, "")
+                if triples not in previous:
+                    self._nodes[subject] = previous + triples
+                    self._triples_count += count_triples(triples)
+                continue
+            previous = self._nodes.pop(subject, None)
+            if previous is not None:
+                self._triples_count -= count_triples(previous)
+            self._nodes[subject] = triples
+            self._triples_count += count_triples(triples)
+        self._ns.update(ns or {})
+        if self._triples_count >= self.max_triples:
+            self.flush()
+
+    def add_instances(self, graph: SparqlGraph, instances) -> None:
+        """Adds instances serialized by the sparql graph."""
+        if isinstance(instances, Model):
+            instances = [instances]
+        instances = list(instances)
+        if instances:
+            ns, nodes = graph._prepare_query_data(instances)
+            self.add_nodes(nodes, ns)
+
+    def add_object(self, obj) -> None:
+        """Adds object providing `to_rdf_graph` method (the same data as pushed by `SPARQLUpdateStore.add_object`)."""
+        g = obj.to_rdf_graph()
+        self.add_nodes(get_graph_nodes(g, use_qnames=False), {prefix: ns for prefix, ns in g.namespaces()})
+
+    def get_query(self, nodes: Dict[str, str]) -> str:
+        queries = [self._query_builder._get_create_query(nodes)]
+        if self.replace:
+            queries.insert(0, self._query_builder._get_delete_query(nodes))
+        return "; ".join(queries)
+
+    def flush(self) -> None:
+        if not self._nodes:
+            return
+        query, ns = self.get_query(self._nodes), self._ns
+        self._nodes, self._ns, self._triples_count = OrderedDict(), {}, 0
+        self.requests_count += 1
+        if not self._executor:
+            self._send(query, ns)
+            return
+        self._futures.append(self._executor.submit(self._send, query, ns))
+        # limits number of queries waiting in memory, errors are raised as soon as possible.
+        while len(self._futures) > 2 * self._workers:
+            self._futures.pop(0).result()
+
+    def close(self) -> None:
+        """Sends remaining triples and waits for all requests."""
+        self.flush()
+        if self._executor:
+            try:
+                for future in self._futures:
+                    future.result()
+            finally:
+                self._futures = []
+                self._executor.shutdown()
+
+    def _get_store(self):
+        # store is not thread safe (see `SPARQLUpdateStore.query`), so every thread has its own.
+        store = getattr(self._local, "store", None)
+        if store is None:
+            store = self._local.store = get_sparql_store()
+        return store
+
+    def _send(self, query: str, ns: dict) -> None:
+        store = self._get_store()
+        try:
+            store.update(query, initNs=ns)
+        except Exception as e:
+            store.rollback()
+            raise e
@@ -47,16 +47,21 @@ class SparqlGraphRegistry:
     def create(self, instance):
         return self._process_action("create", instance)
 
-    def update_related(self, instance):
-        queries = []
-        ns = {}
+    def iter_related_instances(self, instance):
+        """Yields pairs (related graph, instances of the graph related to the `instance`)."""
         for related_graph_cls in self._get_related_graphs(instance.__class__):
             related_graph = related_graph_cls(named_graph=self._named_graph)
             related_instances = related_graph.get_related_from_instance(instance)
             if related_instances:
-                _q, _ns = related_graph.update(related_instances)
-                queries.append(_q)
-                ns.update(**_ns)
+                yield related_graph, related_instances
+
+    def update_related(self, instance):
+        queries = []
+        ns = {}
+        for related_graph, related_instances in self.iter_related_instances(instance):
+            _q, _ns = related_graph.update(related_instances)
+            queries.append(_q)
+            ns.update(**_ns)
         full_query = "; ".join(queries)
         return full_query, ns
 
@@ -1,5 +1,7 @@
+from mcod import settings
 from mcod.core.api.rdf.registry import registry
 from mcod.core.api.rdf.tasks import (
+    GRAPH_UPDATE_QUEUE_KEY,
     create_graph_task,
     create_graph_with_related_update_task,
     delete_graph_task,
@@ -9,6 +11,7 @@ from mcod.core.api.rdf.tasks import (
     update_graph_with_related_task,
     update_related_graph_task,
 )
+from mcod.core.api.search.update_queue import enqueue_update
 from mcod.core.mixins.signals import SignalLoggerMixin
 from mcod.core.signals import ExtendedSignal
 
@@ -42,8 +45,18 @@ class SparqlSignalProcessor(SignalLoggerMixin):
             "instance_id": instance.id,
         }
 
+    @staticmethod
+    def _use_update_queue():
+        return settings.SPARQL_UPDATE_QUEUE_ENABLED
+
+    def _enqueue_update(self, instance, with_related=False):
+        enqueue_update(**self.get_task_kwargs(instance), with_related=with_related, queue_key=GRAPH_UPDATE_QUEUE_KEY)
+
     def update_graph(self, sender, instance, *args, **kwargs):
         self.debug("Updating graph in rdf db", sender, instance, "update_graph")
+        if self._use_update_queue():
+            self._enqueue_update(instance)
+            return
         update_graph_task.s(**self.get_task_kwargs(instance)).apply_async_on_commit()
 
     def update_related_graph(self, sender, instance, *args, **kwargs):
@@ -63,6 +76,9 @@ class SparqlSignalProcessor(SignalLoggerMixin):
             instance,
             "update_graph_with_related",
         )
+        if self._use_update_queue():
+            self._enqueue_update(instance, with_related=True)
+            return
         update_graph_with_related_task.s(**self.get_task_kwargs(instance)).apply_async_on_commit()
 
     def create_graph(self, sender, instance, *args, **kwargs):
@@ -4,6 +4,25 @@ from rdflib.term import BNode
 from mcod.core.api.rdf.registry import registry
 
 
+def get_graph_nodes(graph, use_qnames=True):
+    """
+    Groups triples of the graph by subject: returns dict of subject (n3) -> triples (n3 string).
+    Triples of blank nodes are attached to the subject referencing them.
+    """
+    all_nodes = {}
+    b_nodes = {}
+    for s, p, o in graph.triples((None, None, None)):
+        _s = s.n3()
+        triple_str = all_nodes.get(_s, "")
+        triple_str += f"{_s} {graph.qname(p) if use_qnames else p.n3()} {o.n3()} . "
+        all_nodes[_s] = triple_str
+        if isinstance(o, BNode):
+            b_nodes[o.n3()] = _s
+    for b_node, b_node_subject in b_nodes.items():
+        all_nodes[b_node_subject] += all_nodes.pop(b_node)
+    return all_nodes
+
+
 class SparqlGraph:
     model = None
     related_models = None
@@ -85,18 +104,7 @@ class SparqlGraph:
         many = not isinstance(instance, Model)
         serialized_data = self.dump(instance, many=many)
         ns = {ns[0]: ns[1] for ns in serialized_data.namespaces()}
-        all_nodes = {}
-        b_nodes = {}
-        for s, p, o in serialized_data.triples((None, None, None)):
-            _s = s.n3()
-            triple_str = all_nodes.get(_s, "")
-            triple_str += f"{_s} {serialized_data.qname(p)} {o.n3()} . "
-            all_nodes[_s] = triple_str
-            if isinstance(o, BNode):
-                b_nodes[o.n3()] = _s
-        for b_node, b_node_subject in b_nodes.items():
-            all_nodes[b_node_subject] += all_nodes.pop(b_node)
-        return ns, all_nodes
+        return ns, get_graph_nodes(serialized_data)
 
     def is_parent_removed(self, instance):
         return self.parent_model and self.parent_fk and getattr(instance, self.parent_fk).is_removed
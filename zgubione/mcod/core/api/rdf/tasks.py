@@ -1,8 +1,17 @@
+from collections import defaultdict
 from logging import getLogger
 
+from django.apps import apps
+from django.db.models import Model
+
+from mcod.core.api.rdf.batch import SparqlBatchWriter
 from mcod.core.api.rdf.registry import registry
+from mcod.core.api.search.update_queue import pop_pending_updates, requeue_updates
+from mcod.core.api.search.utils import get_instances, is_published
 from mcod.core.tasks import extended_shared_task
 
+GRAPH_UPDATE_QUEUE_KEY = "graph-update-queue:{}"
+
 logger = getLogger("rdf_tasks")
 
 
@@ -10,6 +19,50 @@ def is_connection_refused(exc: Exception) -> bool:
     return isinstance(getattr(exc, "reason", None), ConnectionRefusedError)
 
 
+def _collect_graph_instances(pending, instance, with_related):
+    """Adds the instance (and its related instances) to `pending`: graph class -> {pk: instance}."""
+    related = [(graph_cls, [instance]) for graph_cls in registry.get_graph(instance)]
+    if with_related:
+        for related_graph, related_instances in registry.iter_related_instances(instance):
+            if isinstance(related_instances, Model):
+                related_instances = [related_instances]
+            related.append((related_graph.__class__, related_instances))
+    for graph_cls, instances in related:
+        for obj in instances:
+            if is_published(obj):
+                pending[graph_cls][obj.pk] = obj
+
+
+def _flush_graph_updates(to_update, to_update_with_related):
+    pending = defaultdict(dict)  # graph class -> {pk: instance}, so every subject is written once.
+    for with_related, updates in ((False, to_update), (True, to_update_with_related)):
+        for label, ids in updates.items():
+            for instance in get_instances(apps.get_model(label), ids):
+                _collect_graph_instances(pending, instance, with_related)
+
+    with SparqlBatchWriter(named_graph=registry.graph_name) as writer:
+        for graph_cls, instances in pending.items():
+            writer.add_instances(graph_cls(named_graph=registry.graph_name), instances.values())
+    return {graph_cls.__name__: len(instances) for graph_cls, instances in pending.items()}
+
+
+@extended_shared_task
+def flush_graph_update_queue_task():
+    """
+    Updates graphs of instances collected in the graph update queue (see `mcod.core.api.search.update_queue`).
+    Graphs of all pending instances and their related instances are written with few batched requests
+    (see `SparqlBatchWriter`). On error updates are put back to the queue and processed by the next run.
+    """
+    to_update, to_update_with_related = pop_pending_updates(GRAPH_UPDATE_QUEUE_KEY)
+    if not (to_update or to_update_with_related):
+        return {}
+    try:
+        return _flush_graph_updates(to_update, to_update_with_related)
+    except Exception:
+        requeue_updates(to_update, to_update_with_related, GRAPH_UPDATE_QUEUE_KEY)
+        raise
+
+
 @extended_shared_task(
     max_retries=5,
     retry_on_lambda=is_connection_refused,
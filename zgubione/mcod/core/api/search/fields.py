@@ -1,6 +1,8 @@
+import base64
 import collections
 import copy
 import functools
+import json
 import operator
 import re
 from collections import OrderedDict, namedtuple
@@ -809,6 +811,35 @@ class NumberField(ElasticField, fields.Integer):
         return value
 
 
+class SearchAfterField(ElasticField, fields.String):
+    """Cursor of the `search_after` pagination - encoded sort values of the last hit from the previous page."""
+
+    @staticmethod
+    def encode(sort_values):
+        return base64.urlsafe_b64encode(json.dumps(list(sort_values)).encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode(value):
+        try:
+            sort_values = json.loads(base64.urlsafe_b64decode(value.encode("ascii")))
+        except (ValueError, UnicodeError):
+            raise ValidationError("invalid cursor")
+        if not isinstance(sort_values, list) or not sort_values:
+            raise ValidationError("invalid cursor")
+        return sort_values
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        value = super()._deserialize(value, attr, data, **kwargs)
+        self.decode(value)
+        return value
+
+    def _prepare_queryset(self, queryset, data):
+        return queryset.extra(search_after=data) if data else queryset
+
+    def q(self, value):
+        return self.decode(value)
+
+
 class StringField(ElasticField, fields.String):
     """Represents TextField and KeywordField from Elasticsearch,
     https://www.elastic.co/blog/strings-are-dead-long-live-strings
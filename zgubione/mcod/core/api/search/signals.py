@@ -1,6 +1,7 @@
 from django_elasticsearch_dsl.registries import registry
 from django_elasticsearch_dsl.signals import BaseSignalProcessor
 
+from mcod import settings
 from mcod.core.api.search.tasks import (
     delete_document_task,
     delete_related_documents_task,
@@ -9,6 +10,8 @@ from mcod.core.api.search.tasks import (
     update_related_task,
     update_with_related_task,
 )
+from mcod.core.api.search.update_queue import enqueue_update
+from mcod.core.api.search.utils import is_published
 from mcod.core.db.elastic import ProxyDocumentRegistry
 from mcod.core.mixins.signals import SignalLoggerMixin
 from mcod.core.signals import ExtendedSignal
@@ -38,9 +41,16 @@ class AsyncSignalProcessor(SignalLoggerMixin, BaseSignalProcessor):
         remove_document.disconnect(self.remove)
         remove_document_with_related.disconnect(self.remove_with_related)
 
+    @staticmethod
+    def _use_update_queue():
+        return settings.ELASTICSEARCH_UPDATE_QUEUE_ENABLED
+
     def update(self, sender, instance, *args, **kwargs):
         self.debug("Updating document in elasticsearch", sender, instance, "update_document")
         obj_name = self._get_object_name(instance)
+        if self._use_update_queue():
+            enqueue_update(instance._meta.app_label, obj_name, instance.id)
+            return
         update_document_task.s(instance._meta.app_label, obj_name, instance.id).apply_async_on_commit()
 
     def update_related(self, sender, instance, model, pk_set, **kwargs):
@@ -50,6 +60,10 @@ class AsyncSignalProcessor(SignalLoggerMixin, BaseSignalProcessor):
             instance,
             "update_related",
         )
+        if self._use_update_queue():
+            for pk in pk_set:
+                enqueue_update(model._meta.app_label, model._meta.object_name, pk)
+            return
         update_related_task.s(model._meta.app_label, model._meta.object_name, list(pk_set)).apply_async_on_commit()
 
     def update_with_related(self, sender, instance, *args, **kwargs):
@@ -60,6 +74,9 @@ class AsyncSignalProcessor(SignalLoggerMixin, BaseSignalProcessor):
             "update_document_with_related",
         )
         obj_name = self._get_object_name(instance)
+        if self._use_update_queue():
+            enqueue_update(instance._meta.app_label, obj_name, instance.id, with_related=True)
+            return
         update_with_related_task.s(instance._meta.app_label, obj_name, instance.id).apply_async_on_commit()
 
     def remove(self, sender, instance, *args, **kwargs):
@@ -84,11 +101,7 @@ class AsyncSignalProcessor(SignalLoggerMixin, BaseSignalProcessor):
     def handle_updated(self, sender, instance, **kwargs):
         is_indexable = getattr(instance, "is_indexable", False)
         if is_indexable:
-            should_delete = (
-                (hasattr(instance, "is_removed") and instance.is_removed)
-                or (hasattr(instance, "status") and instance.status != "published")
-                or kwargs.get("qs_delete", False)
-            )
+            should_delete = not is_published(instance) or kwargs.get("qs_delete", False)
 
             object_name = self._get_object_name(instance)
             if should_delete:
@@ -100,6 +113,8 @@ class AsyncSignalProcessor(SignalLoggerMixin, BaseSignalProcessor):
                     object_name,
                     instance.id,
                 ).apply_async_on_commit()
+            elif self._use_update_queue():
+                enqueue_update(instance._meta.app_label, object_name, instance.id, with_related=True)
             else:
                 update_with_related_task.s(instance._meta.app_label, object_name, instance.id).apply_async_on_commit()
 
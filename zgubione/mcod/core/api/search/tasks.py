@@ -1,8 +1,13 @@
+from collections import defaultdict
+
 from celery.utils.log import get_task_logger
 from django.apps import apps
+from django_elasticsearch_dsl.apps import DEDConfig
 from django_elasticsearch_dsl.registries import registry
 from elasticsearch.exceptions import TransportError
 
+from mcod.core.api.search.update_queue import pop_pending_updates, requeue_updates
+from mcod.core.api.search.utils import get_instances, is_published
 from mcod.core.db.elastic import ProxyDocumentRegistry
 from mcod.core.tasks import extended_shared_task
 
@@ -27,6 +32,46 @@ def bulk_update_documents(app_label, object_name, ids_list, action="index"):
         doc().update(instances, action=action)
 
 
+def _flush_updates(to_update, to_update_with_related):
+    registry_proxy = ProxyDocumentRegistry(registry)
+    ids_by_label = defaultdict(set)
+    for label, ids in to_update.items():
+        ids_by_label[label].update(ids)
+    for label, ids in to_update_with_related.items():
+        ids_by_label[label].update(ids)
+        for instance in get_instances(apps.get_model(label), ids):
+            for data in registry_proxy.get_data_of_related_instances(instance):
+                ids_by_label["{app_label}.{object_name}".format(**data)].add(str(data["instance_id"]))
+
+    result = {}
+    for label, ids in ids_by_label.items():
+        model = apps.get_model(label)
+        instances = [instance for instance in get_instances(model, ids).iterator() if is_published(instance)]
+        for doc in registry.get_documents((model,)):
+            if not doc.django.ignore_signals:
+                doc().update(instances)
+        result[label] = len(instances)
+    return result
+
+
+@extended_shared_task
+def flush_update_queue_task():
+    """
+    Reindexes instances collected in the update queue (see `mcod.core.api.search.update_queue`).
+    Related instances of the `update_with_related` ones are merged with the rest, so every document
+    is reindexed once, with one bulk call per document type. On error updates are put back to the queue
+    and processed by the next (periodic) run.
+    """
+    if not DEDConfig.autosync_enabled():
+        return {}
+    to_update, to_update_with_related = pop_pending_updates()
+    try:
+        return _flush_updates(to_update, to_update_with_related)
+    except Exception:
+        requeue_updates(to_update, to_update_with_related)
+        raise
+
+
 @extended_shared_task
 def update_document_task(app_label, object_name, instance_id):
     instance = _instance(app_label, object_name, instance_id)
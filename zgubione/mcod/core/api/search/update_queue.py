@@ -0,0 +1,65 @@
+"""
+Debounced queue of Elasticsearch documents updates.
+
+Instead of a separate Celery task for every saved instance, (model, pk) pairs are added to Redis sets - so
+the repeated updates of the same instance are coalesced - and periodically flushed by `flush_update_queue_task`,
+which reindexes pending instances (and their related instances) with one bulk call per document type.
+
+Functions accept the `queue_key` argument, so the same mechanism is used by other stores (e.g. the Graph Store,
+see `mcod.core.api.rdf.tasks.flush_graph_update_queue_task`).
+"""
+
+from collections import defaultdict
+from typing import Dict, Set, Tuple
+
+from django.db import transaction
+from django_redis import get_redis_connection
+
+UPDATE_QUEUE_KEY = "es-update-queue:{}"
+UPDATE = "update"
+UPDATE_WITH_RELATED = "update_with_related"
+
+
+def enqueue_update(
+    app_label: str, object_name: str, instance_id, with_related: bool = False, queue_key: str = UPDATE_QUEUE_KEY
+) -> None:
+    """Adds instance to the queue once the current transaction is committed."""
+    key = queue_key.format(UPDATE_WITH_RELATED if with_related else UPDATE)
+    member = f"{app_label}.{object_name}:{instance_id}"
+    transaction.on_commit(lambda: get_redis_connection().sadd(key, member))
+
+
+def _pop_members(con, key: str) -> Set[str]:
+    pipe = con.pipeline(transaction=True)
+    pipe.smembers(key)
+    pipe.delete(key)
+    members, _ = pipe.execute()
+    return {m.decode("utf-8") if isinstance(m, bytes) else m for m in members}
+
+
+def pop_pending_updates(queue_key: str = UPDATE_QUEUE_KEY) -> Tuple[Dict[str, Set[str]], Dict[str, Set[str]]]:
+    """
+    Atomically takes all pending updates from the queue (updates enqueued in the meantime wait for the next flush).
+    Returns two dicts (model label -> set of ids): instances to update and instances to update with related.
+    """
+    con = get_redis_connection()
+    pending = {}
+    for name in (UPDATE, UPDATE_WITH_RELATED):
+        ids = defaultdict(set)
+        for member in _pop_members(con, queue_key.format(name)):
+            label, instance_id = member.rsplit(":", 1)
+            ids[label].add(instance_id)
+        pending[name] = ids
+    return pending[UPDATE], pending[UPDATE_WITH_RELATED]
+
+
+def requeue_updates(
+    to_update: Dict[str, Set[str]], to_update_with_related: Dict[str, Set[str]], queue_key: str = UPDATE_QUEUE_KEY
+) -> None:
+    """Puts back updates taken from the queue (e.g. when flushing failed)."""
+    pipe = get_redis_connection().pipeline()
+    for name, pending in ((UPDATE, to_update), (UPDATE_WITH_RELATED, to_update_with_related)):
+        members = [f"{label}:{instance_id}" for label, ids in pending.items() for instance_id in ids]
+        if members:
+            pipe.sadd(queue_key.format(name), *members)
+    pipe.execute()
@@ -0,0 +1,16 @@
+def get_instances(model, ids):
+    """Returns instances of the model by ids, including removed ones (`raw` manager, if the model has it)."""
+    manager = model.raw if hasattr(model, "raw") else model.objects
+    return manager.filter(pk__in=ids)
+
+
+def is_published(instance) -> bool:
+    """
+    Returns False for removed instances and instances with status other than published - they are removed
+    from the search index (and from the graph store). Instances of models without status are published.
+    """
+    if getattr(instance, "is_removed", False):
+        return False
+    if not hasattr(instance, "status"):
+        return True
+    return instance.status == instance.STATUS.published
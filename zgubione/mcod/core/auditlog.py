@@ -1,14 +1,33 @@
+"""
+Audit log of registered models.
+
+Updates are diffed against the snapshot of fields held by the model's `tracker` (no query of the previous
+state of the object) - only fields reported as changed by the tracker are compared. Models without a
+tracker of all audited fields (or instances with deferred fields) fall back to fetching the previous state.
+
+Log entries created in a transaction are buffered in order of their creation and saved with one `bulk_create`
+on commit (they are dropped if the transaction - or the savepoint in which they were created - is rolled back).
+"""
+
+import copy
 import json
+import weakref
+from collections import defaultdict
+from functools import partial
 
 from auditlog.diff import get_field_value, get_fields_in_model
 from auditlog.models import LogEntry
 from auditlog.registry import AuditlogModelRegistry
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 from django.db.models import Model
 from django.db.models.signals import post_delete, post_save, pre_save
 from django.utils.encoding import smart_str
+from model_utils.tracker import FieldInstanceTracker
 
 
-def model_instance_diff(old, new):  # noqa: C901
+def model_instance_diff(old, new):
     """
     Custom version of `auditlog.diff.model_instance_diff` - it uses `mcod.core.registries.auditlog` registry.
     """
@@ -17,8 +36,6 @@ def model_instance_diff(old, new):  # noqa: C901
     if not (new is None or isinstance(new, Model)):
         raise TypeError("The supplied new instance is not a valid model instance.")
 
-    diff = {}
-
     if old is not None and new is not None:
         fields = set(old._meta.fields + new._meta.fields)
         model_fields = auditlog.get_model_fields(new._meta.model)
@@ -32,6 +49,10 @@ def model_instance_diff(old, new):  # noqa: C901
         fields = set()
         model_fields = None
 
+    return _get_changes(old, new, _filter_fields(fields, model_fields))
+
+
+def _filter_fields(fields, model_fields):
     # Check if fields must be filtered
     if model_fields and (model_fields["include_fields"] or model_fields["exclude_fields"]) and fields:
         filtered_fields = []
@@ -42,7 +63,11 @@ def model_instance_diff(old, new):  # noqa: C901
         if model_fields["exclude_fields"]:
             filtered_fields = [field for field in filtered_fields if field.name not in model_fields["exclude_fields"]]
         fields = filtered_fields
+    return fields
 
+
+def _get_changes(old, new, fields):
+    diff = {}
     for field in fields:
         old_value = get_field_value(old, field)
         new_value = get_field_value(new, field)
@@ -56,48 +81,152 @@ def model_instance_diff(old, new):  # noqa: C901
     return diff
 
 
+def _get_snapshot(sender, instance):
+    """
+    Returns copy of the instance with previous values of changed audited fields taken from the model's tracker
+    and the list of these fields. None if the tracker can't be used - the instance wasn't loaded from the database,
+    the model has no tracker, or some audited fields aren't tracked (or are deferred).
+    """
+    if instance._state.adding:
+        return None
+    try:
+        tracker = instance.tracker
+    except AttributeError:  # model without tracker or tracker disabled by `disable_modeltracker`.
+        return None
+    if not isinstance(tracker, FieldInstanceTracker) or not hasattr(tracker, "saved_data"):
+        return None
+    fields = _filter_fields(set(sender._meta.fields), auditlog.get_model_fields(sender))
+    if any(field.attname not in tracker.saved_data for field in fields):
+        return None
+
+    changed_fields = [field for field in fields if tracker.has_changed(field.attname)]
+    old = sender.__new__(sender)
+    old.__dict__ = {**instance.__dict__, "_state": copy.copy(instance._state)}
+    old._state.fields_cache = {}
+    for field in changed_fields:
+        setattr(old, field.attname, tracker.previous(field.attname))
+    return old, changed_fields
+
+
+def _save_log_entries(entries):
+    # Delete log entries with the same pk as a newly created model (the same as `LogEntryManager.log_create`),
+    # including entries buffered before.
+    created = {}
+    for i, entry in enumerate(entries):
+        if entry.action == LogEntry.Action.CREATE:
+            created[(entry.content_type_id, entry.object_pk)] = i
+    entries = [entry for i, entry in enumerate(entries) if i >= created.get((entry.content_type_id, entry.object_pk), i)]
+    created_pks = defaultdict(list)
+    for content_type_id, object_pk in created:
+        created_pks[content_type_id].append(object_pk)
+    with transaction.atomic():
+        for content_type_id, object_pks in created_pks.items():
+            LogEntry.objects.filter(content_type_id=content_type_id, object_pk__in=object_pks).delete()
+        LogEntry.objects.bulk_create(entries)
+    for entry in entries:
+        post_save.send(sender=LogEntry, instance=entry, created=True, update_fields=None, raw=False, using=entry._state.db)
+
+
+class LogEntriesBuffer:
+    """
+    Log entries of a transaction, saved in order of their creation on commit. Entries are stored with ids
+    of savepoints in which they were created - each savepoint registers on commit hook, which is dropped
+    if the savepoint is rolled back, so entries of rolled back savepoints are skipped.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.savepoints = set()
+        self.committed_savepoints = set()
+        self.flushed = False
+        self._flush_hook = (set(), self.flush)
+
+    def add(self, connection, entry):
+        savepoint_ids = tuple(connection.savepoint_ids)
+        if savepoint_ids not in self.savepoints:
+            self.savepoints.add(savepoint_ids)
+            transaction.on_commit(partial(self.committed_savepoints.add, savepoint_ids))
+            # flush has to be run after hooks of all savepoints - it's registered out of any savepoint,
+            # so it's dropped only with the whole transaction.
+            if self._flush_hook in connection.run_on_commit:
+                connection.run_on_commit.remove(self._flush_hook)
+            connection.run_on_commit.append(self._flush_hook)
+        self.entries.append((savepoint_ids, entry))
+
+    def flush(self):
+        self.flushed = True
+        entries = [entry for savepoint_ids, entry in self.entries if savepoint_ids in self.committed_savepoints]
+        if entries:
+            _save_log_entries(entries)
+
+
+def _get_buffer(connection):
+    # buffer is referenced only by on commit hooks - it's dropped with them on rollback.
+    ref = connection.__dict__.get("auditlog_buffer")
+    buffer = ref() if ref else None
+    if buffer is None or buffer.flushed:
+        buffer = LogEntriesBuffer()
+        connection.auditlog_buffer = weakref.ref(buffer)
+    return buffer
+
+
+def _add_log_entry(instance, action, changes):
+    pk = LogEntry.objects._get_pk_value(instance)
+    entry = LogEntry(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_pk=str(pk),
+        object_id=pk if isinstance(pk, int) else None,
+        object_repr=smart_str(instance),
+        action=action,
+        changes=json.dumps(changes),
+    )
+    get_additional_data = getattr(instance, "get_additional_data", None)
+    if callable(get_additional_data):
+        entry.additional_data = get_additional_data()
+    # actor of the entry is set by receivers of AuditlogMiddleware while the request is processed.
+    pre_save.send(sender=LogEntry, instance=entry, raw=False, using=None, update_fields=None)
+
+    connection = transaction.get_connection()
+    if not settings.AUDITLOG_BUFFER_ENABLED or not connection.in_atomic_block:
+        _save_log_entries([entry])
+        return
+    _get_buffer(connection).add(connection, entry)
+
+
 def log_create(sender, instance, created, **kwargs):
     """Custom version of original `auditlog.receivers.log_create`."""
     if created:
         changes = model_instance_diff(None, instance)
-        LogEntry.objects.log_create(
-            instance,
-            action=LogEntry.Action.CREATE,
-            changes=json.dumps(changes),
-        )
+        _add_log_entry(instance, LogEntry.Action.CREATE, changes)
 
 
 def log_update(sender, instance, **kwargs):
     """
-    Custom version of original `auditlog.receivers.log_update` but uses `raw` model manager of sender
-    in place of `objects` manager. It's required to log entry if instance's `is_removed=True`.
+    Custom version of original `auditlog.receivers.log_update`. Previous values of fields are taken from
+    the model's tracker, if possible. Otherwise `raw` model manager of sender is used in place of `objects`
+    manager to fetch them. It's required to log entry if instance's `is_removed=True`.
     """
     if instance.pk is not None:
-        try:
-            old = sender.raw.get(pk=instance.pk) if hasattr(sender, "raw") else sender.objects.get(pk=instance.id)
-        except sender.DoesNotExist:
-            pass
-        else:
-            new = instance
-            changes = model_instance_diff(old, new)
+        snapshot = _get_snapshot(sender, instance)
+        if snapshot is not None:
+            old, changed_fields = snapshot
             # Log an entry only if there are changes
-            if changes:
-                LogEntry.objects.log_create(
-                    instance,
-                    action=LogEntry.Action.UPDATE,
-                    changes=json.dumps(changes),
-                )
+            changes = _get_changes(old, instance, changed_fields) if changed_fields else None
+        else:
+            try:
+                old = sender.raw.get(pk=instance.pk) if hasattr(sender, "raw") else sender.objects.get(pk=instance.id)
+            except sender.DoesNotExist:
+                return
+            changes = model_instance_diff(old, instance)
+        if changes:
+            _add_log_entry(instance, LogEntry.Action.UPDATE, changes)
 
 
 def log_delete(sender, instance, **kwargs):
     """Custom version of original `auditlog.receivers.log_delete`."""
     if instance.pk is not None:
         changes = model_instance_diff(instance, None)
-        LogEntry.objects.log_create(
-            instance,
-            action=LogEntry.Action.DELETE,
-            changes=json.dumps(changes),
-        )
+        _add_log_entry(instance, LogEntry.Action.DELETE, changes)
 
 
 auditlog = AuditlogModelRegistry(custom={post_save: log_create, pre_save: log_update, post_delete: log_delete})
@@ -1,7 +1,10 @@
+import copy
 from collections import deque
+from itertools import islice
 
 from django.core.exceptions import ObjectDoesNotExist
 from django.db import models
+from django.db.models import prefetch_related_objects
 from django_elasticsearch_dsl import Document as DESDocument
 from django_elasticsearch_dsl.apps import DEDConfig
 from elasticsearch.helpers import parallel_bulk
@@ -9,7 +12,26 @@ from elasticsearch.helpers import parallel_bulk
 DEFAULT_CHUNK_SIZE = 500
 
 
+def _copy_instance(instance):
+    """Returns shallow copy of the model instance with own caches of relations."""
+    clone = instance.__class__.__new__(instance.__class__)
+    clone.__dict__ = {**instance.__dict__, "_state": copy.copy(instance._state)}
+    clone._state.fields_cache = dict(instance._state.fields_cache)
+    if hasattr(instance, "_prefetched_objects_cache"):
+        clone._prefetched_objects_cache = dict(instance._prefetched_objects_cache)
+    return clone
+
+
 class Document(DESDocument):
+    # relations used by `prepare_*` methods, prefetched for every chunk of indexed instances.
+    prefetch_related_lookups = ()
+    # data of the chunk of instances being prepared, which can't be prefetched into the instances (set in `__init__`,
+    # declared here, so it's not treated as a field of the document).
+    batch_data = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch_data = {}
 
     def get_indexing_queryset(self, **kwargs):
         """
@@ -23,10 +45,35 @@ class Document(DESDocument):
     def get_queryset_count(self):
         return self.get_queryset().count()
 
-    def _get_actions(self, object_list, action):
-        for object_instance in object_list:
-            prepared_action = self._prepare_action(object_instance, action)
-            yield prepared_action
+    def prepare_batch(self, instances):
+        """
+        Prefetches data of the chunk of instances used while they are prepared one by one, with a few queries
+        per chunk instead of a few queries per instance. Prefetch lookups of the document's queryset are applied
+        too, as they are ignored by `QuerySet.iterator()`.
+        """
+        queryset_lookups = self.get_queryset()._prefetch_related_lookups
+        prefetch_related_objects(instances, *queryset_lookups, *self.prefetch_related_lookups)
+
+    def _get_actions(self, object_list, action, batch=True):
+        if not batch or action == "delete":
+            for object_instance in object_list:
+                yield self._prepare_action(object_instance, action)
+            return
+
+        chunk_size = self.django.queryset_pagination or DEFAULT_CHUNK_SIZE
+        object_list = iter(object_list)
+        try:
+            while True:
+                # relations are prefetched into copies, so instances of the caller aren't left with stale caches.
+                chunk = [_copy_instance(instance) for instance in islice(object_list, chunk_size)]
+                if not chunk:
+                    break
+                self.batch_data = {}
+                self.prepare_batch(chunk)
+                for object_instance in chunk:
+                    yield self._prepare_action(object_instance, action)
+        finally:
+            self.batch_data = {}
 
     def parallel_bulk(self, actions, **kwargs):
         if "chunk_size" not in kwargs:
@@ -55,12 +102,11 @@ class Document(DESDocument):
         if refresh is True or (refresh is None and self.django.auto_refresh):
             kwargs["refresh"] = True
 
-        if isinstance(thing, models.Model):
-            object_list = [thing]
-        else:
-            object_list = thing
+        # single instances are usually indexed right after they are saved, so relations are not cached in them.
+        batch = not isinstance(thing, models.Model)
+        object_list = thing if batch else [thing]
 
-        return self._bulk(self._get_actions(object_list, action), parallel=parallel, **kwargs)
+        return self._bulk(self._get_actions(object_list, action, batch=batch), parallel=parallel, **kwargs)
 
     def prepare_id(self, instance):
         return instance.pk
@@ -3,6 +3,7 @@ from django.core.management.base import BaseCommand, CommandError
 from django.db.models import Max
 from django.utils.six.moves import input
 
+from mcod.core.api.rdf.batch import SparqlBatchWriter
 from mcod.lib.rdf.store import get_sparql_store
 
 
@@ -75,6 +76,17 @@ class Command(BaseCommand):
         parser.add_argument("--dataset_ids", type=str, default="")
         parser.add_argument("--resource_ids", type=str, default="")
         parser.add_argument("-f", "--force", dest="force", action="store_true", help="force execution")
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Push objects in batched requests (up to SPARQL_BATCH_MAX_TRIPLES triples each)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of parallel requests in the bulk mode",
+        )
 
     def handle(self, *args, **options):
         if not options["action"]:
@@ -147,20 +159,32 @@ class Command(BaseCommand):
             options["force"] or is_confirmed or boolean_input("Are you sure you want to push data into Graph Store? [y/n]:")
         )
         if is_confirmed:
-            datasets = self._get_objects("datasets.Dataset", options)
-            for obj in datasets:
-                self.stdout.write(f'Push into Graph Store dataset: id {obj.id}, "{obj}"')
-                self.sparql_store.add_object(obj)
-
-            resources = self._get_objects("resources.Resource", options)
-            for obj in resources:
-                self.stdout.write(f'Push into Graph Store resource: id {obj.id}, "{obj}" in RDF database...')
-                self.sparql_store.add_object(obj)
+            if options.get("bulk"):
+                self._bulk_create(options)
+            else:
+                datasets = self._get_objects("datasets.Dataset", options)
+                for obj in datasets:
+                    self.stdout.write(f'Push into Graph Store dataset: id {obj.id}, "{obj}"')
+                    self.sparql_store.add_object(obj)
+
+                resources = self._get_objects("resources.Resource", options)
+                for obj in resources:
+                    self.stdout.write(f'Push into Graph Store resource: id {obj.id}, "{obj}" in RDF database...')
+                    self.sparql_store.add_object(obj)
             if not ("resource_ids" in options or "dataset_ids" in options):
                 self._init_catalog_metadata(options)
         else:
             self.stdout.write("Aborted")
 
+    def _bulk_create(self, options):
+        with SparqlBatchWriter(replace=False, workers=max(options.get("workers") or 1, 1)) as writer:
+            for model_name in ("datasets.Dataset", "resources.Resource"):
+                objects = self._get_objects(model_name, options)
+                self.stdout.write(f"Push into Graph Store {objects.model._meta.verbose_name_plural}: {objects.count()}")
+                for obj in objects.iterator():
+                    writer.add_object(obj)
+        self.stdout.write(f"Objects pushed with {writer.requests_count} requests.")
+
     def _delete(self, options, is_confirmed=False):
         is_confirmed = (
             options["force"] or is_confirmed or boolean_input("Are you sure you want to delete existing Graph Store? [y/n]:")
@@ -154,6 +154,21 @@ def ckan_datasource_imported_resources_not_successful(obj_id):
         Dataset.objects.get(source_id=obj_id)
 
 
+@then(
+    parsers.parse(
+        "last import of datasource with id {obj_id:d} has {datasets_count:d} unchanged datasets"
+        " and {resources_count:d} unchanged resources"
+    )
+)
+def datasource_last_import_unchanged_counts(obj_id, datasets_count, resources_count):
+    source_import = DataSourceImport.objects.filter(datasource_id=obj_id).latest("start")
+    assert source_import.status == "ok"
+    assert source_import.datasets_unchanged_count == datasets_count
+    assert source_import.datasets_updated_count == 0
+    assert source_import.resources_unchanged_count == resources_count
+    assert source_import.resources_updated_count == 0
+
+
 @when(parsers.parse("xml datasource with id {obj_id:d} of version {version} finishes importing objects"))
 @requests_mock.Mocker(kw="mock_request")
 def xml_datasource_finishes_import(
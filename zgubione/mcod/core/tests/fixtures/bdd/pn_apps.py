@@ -7,6 +7,7 @@ from bokeh.document import Document
 from pytest_bdd import given, parsers, then, when
 
 from mcod.core.tests.fixtures.users import create_user_with_params
+from mcod.counters.stats import refresh_stats
 from mcod.pn_apps.stats_app import app
 from mcod.pn_apps.widgets import BootstrapSelectWidget
 
@@ -30,6 +31,7 @@ def create_context_with_user(user, headers=None):
 def create_stats_document_for_user(user_type, params=None):
     created_user = create_user_with_params(user_type, params)
     session_context = create_context_with_user(created_user)
+    refresh_stats()
     doc = Document()
     doc._session_context = MagicMock(return_value=session_context)
     return doc
@@ -74,6 +76,7 @@ def chart_agent_user(ctx, params):
 
 @given(parsers.parse("chart panel of class {chart_cls}"))
 def create_chart_panel(chart_cls, ctx):
+    refresh_stats()
     doc = Document()
     charts_kwargs = {
         "user": ctx["user"],
@@ -15,6 +15,7 @@ from mcod.watchers.factories import (
     SubscriptionFactory,
 )
 from mcod.watchers.models import SubscribedObjectDoesNotExist, SubscriptionCannotBeCreated
+from mcod.watchers.query_evaluation import count_queries
 from mcod.watchers.tasks import update_query_watchers_task
 
 
@@ -172,3 +173,13 @@ def trigger_query_watcher_update(test_api_instance):
 
     with mock.patch("requests.get", get), mock.patch("falcon.testing.client.Result.json", lambda self: json.loads(self.text)):
         update_query_watchers_task()
+
+
+@then(parsers.parse("trigger query watcher update evaluating {queries_count:d} queries without api requests"))
+def trigger_query_watcher_update_in_elasticsearch(queries_count):
+    with mock.patch("requests.get") as get, mock.patch(
+        "mcod.watchers.query_evaluation.count_queries", wraps=count_queries
+    ) as count:
+        update_query_watchers_task()
+    get.assert_not_called()
+    assert len(count.call_args.args[0]) == queries_count
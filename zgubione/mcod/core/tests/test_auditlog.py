@@ -0,0 +1,114 @@
+import json
+
+import pytest
+from auditlog.models import LogEntry
+from django.db import transaction
+from django.test import override_settings
+
+from mcod.tags.factories import TagFactory
+from mcod.tags.models import Tag
+
+
+def get_update_entries(tag):
+    return LogEntry.objects.get_for_object(tag).filter(action=LogEntry.Action.UPDATE).order_by("pk")
+
+
+@pytest.mark.django_db
+def test_update_is_diffed_against_tracker_snapshot(mocker):
+    tag = TagFactory.create(name="old name")
+    get_previous = mocker.spy(Tag.raw, "get")
+
+    tag.name = "new name"
+    tag.save()
+    tag.save()
+
+    get_previous.assert_not_called()
+    (entry,) = get_update_entries(tag)
+    assert json.loads(entry.changes)["name"] == ["old name", "new name"]
+
+
+@pytest.mark.django_db
+def test_update_of_deferred_instance_fetches_previous_state():
+    tag = TagFactory.create(name="old name")
+    tag = Tag.raw.only("id", "name").get(pk=tag.pk)
+
+    tag.name = "new name"
+    tag.save()
+
+    (entry,) = get_update_entries(tag)
+    assert json.loads(entry.changes)["name"] == ["old name", "new name"]
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(AUDITLOG_BUFFER_ENABLED=True)
+def test_log_entries_are_saved_on_commit(mocker):
+    tag = TagFactory.create(name="name")
+    bulk_create = mocker.spy(LogEntry.objects, "bulk_create")
+
+    with transaction.atomic():
+        tag.name = "new name"
+        tag.save()
+        try:
+            with transaction.atomic():
+                tag.name = "rolled back name"
+                tag.save()
+                raise ValueError
+        except ValueError:
+            tag = Tag.raw.get(pk=tag.pk)
+        tag.name = "last name"
+        tag.save()
+        assert not get_update_entries(tag).exists()
+
+    assert bulk_create.call_count == 1
+    changes = [json.loads(entry.changes)["name"] for entry in get_update_entries(tag)]
+    assert changes == [["name", "new name"], ["new name", "last name"]]
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(AUDITLOG_BUFFER_ENABLED=True)
+def test_log_entries_of_nested_savepoints_are_saved_in_order_of_creation():
+    other_tag = TagFactory.create(name="other")
+    with transaction.atomic():
+        other_tag.name = "other name"
+        other_tag.save()
+        with transaction.atomic():
+            tag = TagFactory.create(name="name")
+        tag.name = "new name"
+        tag.save()
+        with transaction.atomic():
+            tag.name = "last name"
+            tag.save()
+        try:
+            with transaction.atomic():
+                tag.name = "rolled back name"
+                tag.save()
+                raise ValueError
+        except ValueError:
+            pass
+
+    assert get_update_entries(other_tag).count() == 1
+    entries = list(LogEntry.objects.get_for_object(tag).order_by("pk"))
+    assert [entry.action for entry in entries] == [LogEntry.Action.CREATE, LogEntry.Action.UPDATE, LogEntry.Action.UPDATE]
+    assert [json.loads(entry.changes)["name"] for entry in entries[1:]] == [["name", "new name"], ["new name", "last name"]]
+    assert [entry.timestamp for entry in entries] == sorted(entry.timestamp for entry in entries)
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(AUDITLOG_BUFFER_ENABLED=True)
+def test_log_entries_of_rolled_back_transaction_are_not_saved():
+    tag = TagFactory.create(name="name")
+
+    try:
+        with transaction.atomic():
+            tag.name = "rolled back name"
+            tag.save()
+            raise ValueError
+    except ValueError:
+        pass
+    with transaction.atomic():
+        tag = Tag.raw.get(pk=tag.pk)
+        tag.name = "new name"
+        tag.save()
+
+    changes = [json.loads(entry.changes)["name"] for entry in get_update_entries(tag)]
+    assert changes == [["name", "new name"]]
@@ -1,7 +1,9 @@
 import pytest
 from elasticsearch_dsl import DateHistogramFacet, RangeFacet, TermsFacet
+from marshmallow import ValidationError
 
 from mcod.core.api.search import constants
+from mcod.core.api.search.fields import SearchAfterField
 from mcod.lib.fields import (
     FacetedFilterField,
     FilteringFilterField,
@@ -708,3 +710,19 @@ class TestHighlightBackend:
 
         qs = fld.prepare_queryset(es_dsl_queryset, context).to_dict()
         assert qs == valid_query
+
+
+class TestSearchAfterField:
+    def test_cursor_encoding(self):
+        cursor = SearchAfterField.encode([1.0, 25])
+        assert SearchAfterField.decode(cursor) == [1.0, 25]
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "e30=", "W10="])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(ValidationError):
+            SearchAfterField.decode(cursor)
+
+    def test_queryset(self, es_dsl_queryset):
+        fld = SearchAfterField()
+        qs = fld._prepare_queryset(es_dsl_queryset, fld.q(SearchAfterField.encode([1.0, 25])))
+        assert qs.to_dict()["search_after"] == [1.0, 25]
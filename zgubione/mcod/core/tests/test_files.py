@@ -0,0 +1,106 @@
+import os
+
+import falcon
+import pytest
+from falcon import testing
+
+from mcod.core.api import files
+from mcod.core.api.files import get_etag, send_file
+
+CONTENT = b"0123456789" * 10
+
+
+@pytest.fixture
+def file_path(tmp_path):
+    path = tmp_path / "katalog.csv"
+    path.write_bytes(CONTENT)
+    return str(path)
+
+
+def _send(path, method="GET", headers=None):
+    request = falcon.Request(testing.create_environ(method=method, headers=headers or {}))
+    response = falcon.Response()
+    is_download = send_file(request, response, path, filename="katalog.csv")
+    return response, is_download
+
+
+def _read(response):
+    data = response.stream.read()
+    response.stream.close()
+    return data
+
+
+def test_send_whole_file(file_path):
+    response, is_download = _send(file_path)
+
+    assert is_download
+    assert response.status == falcon.HTTP_200
+    assert response.content_length == str(len(CONTENT))
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-disposition"].startswith("attachment")
+    assert _read(response) == CONTENT
+
+
+def test_send_range_of_file(file_path):
+    response, is_download = _send(file_path, headers={"Range": "bytes=10-19"})
+
+    assert not is_download
+    assert response.status == falcon.HTTP_206
+    assert response.headers["content-range"] == "bytes 10-19/100"
+    assert response.content_length == "10"
+    assert _read(response) == CONTENT[10:20]
+
+
+def test_send_suffix_range_of_file(file_path):
+    response, _ = _send(file_path, headers={"Range": "bytes=-5"})
+
+    assert response.headers["content-range"] == "bytes 95-99/100"
+    assert _read(response) == CONTENT[-5:]
+
+
+def test_range_is_ignored_if_file_has_changed(file_path):
+    response, is_download = _send(file_path, headers={"Range": "bytes=10-19", "If-Range": '"other"'})
+
+    assert is_download
+    assert response.status == falcon.HTTP_200
+    assert _read(response) == CONTENT
+
+
+def test_unsatisfiable_range(file_path):
+    with pytest.raises(falcon.HTTPRangeNotSatisfiable):
+        _send(file_path, headers={"Range": "bytes=200-300"})
+
+
+def test_not_modified_file(file_path):
+    etag = get_etag(os.stat(file_path))
+    response, is_download = _send(file_path, headers={"If-None-Match": f'"{etag}"'})
+
+    assert not is_download
+    assert response.status == falcon.HTTP_304
+    assert response.stream is None
+
+
+def test_head_request_does_not_open_file(file_path):
+    response, is_download = _send(file_path, method="HEAD")
+
+    assert not is_download
+    assert response.content_length == str(len(CONTENT))
+    assert response.stream is None
+
+
+def test_missing_file(tmp_path):
+    with pytest.raises(falcon.HTTPNotFound):
+        _send(str(tmp_path / "missing.csv"))
+
+
+def test_send_file_by_nginx(file_path, tmp_path, mocker):
+    mocker.patch.object(files.settings, "FILE_RESPONSE_X_ACCEL_REDIRECT", True)
+    mocker.patch.object(files.settings, "FILE_RESPONSE_X_ACCEL_LOCATIONS", {str(tmp_path): "/protected/media/"})
+    symlink_path = str(tmp_path / "katalog link.csv")
+    os.symlink(file_path, symlink_path)
+
+    response, is_download = _send(symlink_path)
+
+    assert is_download
+    assert response.headers["x-accel-redirect"] == "/protected/media/katalog.csv"
+    assert response.stream is None
@@ -0,0 +1,123 @@
+import pytest
+from django_redis import get_redis_connection
+
+from mcod.core.api.rdf import batch, signals as rdf_signals, tasks
+from mcod.core.api.rdf.batch import SparqlBatchWriter
+from mcod.core.api.search.update_queue import (
+    UPDATE,
+    UPDATE_WITH_RELATED,
+    enqueue_update,
+    pop_pending_updates,
+)
+from mcod.core.tests.helpers.tasks import run_on_commit_events
+from mcod.datasets.factories import DatasetFactory
+from mcod.datasets.models import Dataset
+
+QUEUE_KEYS = [tasks.GRAPH_UPDATE_QUEUE_KEY.format(UPDATE), tasks.GRAPH_UPDATE_QUEUE_KEY.format(UPDATE_WITH_RELATED)]
+
+
+@pytest.fixture
+def store(mocker):
+    store = mocker.Mock()
+    mocker.patch.object(batch, "get_sparql_store", return_value=store)
+    return store
+
+
+@pytest.fixture
+def clean_graph_queue():
+    con = get_redis_connection()
+    con.delete(*QUEUE_KEYS)
+    yield
+    con.delete(*QUEUE_KEYS)
+
+
+def test_writer_deduplicates_subjects(store):
+    writer = SparqlBatchWriter(max_triples=100)
+    writer.add_nodes({"<a>": "<a> <p> 1 . ", "<b>": "<b> <p> 1 . "}, {"ex": "http://example.com/"})
+    writer.add_nodes({"<a>": "<a> <p> 2 . <a> <p> 3 . "})
+    writer.close()
+
+    assert writer.requests_count == 1
+    query = store.update.call_args.args[0]
+    assert query == (
+        "DELETE {?s  ?p   ?o . ?o  ?p1  ?o1 .} WHERE { ?s  ?p  ?o . FILTER (?s IN (<b>, <a>)) ."
+        " OPTIONAL {?o  ?p1  ?o1  . FILTER (isBlank(?o)) } }; INSERT DATA { <b> <p> 1 .  <a> <p> 2 . <a> <p> 3 .  }"
+    )
+    assert store.update.call_args.kwargs == {"initNs": {"ex": "http://example.com/"}}
+
+
+def test_insert_only_writer_merges_triples_of_subject(store):
+    with SparqlBatchWriter(replace=False, max_triples=100) as writer:
+        writer.add_nodes({"<a>": "<a> <p> 1 . ", "<b>": "<b> <p> 1 . "})
+        writer.add_nodes({"<a>": "<a> <q> 2 . "})
+        writer.add_nodes({"<a>": "<a> <q> 2 . "})
+        assert writer._triples_count == 3
+
+    assert store.update.call_args.args[0] == "INSERT DATA { <a> <p> 1 . <a> <q> 2 .  <b> <p> 1 .  }"
+
+
+def test_writer_chunks_by_triples_count(store):
+    with SparqlBatchWriter(replace=False, max_triples=2) as writer:
+        for i in range(5):
+            writer.add_nodes({f"<s{i}>": f"<s{i}> <p> {i} . "})
+
+    assert writer.requests_count == 3
+    assert [c.args[0] for c in store.update.call_args_list] == [
+        "INSERT DATA { <s0> <p> 0 .  <s1> <p> 1 .  }",
+        "INSERT DATA { <s2> <p> 2 .  <s3> <p> 3 .  }",
+        "INSERT DATA { <s4> <p> 4 .  }",
+    ]
+
+
+def test_parallel_writer_sends_all_requests(store):
+    with SparqlBatchWriter(replace=False, max_triples=1, workers=3) as writer:
+        for i in range(10):
+            writer.add_nodes({f"<s{i}>": f"<s{i}> <p> {i} . "})
+
+    assert writer.requests_count == 10
+    assert store.update.call_count == 10
+
+
+def test_writer_rollbacks_on_error(store):
+    store.update.side_effect = ValueError("error")
+    writer = SparqlBatchWriter()
+    writer.add_nodes({"<a>": "<a> <p> 1 . "})
+
+    with pytest.raises(ValueError):
+        writer.close()
+    store.rollback.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_flush_graph_updates_puts_back_updates_on_error(clean_graph_queue, mocker):
+    mocker.patch.object(tasks, "_flush_graph_updates", side_effect=ConnectionError)
+    for _ in range(2):
+        enqueue_update("datasets", "Dataset", 1, queue_key=tasks.GRAPH_UPDATE_QUEUE_KEY)
+    enqueue_update("resources", "Resource", 2, with_related=True, queue_key=tasks.GRAPH_UPDATE_QUEUE_KEY)
+    run_on_commit_events()
+
+    with pytest.raises(ConnectionError):
+        tasks.flush_graph_update_queue_task()
+
+    assert pop_pending_updates(tasks.GRAPH_UPDATE_QUEUE_KEY) == (
+        {"datasets.Dataset": {"1"}},
+        {"resources.Resource": {"2"}},
+    )
+
+
+@pytest.mark.django_db
+def test_graph_updates_are_written_in_batch_by_queue_flush(store, clean_graph_queue, mocker):
+    datasets = DatasetFactory.create_batch(2, status="published")
+    run_on_commit_events()
+    store.reset_mock()
+    mocker.patch.object(rdf_signals.settings, "SPARQL_UPDATE_QUEUE_ENABLED", True)
+    update_graph = mocker.patch.object(rdf_signals.update_graph_task, "s")
+    for dataset in datasets * 2:
+        rdf_signals.update_graph.send(sender=Dataset, instance=dataset)
+    run_on_commit_events()
+
+    tasks.flush_graph_update_queue_task()
+
+    update_graph.assert_not_called()
+    assert store.update.call_count == 1
+    assert pop_pending_updates(tasks.GRAPH_UPDATE_QUEUE_KEY) == ({}, {})
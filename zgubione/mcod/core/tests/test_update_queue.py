@@ -0,0 +1,111 @@
+import pytest
+from django_redis import get_redis_connection
+from elasticsearch.exceptions import TransportError
+
+from mcod.core.api.search import signals, tasks
+from mcod.core.api.search.update_queue import (
+    UPDATE,
+    UPDATE_QUEUE_KEY,
+    UPDATE_WITH_RELATED,
+    enqueue_update,
+    pop_pending_updates,
+)
+from mcod.core.api.search.utils import is_published
+from mcod.core.tests.helpers.tasks import run_on_commit_events
+from mcod.counters.models import ResourceDownloadCounter
+from mcod.datasets.factories import DatasetFactory
+from mcod.datasets.models import Dataset
+
+
+@pytest.fixture
+def clean_queue():
+    con = get_redis_connection()
+    con.delete(UPDATE_QUEUE_KEY.format(UPDATE), UPDATE_QUEUE_KEY.format(UPDATE_WITH_RELATED))
+    yield
+    con.delete(UPDATE_QUEUE_KEY.format(UPDATE), UPDATE_QUEUE_KEY.format(UPDATE_WITH_RELATED))
+
+
+@pytest.mark.django_db
+def test_updates_are_coalesced(clean_queue):
+    for _ in range(3):
+        enqueue_update("datasets", "Dataset", 1)
+        enqueue_update("datasets", "Dataset", 2, with_related=True)
+    enqueue_update("resources", "Resource", 1)
+    run_on_commit_events()
+
+    to_update, to_update_with_related = pop_pending_updates()
+    assert to_update == {"datasets.Dataset": {"1"}, "resources.Resource": {"1"}}
+    assert to_update_with_related == {"datasets.Dataset": {"2"}}
+    assert pop_pending_updates() == ({}, {})
+
+
+def test_flush_reindexes_each_document_once(mocker):
+    instance = mocker.Mock(is_removed=False, status="published", STATUS=Dataset.STATUS)
+    removed_instance = mocker.Mock(is_removed=True, status="published", STATUS=Dataset.STATUS)
+    queryset = mocker.MagicMock()
+    queryset.__iter__.return_value = iter([instance])
+    queryset.iterator.return_value = [instance, removed_instance]
+    instances = mocker.patch.object(tasks, "get_instances", return_value=queryset)
+    mocker.patch(
+        "mcod.core.api.search.tasks.ProxyDocumentRegistry.get_data_of_related_instances",
+        return_value=[{"app_label": "datasets", "object_name": "Dataset", "instance_id": 1}],
+    )
+    doc = mocker.Mock()
+    doc.django.ignore_signals = False
+    mocker.patch.object(tasks.registry, "get_documents", return_value=[doc])
+
+    result = tasks._flush_updates({"datasets.Dataset": {"1"}}, {"resources.Resource": {"5"}})
+
+    assert result == {"datasets.Dataset": 1, "resources.Resource": 1}
+    assert doc.return_value.update.call_count == 2
+    doc.return_value.update.assert_called_with([instance])
+    assert {(model._meta.label, frozenset(ids)) for model, ids in (c.args for c in instances.call_args_list)} == {
+        ("resources.Resource", frozenset({"5"})),
+        ("datasets.Dataset", frozenset({"1"})),
+    }
+
+
+@pytest.mark.django_db
+def test_flush_puts_back_updates_on_error(clean_queue, mocker):
+    mocker.patch.object(tasks.DEDConfig, "autosync_enabled", return_value=True)
+    mocker.patch.object(tasks, "_flush_updates", side_effect=TransportError(500, "error"))
+    enqueue_update("datasets", "Dataset", 1, with_related=True)
+    run_on_commit_events()
+
+    with pytest.raises(TransportError):
+        tasks.flush_update_queue_task()
+
+    assert pop_pending_updates() == ({}, {"datasets.Dataset": {"1"}})
+
+
+@pytest.mark.django_db
+def test_saved_instances_are_reindexed_by_queue_flush(clean_queue, mocker):
+    mocker.patch.object(signals.settings, "ELASTICSEARCH_UPDATE_QUEUE_ENABLED", True)
+    mocker.patch.object(tasks.DEDConfig, "autosync_enabled", return_value=True)
+    update_with_related = mocker.patch.object(signals.update_with_related_task, "s")
+    dataset = DatasetFactory.create(status="published")
+    for title in ("title 1", "title 2"):
+        dataset.title = title
+        dataset.save()
+    run_on_commit_events()
+    flush = mocker.patch.object(tasks, "_flush_updates", return_value={})
+
+    tasks.flush_update_queue_task()
+
+    update_with_related.assert_not_called()
+    to_update, to_update_with_related = flush.call_args.args
+    assert to_update_with_related["datasets.Dataset"] == {str(dataset.pk)}
+    assert pop_pending_updates() == ({}, {})
+
+
+@pytest.mark.parametrize(
+    "instance, expected",
+    [
+        (Dataset(status=Dataset.STATUS.published), True),
+        (Dataset(status=Dataset.STATUS.draft), False),
+        (Dataset(status=Dataset.STATUS.published, is_removed=True), False),
+        (ResourceDownloadCounter(), True),
+    ],
+)
+def test_is_published(instance, expected):
+    assert is_published(instance) is expected
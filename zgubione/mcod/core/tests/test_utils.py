@@ -154,6 +154,37 @@ def test_xml_writer(mocker: "MockerFixture"):
     assert output == parseString(expected_output).toprettyxml()
 
 
+def test_csv_writer_in_chunks():
+    data = [{"a": 1, "b": 2}, {"a": 3, "b": 4}, {"a": 5, "b": 6}]
+    writer = CSVWriter(headers=["a", "b"])
+    expected_file = io.StringIO()
+    writer.save(data=data, file_object=expected_file)
+
+    csv_file = io.StringIO()
+    writer.write_header(csv_file)
+    writer.write_chunk(csv_file, data[:2])
+    writer.write_chunk(csv_file, data[2:])
+    writer.write_footer(csv_file)
+
+    assert csv_file.getvalue() == expected_file.getvalue()
+
+
+def test_xml_writer_in_chunks(mocker: "MockerFixture"):
+    mocker.patch.object(XMLWriter, "custom_item_func", side_effect=lambda p: {"catalog": "dataset", "tags": "tag"}.get(p, "item"))
+    data = [{"title": f"title {i}", "tags": ["a", "b"], "notes": ""} for i in range(3)]
+    writer = XMLWriter()
+    expected_file = io.StringIO()
+    writer.save(file_object=expected_file, data=data)
+
+    xml_file = io.StringIO()
+    writer.write_header(xml_file)
+    writer.write_chunk(xml_file, data[:1])
+    writer.write_chunk(xml_file, data[1:])
+    writer.write_footer(xml_file)
+
+    assert xml_file.getvalue() == expected_file.getvalue()
+
+
 _XML_EXC = (ExpatError, XmlTextInvalid, UnicodeEncodeError)
 
 
@@ -396,6 +396,25 @@ class WriterInterface(ABC):
         """
         raise NotImplementedError
 
+    def write_header(self, file_object: Union[StringIO, TextIOWrapper, TextIO]):
+        """Writes beginning of the file saved in chunks (see `write_chunk`)."""
+
+    @abstractmethod
+    def write_chunk(
+        self,
+        file_object: Union[StringIO, TextIOWrapper, TextIO],
+        data: List[dict],
+        language_catalog_path: Optional[str] = None,
+    ):
+        """
+        Writes part of the data, so the file can be written without keeping all the data in memory.
+        Should be preceded by `write_header` and followed by `write_footer`.
+        """
+        raise NotImplementedError
+
+    def write_footer(self, file_object: Union[StringIO, TextIOWrapper, TextIO]):
+        """Writes end of the file saved in chunks (see `write_chunk`)."""
+
 
 class CSVWriter(WriterInterface):
     """
@@ -421,10 +440,22 @@ class CSVWriter(WriterInterface):
         language_catalog_path: Optional[str] = None,
     ):
         """Save data as csv file."""
-        csv_writer = csv.DictWriter(file_object, fieldnames=self.headers, delimiter=self.delimiter)
-        csv_writer.writeheader()
-        for row in data:
-            csv_writer.writerow(row)
+        self.write_header(file_object)
+        self.write_chunk(file_object, data)
+
+    def _get_dict_writer(self, file_object: Union[StringIO, TextIOWrapper]) -> csv.DictWriter:
+        return csv.DictWriter(file_object, fieldnames=self.headers, delimiter=self.delimiter)
+
+    def write_header(self, file_object: Union[StringIO, TextIOWrapper]):
+        self._get_dict_writer(file_object).writeheader()
+
+    def write_chunk(
+        self,
+        file_object: Union[StringIO, TextIOWrapper],
+        data: List[dict],
+        language_catalog_path: Optional[str] = None,
+    ):
+        self._get_dict_writer(file_object).writerows(data)
 
 
 class XMLWriter(WriterInterface):
@@ -464,7 +495,25 @@ class XMLWriter(WriterInterface):
         data: Union[dict, List[dict]],
         language_catalog_path: Optional[str] = None,
     ):
+        file_object.write(self._to_dom(data, language_catalog_path).toprettyxml())
+
+    def write_header(self, file_object: Union[StringIO, TextIOWrapper]):
+        file_object.write('<?xml version="1.0" ?>\n<catalog>\n')
+
+    def write_chunk(
+        self,
+        file_object: Union[StringIO, TextIOWrapper],
+        data: List[dict],
+        language_catalog_path: Optional[str] = None,
+    ):
+        # elements are indented in the same way as by `toprettyxml` in `save`.
+        for node in self._to_dom(data, language_catalog_path).documentElement.childNodes:
+            node.writexml(file_object, indent="\t", addindent="\t", newl="\n")
+
+    def write_footer(self, file_object: Union[StringIO, TextIOWrapper]):
+        file_object.write("</catalog>\n")
 
+    def _to_dom(self, data: Union[dict, List[dict]], language_catalog_path: Optional[str] = None):
         try:
             xml = dicttoxml(
                 data,
@@ -472,8 +521,7 @@ class XMLWriter(WriterInterface):
                 item_func=self.custom_item_func,
                 custom_root="catalog",
             )
-            dom = parseString(xml)
-            file_object.write(dom.toprettyxml())
+            return parseString(xml)
         except (UnicodeError, ExpatError) as exc:
             logger.error(f"XML parsing failed: {exc}")
             if language_catalog_path:
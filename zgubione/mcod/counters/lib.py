@@ -1,47 +1,157 @@
+import atexit
+import collections
 import datetime
+import logging
+import os
+import threading
+import time
 
+from celery.signals import worker_process_shutdown
 from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
 from django.db.models import Sum
 from django.db.transaction import atomic
+from django.utils.functional import cached_property
 from django_elasticsearch_dsl.registries import registry
 from django_redis import get_redis_connection
 from elasticsearch.helpers import bulk as streaming_bulk
 from elasticsearch_dsl.connections import connections
+from redis.exceptions import RedisError, ResponseError
 
 from mcod import settings
 
+logger = logging.getLogger("mcod")
+
 VIEWS_COUNT_PREFIX = "views_count"
 DOWNLOADS_COUNT_PREFIX = "downloads_count"
 
+# increments are kept in hashes (object id -> increment), one per counter and model.
+COUNTER_KEY = "counters:{}:{}"
+SAVE_COUNTERS_LOCK_KEY = "counters:save-lock"
+SAVE_COUNTERS_LOCK_TIMEOUT = 60 * 60
+
+
+def get_counter_key(oper, label):
+    return COUNTER_KEY.format(oper, label)
+
+
+def bulk_increment(model, field_name, increments):
+    """
+    Increments `field_name` of many objects (dict: pk -> increment) with a single
+    `UPDATE ... FROM (VALUES ...)` query, without sending `save` signals.
+    Returns dict: pk -> new value of the field.
+    """
+    if not increments:
+        return {}
+    qn = connection.ops.quote_name
+    field = model._meta.get_field(field_name)
+    table, column, pk = qn(field.model._meta.db_table), qn(field.column), qn(field.model._meta.pk.column)
+    values = ", ".join(["(%s, %s)"] * len(increments))
+    sql = (
+        f"UPDATE {table} AS t SET {column} = t.{column} + v.incr FROM (VALUES {values}) AS v(id, incr)"
+        f" WHERE t.{pk} = v.id RETURNING t.{pk}, t.{column}"
+    )
+    # rows are locked in the same order by concurrent updates.
+    params = [param for item in sorted(increments.items()) for param in item]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return dict(cursor.fetchall())
+
+
+class CounterBuffer:
+    """
+    Increments aggregated in the process and sent to Redis in a single pipeline at most
+    `COUNTERS_BUFFER_FLUSH_INTERVAL` seconds after the first buffered increment.
+    """
+
+    def __init__(self):
+        self._counts = collections.Counter()
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def add(self, oper, label, obj_id, value=1):
+        interval = settings.COUNTERS_BUFFER_FLUSH_INTERVAL
+        with self._lock:
+            self._counts[(oper, label, str(obj_id))] += value
+            if interval and self._timer is None:
+                self._timer = threading.Timer(interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if not interval:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            counts, self._counts = self._counts, collections.Counter()
+            self._timer = None
+        if not counts:
+            return
+        try:
+            pipe = get_redis_connection().pipeline(transaction=False)
+            for (oper, label, obj_id), value in counts.items():
+                pipe.hincrby(get_counter_key(oper, label), obj_id, value)
+            pipe.execute()
+        except RedisError:
+            logger.exception("Counters can't be saved in redis, they will be sent with the next flush.")
+            with self._lock:
+                self._counts.update(counts)
+
+    def reset(self):
+        self._counts, self._lock, self._timer = collections.Counter(), threading.Lock(), None
+
+
+buffer = CounterBuffer()
+# child process (e.g. forked worker) doesn't send increments buffered by its parent.
+os.register_at_fork(after_in_child=buffer.reset)
+# increments buffered when the process exits (before the timer of the flush fires) mustn't be lost.
+atexit.register(buffer.flush)
+
+
+@worker_process_shutdown.connect
+def flush_counter_buffer(**kwargs):
+    # pool processes of celery worker exit by os._exit, without running atexit handlers.
+    buffer.flush()
+
 
 class Counter:
 
     def __init__(self):
-        self.con = get_redis_connection()
         self.date_counter_labels = ["resources.Resource"]
         self.labels_es_actions = {label: [] for label in settings.COUNTED_MODELS}
 
-    def _get_last_save(self, oper):
-        return self.con.get(f"{oper}_last_save") or "0"
-
-    def _clear_counters(self):
-        for oper in (VIEWS_COUNT_PREFIX, DOWNLOADS_COUNT_PREFIX):
-            last_save = self._get_last_save(oper)
-            for label in settings.COUNTED_MODELS:
-                for k in self.con.scan_iter(f"{oper}:{last_save}:{label}:*"):
-                    self.con.delete(k)
+    @cached_property
+    def con(self):
+        return get_redis_connection()
 
     def incr_download_count(self, obj_id):
-        last_save = self._get_last_save(DOWNLOADS_COUNT_PREFIX)
-        key = f"{DOWNLOADS_COUNT_PREFIX}:{last_save}:resources.Resource:{obj_id}"
-        self.con.incr(key)
+        buffer.add(DOWNLOADS_COUNT_PREFIX, "resources.Resource", obj_id)
 
     def incr_view_count(self, label, obj_id):
-        last_save = self._get_last_save(VIEWS_COUNT_PREFIX)
-        key = f"{VIEWS_COUNT_PREFIX}:{last_save}:{label}:{obj_id}"
-        self.con.incr(key)
+        buffer.add(VIEWS_COUNT_PREFIX, label, obj_id)
+
+    def _pop_counts(self, oper, label):
+        """
+        Moves the hash with increments aside (new increments are written to a new hash) and returns
+        keys to remove after the increments are saved and the increments (object id -> increment).
+        Keys not removed by the failed save (and keys in the format used before hashes) are read again.
+        """
+        key = get_counter_key(oper, label)
+        try:
+            self.con.rename(key, f"{key}:{int(time.time() * 1000)}")
+        except ResponseError:  # no increments since the last save.
+            pass
+        counts = collections.Counter()
+        keys = list(self.con.scan_iter(f"{key}:*"))
+        for k in keys:
+            for obj_id, value in self.con.hgetall(k).items():
+                counts[int(obj_id)] += int(value)
+        legacy_keys = list(self.con.scan_iter(f"{oper}:*:{label}:*"))
+        for k, value in zip(legacy_keys, self.con.mget(legacy_keys) if legacy_keys else []):
+            if value is not None:
+                counts[int(k.decode().split(":")[-1])] += int(value)
+        return keys + legacy_keys, counts
 
-    @atomic
     def save_counters(self):
         """
         Tworzy lub uaktualnia liczniki w bazie danych i elasticsearch'u
@@ -49,55 +159,65 @@ class Counter:
 
         Metoda powinna być wołana jako zadanie przez CRON.
         """
+        buffer.flush()
+        lock = self.con.lock(SAVE_COUNTERS_LOCK_KEY, timeout=SAVE_COUNTERS_LOCK_TIMEOUT)
+        if not lock.acquire(blocking=False):
+            logger.info("Counters are being saved by another task, skipping.")
+            return
+        try:
+            processed_keys = self._save_counters()
+            if processed_keys:
+                self.con.delete(*processed_keys)
+        finally:
+            lock.release()
+
+    @atomic
+    def _save_counters(self):
         resource_counter_model = {
             VIEWS_COUNT_PREFIX: apps.get_model("counters.ResourceViewCounter"),
             DOWNLOADS_COUNT_PREFIX: apps.get_model("counters.ResourceDownloadCounter"),
         }
-        datasets_updates = {}
         today = datetime.date.today()
+        processed_keys = []
         for oper in (VIEWS_COUNT_PREFIX, DOWNLOADS_COUNT_PREFIX):
-            last_save = self._get_last_save(oper)
-            self.con.set(f"{oper}_last_save", str(int(datetime.datetime.now().timestamp())))
-
             for label, qs_params in settings.COUNTED_MODELS.items():
+                keys, counts = self._pop_counts(oper, label)
+                processed_keys.extend(keys)
+                if not counts:
+                    continue
                 model = apps.get_model(label)
-                model.is_indexable = False
-                data_key = f"{oper}:{last_save}:{label}:*"
-
                 if label in self.date_counter_labels:
-                    counter_model = resource_counter_model[oper]
-                    self.save_resource_date_counters(oper, counter_model, data_key, label, model, today)
-
-                for k in self.con.scan_iter(data_key):
-                    obj_id = int(k.decode().split(":")[-1])
-                    try:
-                        obj = model.objects.get(pk=obj_id, **qs_params)
-                    except model.DoesNotExist:
-                        self.con.delete(k)
-                        continue
-
-                    incr_val = int(self.con.get(k))
-                    counter = getattr(obj, oper) + incr_val
-                    model.objects.filter(pk=obj_id, **qs_params).update(**{oper: counter})  # w/o send `save` signal.
-                    self.add_es_action(model, obj, oper, counter, incr_val, datasets_updates)
-                    self.con.delete(k)
-
-        self.save_es_actions(datasets_updates)
-
-    def save_resource_date_counters(self, oper, counter_model, data_key, label, model, today):
+                    self.save_resource_date_counters(oper, resource_counter_model[oper], counts, label, model, today)
+                self.save_model_counters(oper, model, qs_params, counts)
+        self.save_es_actions()
+        return processed_keys
+
+    def save_model_counters(self, oper, model, qs_params, counts):
+        queryset = model.objects.filter(pk__in=list(counts), **qs_params)
+        try:
+            model._meta.get_field("dataset")
+            objects = dict(queryset.values_list("pk", "dataset_id"))
+        except FieldDoesNotExist:
+            objects = dict.fromkeys(queryset.values_list("pk", flat=True))
+        new_values = bulk_increment(model, oper, {obj_id: counts[obj_id] for obj_id in objects})
+        for obj_id, value in new_values.items():
+            self.add_es_action(model, obj_id, {oper: value})
+
+        datasets_increments = collections.Counter()
+        for obj_id, dataset_id in objects.items():
+            if dataset_id:
+                datasets_increments[dataset_id] += counts[obj_id]
+        if datasets_increments:
+            dataset_model = apps.get_model("datasets.Dataset")
+            for dataset_id, value in bulk_increment(dataset_model, oper, datasets_increments).items():
+                self.add_es_action(dataset_model, dataset_id, {oper: value})
+
+    def save_resource_date_counters(self, oper, counter_model, counts, label, model, today):
         view = label.split(".")[0]
-        resources_to_update = {}
-        for k in self.con.scan_iter(data_key):
-            count_value = int(self.con.get(k))
-            obj_id = int(k.decode().split(":")[-1])
-            resources_to_update[obj_id] = count_value
-            self.con.delete(k)
         existing_resources_to_update = list(
-            model.objects.filter(pk__in=list(resources_to_update.keys()), status="published").values_list("pk", flat=True)
+            model.objects.filter(pk__in=list(counts.keys()), status="published").values_list("pk", flat=True)
         )
-        pub_resources_to_update = {
-            published_res: resources_to_update[published_res] for published_res in existing_resources_to_update
-        }
+        pub_resources_to_update = {published_res: counts[published_res] for published_res in existing_resources_to_update}
         existing_counters = counter_model.objects.filter(
             resource_id__in=existing_resources_to_update,
             timestamp=today,
@@ -136,68 +256,41 @@ class Counter:
                 }
             )
         for dataset in new_dataset_counts:
-            try:
-                self.labels_es_actions["datasets"].append(
-                    {
-                        "_op_type": "update",
-                        "_index": settings.ELASTICSEARCH_INDEX_NAMES["datasets"],
-                        "_type": "doc",
-                        "_id": dataset["resource__dataset_id"],
-                        "doc": {es_oper_attr: dataset[annotation_label]},
-                    }
-                )
-            except KeyError:
-                self.labels_es_actions["datasets"] = [
-                    {
-                        "_op_type": "update",
-                        "_index": settings.ELASTICSEARCH_INDEX_NAMES["datasets"],
-                        "_type": "doc",
-                        "_id": dataset["resource__dataset_id"],
-                        "doc": {es_oper_attr: dataset[annotation_label]},
-                    }
-                ]
-
-    def save_es_actions(self, datasets_updates):
-        dataset_model = apps.get_model("datasets.Dataset")
-        for dataset_id, data in datasets_updates.items():
-            dataset_model.objects.filter(pk=dataset_id).update(**data)
-            if "datasets" not in self.labels_es_actions:
-                self.labels_es_actions["datasets"] = []
-            self.labels_es_actions["datasets"].append(
+            self.labels_es_actions.setdefault("datasets", []).append(
                 {
                     "_op_type": "update",
                     "_index": settings.ELASTICSEARCH_INDEX_NAMES["datasets"],
                     "_type": "doc",
-                    "_id": dataset_id,
-                    "doc": data,
+                    "_id": dataset["resource__dataset_id"],
+                    "doc": {es_oper_attr: dataset[annotation_label]},
                 }
             )
+
+    def save_es_actions(self):
         es_actions = []
         for view_actions in self.labels_es_actions.values():
             es_actions.extend(view_actions)
+        if not es_actions:
+            return
         streaming_bulk(
             connections.get_connection(),
             es_actions,
+            chunk_size=len(es_actions),
             raise_on_error=False,
             raise_on_exception=False,
             max_retries=2,
         )
 
-    def add_es_action(self, model, obj, oper, counter, incr_val, datasets_updates):
-        document = next(iter(registry._models[model]))
-        self.labels_es_actions[model._meta.label].append(
+    def add_es_action(self, model, obj_id, doc):
+        documents = registry._models.get(model)
+        if not documents:
+            return
+        self.labels_es_actions.setdefault(model._meta.label, []).append(
             {
                 "_op_type": "update",
                 "_type": "doc",
-                "_index": document.Index.name,
-                "_id": obj.pk,
-                "doc": {oper: counter},
+                "_index": next(iter(documents)).Index.name,
+                "_id": obj_id,
+                "doc": doc,
             }
         )
-        try:
-            if obj.dataset_id not in datasets_updates:
-                datasets_updates[obj.dataset_id] = {}
-            datasets_updates[obj.dataset_id].setdefault(oper, getattr(obj.dataset, oper))
-            datasets_updates[obj.dataset_id][oper] += incr_val
-        except AttributeError:
-            pass
@@ -0,0 +1,123 @@
+# Generated by Django 2.2.9 on 2026-10-17 07:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("categories", "0013_auto_20241029_1508"),
+        ("datasets", "0045_merge_20251028_1446"),
+        ("organizations", "0025_auto_20251010_1248"),
+        ("counters", "0002_add_resourceviewcounter_resourcedownloadcounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyDatasetStats",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(db_index=True)),
+                ("has_table", models.BooleanField()),
+                ("has_chart", models.BooleanField()),
+                ("has_map", models.BooleanField()),
+                ("has_no_visualization", models.BooleanField()),
+                ("count", models.IntegerField()),
+                (
+                    "category",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="categories.Category",
+                    ),
+                ),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="organizations.Organization",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailyResourceStats",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(db_index=True)),
+                ("type", models.CharField(max_length=10)),
+                ("format", models.CharField(max_length=150, null=True)),
+                ("openness_score", models.IntegerField()),
+                ("has_table", models.BooleanField()),
+                ("has_chart", models.BooleanField()),
+                ("has_map", models.BooleanField()),
+                ("count", models.IntegerField()),
+                (
+                    "category",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="categories.Category",
+                    ),
+                ),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="organizations.Organization",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DailyDatasetUsageStats",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(db_index=True)),
+                ("views", models.IntegerField()),
+                ("downloads", models.IntegerField()),
+                (
+                    "dataset",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="datasets.Dataset",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -1,6 +1,7 @@
 from datetime import date
 
 from django.db import models
+from django.db.models import Sum
 from modeltrans.manager import MultilingualManager
 
 
@@ -15,6 +16,12 @@ class ResourceCounter(models.Model):
     class Meta:
         abstract = True
 
+    @classmethod
+    def sum_counts_by(cls, lookup, values):
+        """Returns sums of counts by values of `lookup` (e.g. `resource__dataset_id`) found in `values`."""
+        queryset = cls.objects.filter(**{f"{lookup}__in": values}).order_by().values_list(lookup)
+        return dict(queryset.annotate(count_sum=Sum("count")))
+
 
 class ResourceViewCounter(ResourceCounter):
     pass
@@ -22,3 +29,62 @@ class ResourceViewCounter(ResourceCounter):
 
 class ResourceDownloadCounter(ResourceCounter):
     pass
+
+
+class DailyDatasetStats(models.Model):
+    """
+    Liczba opublikowanych zbiorów danych utworzonych danego dnia w podziale na instytucję, kategorię
+    i rodzaje wizualizacji danych zbioru. Tabela jest przeliczana przez zadania z `mcod.counters.tasks`.
+    """
+
+    day = models.DateField(db_index=True)
+    organization = models.ForeignKey(
+        "organizations.Organization", on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    category = models.ForeignKey(
+        "categories.Category", on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name="+"
+    )
+    has_table = models.BooleanField()
+    has_chart = models.BooleanField()
+    has_map = models.BooleanField()
+    has_no_visualization = models.BooleanField()
+    count = models.IntegerField()
+
+    objects = MultilingualManager()
+
+
+class DailyResourceStats(models.Model):
+    """
+    Liczba opublikowanych danych utworzonych danego dnia w podziale na instytucję, kategorię zbioru,
+    typ, format, stopień otwartości i rodzaj wizualizacji.
+    """
+
+    day = models.DateField(db_index=True)
+    organization = models.ForeignKey(
+        "organizations.Organization", on_delete=models.DO_NOTHING, db_constraint=False, related_name="+"
+    )
+    category = models.ForeignKey(
+        "categories.Category", on_delete=models.DO_NOTHING, db_constraint=False, null=True, related_name="+"
+    )
+    type = models.CharField(max_length=10)
+    format = models.CharField(max_length=150, null=True)
+    openness_score = models.IntegerField()
+    has_table = models.BooleanField()
+    has_chart = models.BooleanField()
+    has_map = models.BooleanField()
+    count = models.IntegerField()
+
+    objects = MultilingualManager()
+
+
+class DailyDatasetUsageStats(models.Model):
+    """
+    Suma wyświetleń i pobrań danych zbioru danego dnia.
+    """
+
+    day = models.DateField(db_index=True)
+    dataset = models.ForeignKey("datasets.Dataset", on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    views = models.IntegerField()
+    downloads = models.IntegerField()
+
+    objects = MultilingualManager()
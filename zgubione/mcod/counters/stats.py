@@ -0,0 +1,195 @@
+"""
+Daily statistics of datasets, resources and their usage used by the statistics dashboards (`mcod.pn_apps`).
+
+Tables `DailyDatasetStats`, `DailyResourceStats` and `DailyDatasetUsageStats` are rebuilt every night
+and updated incrementally in the meantime - only rows of days of creation of recently modified datasets
+and resources (and days with new views and downloads) are recalculated.
+Changes which don't touch `modified` of resources (visualization flags updated with `.update()`) are marked
+with `mark_changed_day`. Every refresh changes the statistics version, which is a part of keys of cached
+dashboards dataframes.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.db.transaction import atomic
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+logger = logging.getLogger("mcod")
+
+STATS_VERSION_KEY = "daily-stats-version"
+STATS_UPDATED_AT_KEY = "daily-stats-updated-at"
+STATS_LOCK_KEY = "daily-stats-lock"
+STATS_CHANGED_DAYS_KEY = "daily-stats-changed-days"
+STATS_LOCK_TIMEOUT = 2 * 60 * 60
+
+DATASET_STATS_SQL = """
+INSERT INTO {stats_table} (day, organization_id, category_id, has_table, has_chart, has_map, has_no_visualization, count)
+SELECT day, organization_id, category_id, has_table, has_chart, has_map, has_no_visualization, count(*)
+FROM (
+    SELECT
+        (d.created AT TIME ZONE %(tz)s)::date AS day,
+        d.organization_id,
+        d.category_id,
+        coalesce(bool_or(r.has_table), false) AS has_table,
+        coalesce(bool_or(r.has_chart), false) AS has_chart,
+        coalesce(bool_or(r.has_map), false) AS has_map,
+        coalesce(bool_or(NOT (r.has_table OR r.has_chart OR r.has_map)), false) AS has_no_visualization
+    FROM {dataset_table} d
+    LEFT JOIN {resource_table} r ON r.dataset_id = d.id AND NOT r.is_removed AND NOT r.is_permanently_removed
+    WHERE d.status = 'published' AND NOT d.is_removed AND NOT d.is_permanently_removed {where}
+    GROUP BY d.id
+) datasets
+GROUP BY day, organization_id, category_id, has_table, has_chart, has_map, has_no_visualization
+"""
+
+RESOURCE_STATS_SQL = """
+INSERT INTO {stats_table} (
+    day, organization_id, category_id, type, format, openness_score, has_table, has_chart, has_map, count
+)
+SELECT
+    (r.created AT TIME ZONE %(tz)s)::date AS day,
+    d.organization_id,
+    d.category_id,
+    r.type,
+    r.format,
+    r.openness_score,
+    r.has_table,
+    r.has_chart,
+    r.has_map,
+    count(*)
+FROM {resource_table} r
+JOIN {dataset_table} d ON d.id = r.dataset_id
+WHERE r.status = 'published' AND NOT r.is_removed AND NOT r.is_permanently_removed {where}
+GROUP BY 1, 2, 3, 4, 5, 6, 7, 8, 9
+"""
+
+# status of datasets isn't taken into account - it's checked when the statistics are read.
+DATASET_USAGE_STATS_SQL = """
+INSERT INTO {stats_table} (day, dataset_id, views, downloads)
+SELECT c.day, r.dataset_id, sum(c.views), sum(c.downloads)
+FROM (
+    SELECT "timestamp" AS day, resource_id, count AS views, 0 AS downloads FROM {views_table} WHERE TRUE {where}
+    UNION ALL
+    SELECT "timestamp" AS day, resource_id, 0 AS views, count AS downloads FROM {downloads_table} WHERE TRUE {where}
+) c
+JOIN {resource_table} r ON r.id = c.resource_id
+GROUP BY c.day, r.dataset_id
+"""
+
+CHANGED_DAYS_SQL = """
+SELECT DISTINCT (d.created AT TIME ZONE %(tz)s)::date
+FROM {dataset_table} d
+WHERE d.modified >= %(since)s
+    OR EXISTS (SELECT 1 FROM {resource_table} r WHERE r.dataset_id = d.id AND r.modified >= %(since)s)
+UNION
+SELECT DISTINCT (r.created AT TIME ZONE %(tz)s)::date
+FROM {resource_table} r
+JOIN {dataset_table} d ON d.id = r.dataset_id
+WHERE r.modified >= %(since)s OR d.modified >= %(since)s
+"""
+
+
+def _get_tables() -> dict:
+    qn = connection.ops.quote_name
+    models = {
+        "dataset_table": "datasets.Dataset",
+        "resource_table": "resources.Resource",
+        "views_table": "counters.ResourceViewCounter",
+        "downloads_table": "counters.ResourceDownloadCounter",
+    }
+    return {name: qn(apps.get_model(label)._meta.db_table) for name, label in models.items()}
+
+
+def _get_stats_queries() -> list:
+    """Returns tuples of (statistics model, query, expression of the day of counted objects)."""
+    return [
+        (apps.get_model("counters.DailyDatasetStats"), DATASET_STATS_SQL, "(d.created AT TIME ZONE %(tz)s)::date"),
+        (apps.get_model("counters.DailyResourceStats"), RESOURCE_STATS_SQL, "(r.created AT TIME ZONE %(tz)s)::date"),
+        (apps.get_model("counters.DailyDatasetUsageStats"), DATASET_USAGE_STATS_SQL, '"timestamp"'),
+    ]
+
+
+def get_stats_version() -> int:
+    return caches["default"].get_or_set(STATS_VERSION_KEY, 0, timeout=None)
+
+
+def mark_changed_day(created: datetime) -> None:
+    """Marks statistics of the day of creation of a resource to be refreshed by the next update."""
+    get_redis_connection().sadd(STATS_CHANGED_DAYS_KEY, timezone.localdate(created).isoformat())
+
+
+def get_changed_days(since: datetime) -> List[date]:
+    """
+    Returns days which statistics could have changed since `since`: days of creation of modified datasets
+    and resources (and of datasets with modified resources) and days with new views and downloads.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(CHANGED_DAYS_SQL.format(**_get_tables()), {"tz": settings.TIME_ZONE, "since": since})
+        days = {row[0] for row in cursor.fetchall()}
+    day, today = timezone.localdate(since), timezone.localdate()
+    while day <= today:
+        days.add(day)
+        day += timedelta(days=1)
+    return sorted(days)
+
+
+def refresh_stats(days: Optional[Iterable[date]] = None) -> None:
+    """
+    Recalculates statistics of given days (of all days if `days` are not given) in a single transaction,
+    so statistics are always consistent for the dashboards.
+    """
+    if days is not None:
+        days = list(days)
+        if not days:
+            return
+    params = {"tz": settings.TIME_ZONE, "days": days}
+    tables = _get_tables()
+    with atomic(), connection.cursor() as cursor:
+        for model, sql, day_expression in _get_stats_queries():
+            stats_table = connection.ops.quote_name(model._meta.db_table)
+            if days is None:
+                cursor.execute(f"DELETE FROM {stats_table}")
+                where = ""
+            else:
+                cursor.execute(f"DELETE FROM {stats_table} WHERE day = ANY(%(days)s)", params)
+                where = f"AND {day_expression} = ANY(%(days)s)"
+            cursor.execute(sql.format(stats_table=stats_table, where=where, **tables), params)
+    cache = caches["default"]
+    cache.add(STATS_VERSION_KEY, 0, timeout=None)
+    cache.incr(STATS_VERSION_KEY)
+    logger.debug(f"Daily statistics refreshed for {len(days) if days is not None else 'all'} days.")
+
+
+def update_stats(full: bool = False) -> None:
+    """
+    Refreshes statistics changed since the last update (all of them if `full` is set or there was no update yet).
+    """
+    cache = caches["default"]
+    lock = cache.lock(STATS_LOCK_KEY, timeout=STATS_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=full):
+        logger.info("Daily statistics are being refreshed by another task, skipping.")
+        return
+    try:
+        started_at = timezone.now()
+        updated_at = None if full else cache.get(STATS_UPDATED_AT_KEY)
+        con = get_redis_connection()
+        marked_days = con.smembers(STATS_CHANGED_DAYS_KEY)
+        if updated_at:
+            days = set(get_changed_days(updated_at))
+            days.update(date.fromisoformat(day.decode()) for day in marked_days)
+            refresh_stats(sorted(days))
+        else:
+            refresh_stats()
+        cache.set(STATS_UPDATED_AT_KEY, started_at, timeout=None)
+        if marked_days:
+            # days marked during the refresh are kept for the next update.
+            con.srem(STATS_CHANGED_DAYS_KEY, *marked_days)
+    finally:
+        lock.release()
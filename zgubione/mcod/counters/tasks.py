@@ -7,6 +7,7 @@ from django.db.models import Sum
 from mcod import settings
 from mcod.core.tasks import extended_shared_task
 from mcod.counters.lib import Counter
+from mcod.counters.stats import update_stats
 
 logger = logging.getLogger("kibana-statistics")
 
@@ -28,6 +29,12 @@ def save_counters():
     return {}
 
 
+@extended_shared_task
+def update_daily_stats(full=False):
+    update_stats(full=full)
+    return {}
+
+
 @extended_shared_task
 def kibana_statistics():
     download_counter_model = apps.get_model("counters.ResourceDownloadCounter")
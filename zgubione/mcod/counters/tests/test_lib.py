@@ -0,0 +1,92 @@
+import pytest
+from celery.signals import worker_process_shutdown
+from django_redis import get_redis_connection
+
+from mcod.counters import lib
+from mcod.counters.lib import (
+    DOWNLOADS_COUNT_PREFIX,
+    VIEWS_COUNT_PREFIX,
+    Counter,
+    bulk_increment,
+    get_counter_key,
+)
+from mcod.counters.models import ResourceViewCounter
+from mcod.resources.factories import ResourceFactory
+from mcod.resources.models import Resource
+
+
+@pytest.fixture
+def clean_counters():
+    con = get_redis_connection()
+    keys = [get_counter_key(oper, "resources.Resource") for oper in (VIEWS_COUNT_PREFIX, DOWNLOADS_COUNT_PREFIX)]
+    con.delete(*keys)
+    yield
+    con.delete(*keys)
+
+
+def test_buffered_increments_are_sent_in_batch(clean_counters, mocker):
+    mocker.patch.object(lib.settings, "COUNTERS_BUFFER_FLUSH_INTERVAL", 60)
+    buffer = lib.CounterBuffer()
+    con = get_redis_connection()
+    key = get_counter_key(VIEWS_COUNT_PREFIX, "resources.Resource")
+
+    for obj_id in (1, 1, 2):
+        buffer.add(VIEWS_COUNT_PREFIX, "resources.Resource", obj_id)
+    assert con.hgetall(key) == {}
+
+    buffer.flush()
+    assert con.hgetall(key) == {b"1": b"2", b"2": b"1"}
+
+
+def test_counter_increments_are_flushed_by_timer(clean_counters, mocker):
+    mocker.patch.object(lib.settings, "COUNTERS_BUFFER_FLUSH_INTERVAL", 0.1)
+    buffer = mocker.patch.object(lib, "buffer", lib.CounterBuffer())
+    con = get_redis_connection()
+    key = get_counter_key(VIEWS_COUNT_PREFIX, "resources.Resource")
+    counter = Counter()
+
+    counter.incr_view_count("resources.Resource", 1)
+    counter.incr_view_count("resources.Resource", 1)
+    timer = buffer._timer
+    assert con.hgetall(key) == {}
+
+    timer.join(timeout=5)
+    assert con.hgetall(key) == {b"1": b"2"}
+    assert buffer._timer is None
+
+
+def test_buffer_is_flushed_on_worker_process_shutdown(mocker):
+    flush = mocker.patch.object(lib.buffer, "flush")
+
+    worker_process_shutdown.send(sender=None, pid=1, exitcode=0)
+
+    flush.assert_called_once_with()
+
+
+@pytest.mark.django_db
+def test_bulk_increment():
+    resources = ResourceFactory.create_batch(2, views_count=10)
+
+    new_values = bulk_increment(Resource, "views_count", {resources[0].pk: 3, resources[1].pk: 5})
+
+    assert new_values == {resources[0].pk: 13, resources[1].pk: 15}
+    assert Resource.objects.get(pk=resources[1].pk).views_count == 15
+
+
+@pytest.mark.django_db
+def test_save_counters(clean_counters):
+    resource = ResourceFactory.create(status="published", views_count=0, downloads_count=0)
+    downloads_count = resource.dataset.downloads_count
+    counter = Counter()
+    counter.incr_view_count("resources.Resource", resource.pk)
+    counter.incr_view_count("resources.Resource", resource.pk)
+    counter.incr_download_count(resource.pk)
+
+    counter.save_counters()
+    Counter().save_counters()  # increments are saved once.
+
+    resource = Resource.objects.get(pk=resource.pk)
+    assert resource.views_count == 2
+    assert resource.downloads_count == 1
+    assert resource.dataset.downloads_count == downloads_count + 1
+    assert ResourceViewCounter.objects.get(resource=resource).count == 2
@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import caches
+from django.db.models import Sum
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from mcod.counters import stats
+from mcod.counters.models import (
+    DailyDatasetStats,
+    DailyDatasetUsageStats,
+    DailyResourceStats,
+    ResourceDownloadCounter,
+)
+from mcod.counters.stats import (
+    STATS_CHANGED_DAYS_KEY,
+    STATS_UPDATED_AT_KEY,
+    get_stats_version,
+    mark_changed_day,
+    refresh_stats,
+    update_stats,
+)
+from mcod.datasets.factories import DatasetFactory
+from mcod.resources.factories import ResourceFactory
+from mcod.resources.models import Resource
+
+
+@pytest.fixture
+def clean_stats_updated_at():
+    caches["default"].delete(STATS_UPDATED_AT_KEY)
+    get_redis_connection().delete(STATS_CHANGED_DAYS_KEY)
+    yield
+    caches["default"].delete(STATS_UPDATED_AT_KEY)
+    get_redis_connection().delete(STATS_CHANGED_DAYS_KEY)
+
+
+@pytest.fixture
+def dataset_with_resources():
+    dataset = DatasetFactory.create(status="published")
+    resources = [
+        ResourceFactory.create(dataset=dataset, status="published", type="file"),
+        ResourceFactory.create(dataset=dataset, status="published", type="api"),
+    ]
+    Resource.raw.filter(pk=resources[0].pk).update(has_table=True, has_chart=False, has_map=False)
+    Resource.raw.filter(pk=resources[1].pk).update(has_table=False, has_chart=False, has_map=False)
+    return dataset, resources
+
+
+def _total(model, field="count", **filters):
+    return model.objects.filter(**filters).aggregate(total=Sum(field))["total"] or 0
+
+
+@pytest.mark.django_db
+def test_refresh_stats(dataset_with_resources):
+    dataset, resources = dataset_with_resources
+    ResourceDownloadCounter.objects.create(resource=resources[0], count=3)
+    ResourceDownloadCounter.objects.create(resource=resources[1], count=2)
+    version = get_stats_version()
+
+    refresh_stats()
+
+    assert _total(DailyDatasetStats, organization_id=dataset.organization_id) == 1
+    assert _total(DailyDatasetStats, organization_id=dataset.organization_id, has_table=True) == 1
+    assert _total(DailyDatasetStats, organization_id=dataset.organization_id, has_no_visualization=True) == 1
+    assert _total(DailyDatasetStats, organization_id=dataset.organization_id, has_chart=True) == 0
+    assert _total(DailyResourceStats, organization_id=dataset.organization_id) == 2
+    assert _total(DailyResourceStats, organization_id=dataset.organization_id, type="api") == 1
+    assert _total(DailyDatasetUsageStats, "downloads", dataset=dataset) == 5
+    assert get_stats_version() > version
+
+
+@pytest.mark.django_db
+def test_update_stats_refreshes_changed_days(dataset_with_resources, clean_stats_updated_at, mocker):
+    dataset, resources = dataset_with_resources
+    update_stats()
+    assert _total(DailyResourceStats, organization_id=dataset.organization_id) == 2
+
+    Resource.raw.filter(pk=resources[1].pk).update(status="draft", modified=timezone.now())
+    refresh = mocker.spy(stats, "refresh_stats")
+    update_stats()
+
+    assert refresh.call_args.args[0] == [timezone.localdate()]
+    assert _total(DailyResourceStats, organization_id=dataset.organization_id) == 1
+
+
+@pytest.mark.django_db
+def test_update_stats_refreshes_marked_days(dataset_with_resources, clean_stats_updated_at, mocker):
+    dataset, resources = dataset_with_resources
+    update_stats()
+    assert _total(DailyResourceStats, organization_id=dataset.organization_id, has_chart=True) == 0
+
+    created = timezone.now() - timedelta(days=10)
+    Resource.raw.filter(pk=resources[0].pk).update(created=created, has_chart=True)
+    mark_changed_day(created)
+    refresh = mocker.spy(stats, "refresh_stats")
+    update_stats()
+
+    assert refresh.call_args.args[0] == [timezone.localdate(created), timezone.localdate()]
+    assert _total(DailyResourceStats, organization_id=dataset.organization_id, has_chart=True) == 1
+    assert get_redis_connection().smembers(STATS_CHANGED_DAYS_KEY) == set()
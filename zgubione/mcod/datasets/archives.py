@@ -0,0 +1,145 @@
+"""
+Incremental building of dataset resources files archives.
+
+Next to every archive the manifest (`<archive>.manifest.json`) is saved - for every archived file (by its name
+in the storage) it keeps the member name, size, modification time and SHA-256 hash of the file.
+When the archive is rebuilt, members of files which haven't changed since the previous archive are copied
+from it as they are (already compressed bytes), only new and changed files are compressed.
+Files which are already compressed (see `DATASET_ARCHIVE_STORED_EXTENSIONS`) are stored without compression.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import zipfile
+from contextlib import ExitStack
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger("mcod")
+
+MANIFEST_SUFFIX = ".manifest.json"
+
+_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_LOCAL_HEADER_SIZE = 30
+_DATA_DESCRIPTOR_FLAG = 0x08
+_UTF8_FLAG = 0x800
+
+
+def get_manifest_path(zip_path: str) -> str:
+    return f"{zip_path}{MANIFEST_SUFFIX}"
+
+
+def load_manifest(zip_path: str) -> dict:
+    try:
+        with open(get_manifest_path(zip_path)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def get_file_hash(path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def get_compress_type(path: str) -> int:
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    return zipfile.ZIP_STORED if extension in settings.DATASET_ARCHIVE_STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+def copy_member(source: zipfile.ZipFile, info: zipfile.ZipInfo, target: zipfile.ZipFile, arcname: str) -> None:
+    """Copies compressed data of the member `info` of `source` archive into `target` archive as `arcname`."""
+    new_info = zipfile.ZipInfo(arcname, info.date_time)
+    for attr in ("compress_type", "create_system", "create_version", "extract_version", "external_attr"):
+        setattr(new_info, attr, getattr(info, attr))
+    new_info.CRC, new_info.compress_size, new_info.file_size = info.CRC, info.compress_size, info.file_size
+    # sizes are written in the local header, so data descriptor (if used in source archive) is not copied.
+    new_info.flag_bits = info.flag_bits & ~(_DATA_DESCRIPTOR_FLAG | _UTF8_FLAG)
+
+    source.fp.seek(info.header_offset)
+    header = source.fp.read(_LOCAL_HEADER_SIZE)
+    if header[:4] != _LOCAL_HEADER_SIGNATURE:
+        raise zipfile.BadZipFile(f"Bad local header of member {info.filename}")
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    source.fp.seek(name_length + extra_length, os.SEEK_CUR)
+
+    target.fp.seek(target.start_dir)
+    new_info.header_offset = target.fp.tell()
+    target.fp.write(new_info.FileHeader())
+    remaining = info.compress_size
+    while remaining:
+        chunk = source.fp.read(min(remaining, 1024 * 1024))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated data of member {info.filename}")
+        target.fp.write(chunk)
+        remaining -= len(chunk)
+    target.filelist.append(new_info)
+    target.NameToInfo[arcname] = new_info
+    target.start_dir = target.fp.tell()
+    target._didModify = True
+
+
+def _is_unchanged(previous: Optional[dict], stat: os.stat_result, path: str) -> Tuple[bool, Optional[str]]:
+    if not previous or previous["size"] != stat.st_size:
+        return False, None
+    if previous["mtime_ns"] == stat.st_mtime_ns:
+        return True, previous["sha256"]
+    # file was saved again - it's compared by its content.
+    file_hash = get_file_hash(path)
+    return file_hash == previous["sha256"], file_hash
+
+
+def build_archive(zip_path: str, files: Iterable[Tuple[str, str, str]], previous_zip_path: Optional[str] = None) -> List[str]:
+    """
+    Creates the archive `zip_path` of `files` - tuples of (name in the storage, absolute path, member name).
+    Unchanged members are copied from `previous_zip_path` archive (if it has the manifest).
+    Returns names of archived files (missing files are skipped).
+    """
+    previous_manifest = load_manifest(previous_zip_path) if previous_zip_path else {}
+    manifest = {}
+    copied = 0
+    with ExitStack() as stack:
+        previous_zip = None
+        if previous_manifest:
+            try:
+                previous_zip = stack.enter_context(zipfile.ZipFile(previous_zip_path))
+            except (FileNotFoundError, zipfile.BadZipFile):
+                logger.warning(f"Can't open previous archive {previous_zip_path}, all files will be compressed.")
+        target = stack.enter_context(zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED, compresslevel=1))
+        for name, path, arcname in files:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                logger.debug(f"Couldn't find file {path}, skipping.")
+                continue
+            previous = previous_manifest.get(name)
+            previous_info = previous_zip.NameToInfo.get(previous["arcname"]) if previous_zip and previous else None
+            unchanged, file_hash = _is_unchanged(previous, stat, path) if previous_info else (False, None)
+            if unchanged:
+                copy_member(previous_zip, previous_info, target, arcname)
+                copied += 1
+            else:
+                target.write(path, arcname, compress_type=get_compress_type(path))
+                file_hash = file_hash or get_file_hash(path)
+            manifest[name] = {"arcname": arcname, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": file_hash}
+
+    if manifest:
+        with open(get_manifest_path(zip_path), "w") as f:
+            json.dump(manifest, f)
+    logger.debug(f"Archive {zip_path} created, {copied} of {len(manifest)} files copied from the previous archive.")
+    return list(manifest)
+
+
+def remove_archive(zip_path: str) -> None:
+    for path in (zip_path, get_manifest_path(zip_path)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -3,6 +3,7 @@ from django_elasticsearch_dsl import fields
 from django_elasticsearch_dsl.registries import registry
 
 from mcod import settings as mcs
+from mcod.counters.models import ResourceDownloadCounter, ResourceViewCounter
 from mcod.harvester.serializers import DataSourceSerializer
 from mcod.lib.search.fields import TranslatedKeywordField, TranslatedTextField
 from mcod.regions.documents import regions_field
@@ -126,6 +127,18 @@ class DatasetDocument(ExtendedDocument):
     is_promoted = fields.BooleanField()
     regions = regions_field()
 
+    prefetch_related_lookups = (
+        "category",
+        "categories",
+        "license",
+        "organization",
+        "resources",
+        "showcases",
+        "source",
+        "supplements",
+        "tags",
+    )
+
     class Index:
         name = mcs.ELASTICSEARCH_INDEX_NAMES["datasets"]
         settings = mcs.ELASTICSEARCH_DSL_SEARCH_INDEX_SETTINGS
@@ -162,3 +175,19 @@ class DatasetDocument(ExtendedDocument):
         if not instance.source:
             return {}
         return serializer.dump(instance.source)
+
+    def prepare_batch(self, instances):
+        super().prepare_batch(instances)
+        ids = [instance.id for instance in instances]
+        self.batch_data["downloads_counts"] = ResourceDownloadCounter.sum_counts_by("resource__dataset_id", ids)
+        self.batch_data["views_counts"] = ResourceViewCounter.sum_counts_by("resource__dataset_id", ids)
+
+    def prepare_computed_downloads_count(self, instance):
+        if "downloads_counts" in self.batch_data:
+            return self.batch_data["downloads_counts"].get(instance.id, 0)
+        return instance.computed_downloads_count
+
+    def prepare_computed_views_count(self, instance):
+        if "views_counts" in self.batch_data:
+            return self.batch_data["views_counts"].get(instance.id, 0)
+        return instance.computed_views_count
@@ -1,14 +1,15 @@
 import os
-import zipfile
 from functools import partial
 
 import falcon
 from django.apps import apps
 
+from mcod.core.api.files import send_file
 from mcod.core.api.handlers import RetrieveManyHdlr, RetrieveOneHdlr
 from mcod.counters.lib import Counter
 from mcod.datasets.deserializers import DatasetResourcesDownloadApiRequest
 from mcod.datasets.serializers import DatasetResourcesCSVSerializer, DatasetXMLSerializer
+from mcod.datasets.utils import get_archive_resources_ids
 
 
 class CSVMetadataViewHandler(RetrieveManyHdlr):
@@ -57,15 +58,10 @@ class ArchiveDownloadViewHandler(RetrieveOneHdlr):
         except ValueError:
             raise falcon.HTTPNotFound
         try:
-            with open(zip_path, "rb") as f:
-                zipped_files = f.read()
-            with zipfile.ZipFile(zip_path) as z:
-                resources_ids = list([os.path.dirname(x).split("_")[-1] for x in z.namelist()])
+            is_download = send_file(self.request, self.response, zip_path, filename=os.path.basename(zip_path))
+            if is_download:
                 counter = Counter()
-                for res_id in resources_ids:
+                for res_id in get_archive_resources_ids(zip_path):
                     counter.incr_download_count(res_id)
         except FileNotFoundError:
             raise falcon.HTTPNotFound
-        self.response.downloadable_as = os.path.basename(zip_path)
-
-        return zipped_files
@@ -1,7 +1,9 @@
 from datetime import datetime
+from itertools import islice
 
 from dateutil.relativedelta import relativedelta
 from django.apps import apps
+from django.conf import settings
 from django.db.models import Count, Max, Prefetch, Q
 
 from mcod.core.managers import SoftDeletableManager, SoftDeletableQuerySet
@@ -98,6 +100,35 @@ class DatasetQuerySet(SoftDeletableQuerySet):
 
         return data
 
+    def iter_with_metadata_chunks(self, chunk_size=None):
+        """
+        Yields published datasets with metadata fetched (as `with_metadata_fetched_as_list`) in lists of
+        `chunk_size` datasets. Ids are read with a server-side cursor and metadata is fetched for every chunk
+        separately, so only one chunk is kept in memory at a time.
+        """
+        chunk_size = chunk_size or settings.CATALOG_METADATA_CHUNK_SIZE
+        ids = self.filter(status="published").order_by("id").values_list("id", flat=True).iterator(chunk_size=chunk_size)
+        while True:
+            chunk_ids = list(islice(ids, chunk_size))
+            if not chunk_ids:
+                return
+            chunk_queryset = self.filter(id__in=chunk_ids)
+            extra_attrs = {
+                dataset["id"]: dataset
+                for dataset in self._with_metadata_annotated(chunk_queryset.values("id")).values(
+                    "id",
+                    "published_resources__count",
+                    "organization_published_datasets__count",
+                    "organization_published_resources__count",
+                )
+            }
+            datasets = list(self._with_metadata_prefetched(chunk_queryset).order_by("id"))
+            for dataset in datasets:
+                for key, value in extra_attrs.get(dataset.id, {}).items():
+                    if key != "id":
+                        setattr(dataset, key, value)
+            yield datasets
+
     def with_metadata_fetched(self):
         queryset = self.filter(status="published")
         queryset = self._with_metadata_prefetched(queryset)
@@ -180,6 +211,9 @@ class DatasetManager(SoftDeletableManager):
     def with_metadata_fetched_as_list(self):
         return super().get_queryset().with_metadata_fetched_as_list()
 
+    def iter_with_metadata_chunks(self, chunk_size=None):
+        return super().get_queryset().iter_with_metadata_chunks(chunk_size=chunk_size)
+
     def datasets_to_notify(self):
         return super().get_queryset().datasets_to_notify()
 
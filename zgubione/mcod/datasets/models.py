@@ -34,7 +34,7 @@ from mcod.core.storages import get_storage
 from mcod.counters.models import ResourceDownloadCounter, ResourceViewCounter
 from mcod.datasets.managers import DatasetManager, SupplementManager
 from mcod.datasets.signals import remove_related_resources
-from mcod.datasets.tasks import archive_resources_files, change_archive_symlink_name
+from mcod.datasets.tasks import change_archive_symlink_name, schedule_archive_resources_files
 from mcod.lib.model_sanitization import (
     SanitizedCharField,
     SanitizedJSONField,
@@ -466,13 +466,21 @@ class Dataset(ExtendedModel):
     def title_as_link(self):
         return self.mark_safe(f'<a href="{self.admin_change_url}">{self.title}</a>')
 
+    def _get_published_resources(self):
+        # resources prefetched for indexing (see `mcod.core.db.elastic.Document.prepare_batch`) are filtered in memory.
+        if "resources" in getattr(self, "_prefetched_objects_cache", {}):
+            return [resource for resource in self.resources.all() if resource.status == "published"]
+        return self.resources.published()
+
     @property
     def formats(self):
-        items = [x.formats_list for x in self.resources.published() if x.formats_list]
+        items = [x.formats_list for x in self._get_published_resources() if x.formats_list]
         return sorted(set([item for sublist in items for item in sublist]))
 
     @property
     def types(self):
+        if "resources" in getattr(self, "_prefetched_objects_cache", {}):
+            return list({resource.type for resource in self._get_published_resources()})
         return list(self.resources.published().values_list("type", flat=True).distinct())
 
     @property
@@ -485,7 +493,7 @@ class Dataset(ExtendedModel):
 
     @property
     def openness_scores(self):
-        return list(set(res.openness_score for res in self.resources.published()))
+        return list(set(res.openness_score for res in self._get_published_resources()))
 
     @property
     def keywords_list(self):
@@ -544,6 +552,8 @@ class Dataset(ExtendedModel):
 
     @property
     def last_modified_resource(self):
+        if "resources" in getattr(self, "_prefetched_objects_cache", {}):
+            return max((resource.modified for resource in self.resources.all() if resource.modified), default=None)
         return self.resources.all().aggregate(Max("modified"))["modified__max"]
 
     last_modified_resource.fget.short_description = _("modified")
@@ -573,7 +583,7 @@ class Dataset(ExtendedModel):
 
     @property
     def visualization_types(self):
-        return list(set(itertools.chain(*[r.visualization_types for r in self.resources.published()])))
+        return list(set(itertools.chain(*[r.visualization_types for r in self._get_published_resources()])))
 
     @property
     def model_name(self):
@@ -718,6 +728,8 @@ class Dataset(ExtendedModel):
 
     @cached_property
     def showcases_published(self):
+        if "showcases" in getattr(self, "_prefetched_objects_cache", {}):
+            return [showcase for showcase in self.showcases.all() if showcase.status == "published"]
         return self.showcases.filter(status="published")
 
     @cached_property
@@ -729,7 +741,7 @@ class Dataset(ExtendedModel):
         return ";".join([x.name_csv for x in self.supplement_docs])
 
     def archive_files(self):
-        archive_resources_files.s(dataset_id=self.pk).apply_async(countdown=settings.DATASET_ARCHIVE_FILES_TASK_DELAY)
+        schedule_archive_resources_files(self.pk)
 
     @classmethod
     def get_license_data(cls, name, lang=None):
@@ -1,28 +1,37 @@
 import logging
 import os
-import zipfile
+import time
+from contextlib import ExitStack
 from datetime import datetime
 from pathlib import Path
 from shutil import disk_usage
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Iterable, Union
 
 from celery_singleton import Singleton
 from dateutil.relativedelta import relativedelta
 from django.apps import apps
 from django.conf import settings
+from django.core.cache import caches
 from django.utils import translation
 from sentry_sdk import set_tag
 
 from mcod.core import storages
 from mcod.core.tasks import extended_shared_task
 from mcod.core.utils import CSVWriter, WriterInterface, XMLWriter, clean_filename
-from mcod.datasets.utils import create_archive_file_path
+from mcod.datasets.archives import build_archive, remove_archive
+from mcod.datasets.utils import create_archive_file_path, set_archive_resources_ids
 
 if TYPE_CHECKING:
-    from mcod.datasets.serializers import DatasetResourcesCSVSerializer, DatasetXMLSerializer
+    from mcod.datasets.serializers import DatasetResourcesCSVSerializer, DatasetXMLWriterSerializer
 
 logger = logging.getLogger("mcod")
 
+ARCHIVE_REQUESTED_AT_KEY = "dataset-archive-requested-at:{}"
+ARCHIVE_SCHEDULED_KEY = "dataset-archive-scheduled:{}"
+ARCHIVE_LOCK_KEY = "dataset-archive-lock:{}"
+ARCHIVE_KEYS_TIMEOUT = 24 * 60 * 60
+ARCHIVE_LOCK_TIMEOUT = 6 * 60 * 60
+
 
 @extended_shared_task
 def send_dataset_comment(dataset_id, comment):
@@ -34,8 +43,8 @@ def send_dataset_comment(dataset_id, comment):
 
 
 def create_catalog_metadata_file(
-    qs_data: list,
-    schema: Union["DatasetXMLSerializer", "DatasetResourcesCSVSerializer"],
+    chunks: Iterable[list],
+    schema: Union["DatasetXMLWriterSerializer", "DatasetResourcesCSVSerializer"],
     extension: str,
     writer: WriterInterface,
 ):
@@ -43,18 +52,20 @@ def create_catalog_metadata_file(
     Creates and manages catalog metadata files.
 
     Args:
-        qs_data (List): The data to be serialized.
-        schema (DatasetXMLSerializer or DatasetXMLSerializer): The schema used
-        to serialize qs_data.
+        chunks (Iterable[List]): The data to be serialized, in chunks (lists of datasets).
+        schema (DatasetXMLWriterSerializer or DatasetResourcesCSVSerializer): The schema used
+        to serialize every chunk.
         extension (str): The extension for the catalog files.
         writer (WriterInterface): An instance of a class adhering to
         WriterInterface.
 
     This function creates catalog metadata files for multiple languages, managing
-    the files for the current and previous days. It serializes the provided data
-    using the given schema and writes it to the appropriate files for each language.
-    Additionally, it creates symbolic links and removes old files to manage the
-    catalog history.
+    the files for the current and previous days. Files of all languages are written
+    at the same time: every chunk is serialized using the given schema for each language
+    and written to the appropriate file, so the data is iterated once and only one chunk
+    is kept in memory. Files are written under temporary names and published (renamed,
+    with the symbolic link switched to them) after all of them are complete. Then
+    the files of the previous day are removed.
 
     Note:
         - Assumes settings.LANGUAGE_CODES contains the language codes.
@@ -69,32 +80,51 @@ def create_catalog_metadata_file(
     today = datetime.today().date()
     previous_day = today - relativedelta(days=1)
 
-    for language in settings.LANGUAGE_CODES:
-        lang_catalog_path = f"{settings.METADATA_MEDIA_ROOT}/{language}"
-        previous_day_file = f"{lang_catalog_path}/katalog_{previous_day}.{extension}"
-        new_file = f"{lang_catalog_path}/katalog_{today}.{extension}"
-        symlink_file = f"{lang_catalog_path}/katalog.{extension}"
-
-        if not os.path.exists(lang_catalog_path):
-            os.makedirs(lang_catalog_path)
-
-        with translation.override(language):
-            data = schema.dump(qs_data)
-            with open(new_file, "w") as file:
-                writer.save(
-                    file_object=file,
-                    language_catalog_path=lang_catalog_path,
-                    data=data,
-                )
-                logger.info(f"File {new_file} has been created")
-
-        if os.path.exists(previous_day_file):
-            os.remove(previous_day_file)
-
-        if os.path.exists(new_file):
-            if os.path.exists(symlink_file) or os.path.islink(symlink_file):
-                os.remove(symlink_file)
-            os.symlink(new_file, symlink_file)
+    catalog_paths = {language: f"{settings.METADATA_MEDIA_ROOT}/{language}" for language in settings.LANGUAGE_CODES}
+    tmp_files = {language: f"{path}/.katalog_{today}.{extension}.tmp" for language, path in catalog_paths.items()}
+    try:
+        with ExitStack() as stack:
+            files = {}
+            for language, lang_catalog_path in catalog_paths.items():
+                os.makedirs(lang_catalog_path, exist_ok=True)
+                files[language] = stack.enter_context(open(tmp_files[language], "w"))
+                with translation.override(language):
+                    writer.write_header(files[language])
+
+            for chunk in chunks:
+                for language, file in files.items():
+                    with translation.override(language):
+                        writer.write_chunk(file, schema.dump(chunk), language_catalog_path=catalog_paths[language])
+
+            for language, file in files.items():
+                with translation.override(language):
+                    writer.write_footer(file)
+    except BaseException:
+        for tmp_file in tmp_files.values():
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+        raise
+
+    for language, lang_catalog_path in catalog_paths.items():
+        _publish_catalog_file(tmp_files[language], lang_catalog_path, extension, today, previous_day)
+
+
+def _publish_catalog_file(tmp_file: str, lang_catalog_path: str, extension: str, today, previous_day) -> None:
+    previous_day_file = f"{lang_catalog_path}/katalog_{previous_day}.{extension}"
+    new_file = f"{lang_catalog_path}/katalog_{today}.{extension}"
+    symlink_file = f"{lang_catalog_path}/katalog.{extension}"
+    tmp_symlink_file = f"{symlink_file}.tmp"
+
+    os.replace(tmp_file, new_file)
+    logger.info(f"File {new_file} has been created")
+
+    if os.path.lexists(tmp_symlink_file):
+        os.remove(tmp_symlink_file)
+    os.symlink(new_file, tmp_symlink_file)
+    os.replace(tmp_symlink_file, symlink_file)
+
+    if os.path.exists(previous_day_file):
+        os.remove(previous_day_file)
 
 
 @extended_shared_task
@@ -102,14 +132,14 @@ def create_csv_metadata_files() -> None:
     """Creates CSV metadata files using dataset information.
 
     This task is responsible for creating CSV metadata files based on dataset information.
-    It fetches dataset objects with metadata fetched as a list,
+    It iterates over chunks of dataset objects with metadata fetched,
     serializes them using a CSV serializer, and writes the serialized data to
     CSV files using a CSVWriter.
     """
     from mcod.datasets.serializers import DatasetResourcesCSVSerializer
 
     dataset_model = apps.get_model("datasets", "Dataset")
-    qs_data = dataset_model.objects.with_metadata_fetched_as_list()
+    chunks = dataset_model.objects.iter_with_metadata_chunks()
 
     logger.info("Started task: create_csv_metadata_files")
     csv_schema = DatasetResourcesCSVSerializer(many=True)
@@ -117,7 +147,7 @@ def create_csv_metadata_files() -> None:
         headers=csv_schema.get_csv_headers(),
     )
 
-    create_catalog_metadata_file(qs_data, csv_schema, "csv", writer=csv_writer)
+    create_catalog_metadata_file(chunks, csv_schema, "csv", writer=csv_writer)
 
 
 @extended_shared_task
@@ -125,20 +155,20 @@ def create_xml_metadata_files() -> None:
     """Creates XML metadata files using dataset information.
 
     This task is responsible for creating XML metadata files based on dataset information.
-    It fetches dataset objects with metadata fetched as a list, serializes them using an
-    XML serializer, and writes the serialized data to XML files using an XMLWriter.
+    It iterates over chunks of dataset objects with metadata fetched, serializes them using
+    an XML serializer, and writes the serialized data to XML files using an XMLWriter.
     """
 
     from mcod.datasets.serializers import DatasetXMLWriterSerializer
 
     dataset_model = apps.get_model("datasets", "Dataset")
-    qs_data: list = dataset_model.objects.with_metadata_fetched_as_list()
+    chunks = dataset_model.objects.iter_with_metadata_chunks()
 
     logger.info("Started task: create_xml_metadata_files")
     xml_schema = DatasetXMLWriterSerializer(many=True)
     xml_writer: XMLWriter = XMLWriter()
 
-    create_catalog_metadata_file(qs_data, xml_schema, "xml", writer=xml_writer)
+    create_catalog_metadata_file(chunks, xml_schema, "xml", writer=xml_writer)
 
 
 @extended_shared_task
@@ -198,12 +228,45 @@ def change_archive_symlink_name(dataset_id: int, old_name: str) -> None:
         logger.error(f"Unfortunately, symlink {old_symlink_absolute_path} does not exist")
 
 
-#  FIXME: lremkowicz: remove noqa C901 comment after removing
-#  S61_fix_for_dataset_rename_symlink_archive_problem.be flag
-@extended_shared_task(base=Singleton)
-def archive_resources_files(dataset_id: int):  # noqa: C901
+def schedule_archive_resources_files(dataset_id: int) -> None:
+    """
+    Schedules rebuild of the dataset resources files archive. Requests are coalesced - the archive is rebuilt
+    once `DATASET_ARCHIVE_FILES_TASK_DELAY` seconds after the last request for the dataset.
+    """
+    delay = int(settings.DATASET_ARCHIVE_FILES_TASK_DELAY)
+    cache = caches["default"]
+    cache.set(ARCHIVE_REQUESTED_AT_KEY.format(dataset_id), time.time(), timeout=ARCHIVE_KEYS_TIMEOUT)
+    if cache.add(ARCHIVE_SCHEDULED_KEY.format(dataset_id), 1, timeout=ARCHIVE_KEYS_TIMEOUT if delay else 0):
+        archive_resources_files.s(dataset_id=dataset_id).apply_async(countdown=delay)
+
+
+@extended_shared_task
+def archive_resources_files(dataset_id: int):
     logger.info("Starting archive_resources_files task.")
     set_tag("dataset_id", str(dataset_id))
+    cache = caches["default"]
+    delay = int(settings.DATASET_ARCHIVE_FILES_TASK_DELAY)
+    requested_at = cache.get(ARCHIVE_REQUESTED_AT_KEY.format(dataset_id))
+    wait = requested_at + delay - time.time() if requested_at else 0
+    # countdown is ignored by eager tasks - postponed task would be run again at once, recursively.
+    if wait > 0 and not archive_resources_files.request.is_eager:
+        logger.debug(f"Archive of dataset {dataset_id} was requested again, rebuild is postponed by {wait:.0f}s.")
+        archive_resources_files.s(dataset_id=dataset_id).apply_async(countdown=wait)
+        return
+    # requests made from now on are handled by the next rebuild.
+    cache.delete(ARCHIVE_SCHEDULED_KEY.format(dataset_id))
+    lock = cache.lock(ARCHIVE_LOCK_KEY.format(dataset_id), timeout=ARCHIVE_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=False):
+        logger.debug(f"Archive of dataset {dataset_id} is being rebuilt, next rebuild is scheduled.")
+        schedule_archive_resources_files(dataset_id)
+        return
+    try:
+        _archive_resources_files(dataset_id)
+    finally:
+        lock.release()
+
+
+def _archive_resources_files(dataset_id: int) -> None:
     free_space = disk_usage(settings.MEDIA_ROOT).free
     if free_space < settings.ALLOWED_MINIMUM_SPACE:
         logger.error("There is not enough free space on disk, archive creation is canceled.")
@@ -228,27 +291,25 @@ def archive_resources_files(dataset_id: int):  # noqa: C901
     full_tmp_symlink_path = create_full_file_path("tmp_resources_files.zip")
     abs_path = os.path.dirname(full_file_path)
     os.makedirs(abs_path, exist_ok=True)
+    previous_file_path = os.path.realpath(ds.archived_resources_files.path) if ds.archived_resources_files else None
     files_details = ds.resources_files_list
     log_msg = f"Updated dataset {dataset_id} archive with {tmp_filename}"
-    skipped_files = 0
-    with zipfile.ZipFile(full_file_path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as main_zip:
-        res_location = res_storage.location
-        for file_details in files_details:
-            split_name = file_details[0].split("/")
-            full_path = os.path.join(res_location, file_details[0])
-            try:
-                res_title = clean_filename(file_details[2])
-                main_zip.write(
-                    full_path,
-                    os.path.join(f"{res_title}_{file_details[1]}", split_name[1]),
-                )
-            except FileNotFoundError:
-                skipped_files += 1
-                logger.debug("Couldn't find file {} for resource with id {}, skipping.".format(full_path, file_details[1]))
-    no_archived_files = skipped_files == len(files_details)
+    resources_ids = {file_details[0]: str(file_details[1]) for file_details in files_details}
+    archive_members = [
+        (
+            file_details[0],
+            os.path.join(res_storage.location, file_details[0]),
+            os.path.join(f"{clean_filename(file_details[2])}_{file_details[1]}", file_details[0].split("/")[1]),
+        )
+        for file_details in files_details
+    ]
+    archived_files = build_archive(full_file_path, archive_members, previous_zip_path=previous_file_path)
+    no_archived_files = not archived_files
+    if not no_archived_files:
+        set_archive_resources_ids(full_file_path, [resources_ids[name] for name in archived_files])
 
     if no_archived_files:
-        os.remove(full_file_path)
+        remove_archive(full_file_path)
         log_msg = f"No files archived for dataset with id {dataset_id}, archive not updated."
     elif not ds.archived_resources_files and not no_archived_files:
         os.symlink(full_file_path, full_symlink_path)
@@ -260,6 +321,6 @@ def archive_resources_files(dataset_id: int):  # noqa: C901
         old_file_path = os.path.realpath(full_symlink_path)
         dataset_model.objects.filter(pk=dataset_id).update(archived_resources_files=None)
         os.remove(full_symlink_path)
-        os.remove(old_file_path)
+        remove_archive(old_file_path)
         log_msg = f"Removed archive {old_file_path} from dataset {dataset_id}"
     logger.debug(log_msg)
@@ -0,0 +1,55 @@
+import os
+import zipfile
+
+import pytest
+
+from mcod.datasets.archives import build_archive, load_manifest
+
+
+@pytest.fixture
+def files(tmp_path):
+    data = {"a.csv": b"a" * 10000, "b.xlsx": b"b" * 1000, "c.json": b"c" * 100}
+    for name, content in data.items():
+        (tmp_path / name).write_bytes(content)
+    return [(name, str(tmp_path / name), f"resource_{i}/{name}") for i, name in enumerate(data)]
+
+
+def test_build_archive(files, tmp_path):
+    zip_path = str(tmp_path / "archive.zip")
+
+    assert build_archive(zip_path, files) == ["a.csv", "b.xlsx", "c.json"]
+
+    with zipfile.ZipFile(zip_path) as z:
+        assert z.testzip() is None
+        assert [(info.filename, info.compress_type) for info in z.infolist()] == [
+            ("resource_0/a.csv", zipfile.ZIP_DEFLATED),
+            ("resource_1/b.xlsx", zipfile.ZIP_STORED),
+            ("resource_2/c.json", zipfile.ZIP_DEFLATED),
+        ]
+    assert load_manifest(zip_path)["a.csv"]["arcname"] == "resource_0/a.csv"
+
+
+def test_unchanged_files_are_copied_from_previous_archive(files, tmp_path, mocker):
+    previous_zip_path = str(tmp_path / "archive_1.zip")
+    build_archive(previous_zip_path, files)
+    with open(files[1][1], "wb") as f:
+        f.write(b"x" * 1000)
+    os.utime(files[2][1], ns=(0, 0))  # modified, but with the same content.
+    files[0] = ("a.csv", files[0][1], "renamed_resource_0/a.csv")
+    write = mocker.spy(zipfile.ZipFile, "write")
+
+    zip_path = str(tmp_path / "archive_2.zip")
+    build_archive(zip_path, files, previous_zip_path=previous_zip_path)
+
+    assert [c.args[2] for c in write.call_args_list] == ["resource_1/b.xlsx"]
+    with zipfile.ZipFile(zip_path) as z:
+        assert z.testzip() is None
+        assert z.read("renamed_resource_0/a.csv") == b"a" * 10000
+        assert z.read("resource_1/b.xlsx") == b"x" * 1000
+        assert z.read("resource_2/c.json") == b"c" * 100
+
+
+def test_missing_files_are_skipped(files, tmp_path):
+    files.append(("missing.csv", str(tmp_path / "missing.csv"), "resource_3/missing.csv"))
+
+    assert build_archive(str(tmp_path / "archive.zip"), files) == ["a.csv", "b.xlsx", "c.json"]
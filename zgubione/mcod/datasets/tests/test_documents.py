@@ -0,0 +1,35 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from mcod.counters.models import ResourceDownloadCounter
+from mcod.datasets.documents import DatasetDocument
+from mcod.datasets.factories import DatasetFactory
+from mcod.datasets.models import Dataset
+from mcod.resources.factories import ResourceFactory
+from mcod.users.factories import UserFactory
+from mcod.watchers.models import ModelWatcher, Subscription
+
+
+@pytest.mark.django_db
+def test_datasets_are_prepared_in_batch_as_one_by_one():
+    datasets = DatasetFactory.create_batch(3, status="published")
+    for dataset in datasets:
+        resources = ResourceFactory.create_batch(2, dataset=dataset, status="published", type="file")
+        ResourceDownloadCounter.objects.create(resource=resources[0], count=3)
+    watcher, _ = ModelWatcher.objects.get_or_create_from_instance(datasets[0])
+    Subscription.objects.create(user=UserFactory.create(), watcher=watcher, name="dataset")
+    queryset = Dataset.objects.filter(pk__in=[dataset.pk for dataset in datasets]).order_by("pk")
+    doc = DatasetDocument()
+
+    with CaptureQueriesContext(connection) as one_by_one_queries:
+        expected = [doc.prepare(dataset) for dataset in queryset]
+    instances = list(queryset)
+    with CaptureQueriesContext(connection) as batch_queries:
+        prepared = [action["_source"] for action in doc._get_actions(instances, "index")]
+
+    assert prepared == expected
+    assert len(batch_queries) < len(one_by_one_queries)
+    assert doc.batch_data == {}
+    assert DatasetDocument.batch_data is None
+    assert not any(hasattr(dataset, "_prefetched_objects_cache") for dataset in instances)
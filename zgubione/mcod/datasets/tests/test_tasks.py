@@ -1,3 +1,4 @@
+import time
 from datetime import date
 from pathlib import Path
 
@@ -5,13 +6,20 @@ import pandas as pd
 import pytest
 from dateutil.relativedelta import relativedelta
 from django.core import mail
+from django.core.cache import caches
 from django.test import override_settings
 from pytest_bdd import scenarios
 from pytest_mock import MockerFixture
 
+from mcod.core.utils import CSVWriter
 from mcod.datasets.tasks import (
+    ARCHIVE_REQUESTED_AT_KEY,
+    ARCHIVE_SCHEDULED_KEY,
+    archive_resources_files,
+    create_catalog_metadata_file,
     create_csv_metadata_files,
     create_xml_metadata_files,
+    schedule_archive_resources_files,
     send_dataset_update_reminder,
 )
 
@@ -182,6 +190,34 @@ class TestMetadataFileCreation:
             assert not file.is_file()
             assert file2.is_file()
 
+    def test_catalog_files_are_written_in_one_pass_and_published(self, tmp_path, mocker: "MockerFixture"):
+        chunks = iter([[{"title": "a"}], [{"title": "b"}, {"title": "c"}]])
+        schema = mocker.Mock()
+        schema.dump.side_effect = lambda chunk: chunk
+        writer = CSVWriter(headers=["title"])
+
+        with override_settings(METADATA_MEDIA_ROOT=tmp_path, LANGUAGE_CODES=["pl", "en"]):
+            new_today = self.mock_date(year=2023, month=12, day=24, mocker=mocker)
+            create_catalog_metadata_file(chunks, schema, "csv", writer=writer)
+
+        assert schema.dump.call_count == 4
+        for language in ("pl", "en"):
+            symlink = Path(tmp_path) / language / "katalog.csv"
+            assert symlink.is_symlink()
+            assert symlink.resolve() == (Path(tmp_path) / language / f"katalog_{new_today}.csv").resolve()
+            assert symlink.read_text().splitlines() == ["title", "a", "b", "c"]
+            assert sorted(p.name for p in (Path(tmp_path) / language).iterdir()) == ["katalog.csv", f"katalog_{new_today}.csv"]
+
+    def test_catalog_files_are_not_published_on_error(self, tmp_path, mocker: "MockerFixture"):
+        schema = mocker.Mock()
+        schema.dump.side_effect = ValueError
+
+        with override_settings(METADATA_MEDIA_ROOT=tmp_path, LANGUAGE_CODES=["pl"]):
+            with pytest.raises(ValueError):
+                create_catalog_metadata_file(iter([[{"title": "a"}]]), schema, "csv", writer=CSVWriter(headers=["title"]))
+
+        assert list((Path(tmp_path) / "pl").iterdir()) == []
+
     def test_columns_in_csv_metadata_report(self, tmp_path: str, mocker: "MockerFixture"):
         """Check if required columns are present in csv metadata report."""
 
@@ -260,3 +296,54 @@ class TestMetadataFileCreation:
             actual_columns = set(dataframe_report.columns)
             for column in columns_required:
                 assert column in dataframe_report, f"{column} not found in {actual_columns}"
+
+
+class TestArchiveResourcesFilesScheduling:
+    @pytest.fixture
+    def dataset_id(self):
+        dataset_id = 987654
+        cache = caches["default"]
+        keys = [key.format(dataset_id) for key in (ARCHIVE_REQUESTED_AT_KEY, ARCHIVE_SCHEDULED_KEY)]
+        cache.delete_many(keys)
+        yield dataset_id
+        cache.delete_many(keys)
+
+    @override_settings(DATASET_ARCHIVE_FILES_TASK_DELAY=180)
+    def test_requests_are_coalesced(self, dataset_id, mocker: MockerFixture):
+        apply_async = mocker.patch("celery.canvas.Signature.apply_async")
+
+        for _ in range(3):
+            schedule_archive_resources_files(dataset_id)
+
+        apply_async.assert_called_once_with(countdown=180)
+
+    @override_settings(DATASET_ARCHIVE_FILES_TASK_DELAY=180)
+    def test_rebuild_is_postponed_after_next_request(self, dataset_id, mocker: MockerFixture):
+        apply_async = mocker.patch("celery.canvas.Signature.apply_async")
+        build = mocker.patch("mcod.datasets.tasks._archive_resources_files")
+        schedule_archive_resources_files(dataset_id)
+
+        archive_resources_files(dataset_id)
+
+        build.assert_not_called()
+        assert apply_async.call_count == 2
+        assert 170 < apply_async.call_args.kwargs["countdown"] <= 180
+
+    @override_settings(DATASET_ARCHIVE_FILES_TASK_DELAY=180)
+    def test_eager_rebuild_is_not_postponed(self, dataset_id, mocker: MockerFixture):
+        build = mocker.patch("mcod.datasets.tasks._archive_resources_files")
+
+        schedule_archive_resources_files(dataset_id)
+
+        build.assert_called_once_with(dataset_id)
+        assert caches["default"].get(ARCHIVE_SCHEDULED_KEY.format(dataset_id)) is None
+
+    def test_rebuild_is_done_after_debounce_window(self, dataset_id, mocker: MockerFixture):
+        build = mocker.patch("mcod.datasets.tasks._archive_resources_files")
+        caches["default"].set(ARCHIVE_REQUESTED_AT_KEY.format(dataset_id), time.time() - 200)
+
+        with override_settings(DATASET_ARCHIVE_FILES_TASK_DELAY=180):
+            archive_resources_files(dataset_id)
+
+        build.assert_called_once_with(dataset_id)
+        assert caches["default"].get(ARCHIVE_SCHEDULED_KEY.format(dataset_id)) is None
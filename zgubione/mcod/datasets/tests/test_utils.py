@@ -0,0 +1,36 @@
+import os
+import zipfile
+
+from mcod.datasets.utils import get_archive_resources_ids, set_archive_resources_ids
+
+
+def _create_archive(path, names):
+    with zipfile.ZipFile(path, "w") as z:
+        for name in names:
+            z.writestr(name, b"data")
+
+
+def test_archive_resources_ids_are_read_once(tmp_path, mocker):
+    zip_path = str(tmp_path / "archive.zip")
+    _create_archive(zip_path, ["resource_a_11/file.csv", "resource_b_12/file.xlsx"])
+    zip_file = mocker.spy(zipfile, "ZipFile")
+
+    assert get_archive_resources_ids(zip_path) == ["11", "12"]
+    assert get_archive_resources_ids(zip_path) == ["11", "12"]
+    assert zip_file.call_count == 1
+
+
+def test_archive_resources_ids_of_new_archive(tmp_path):
+    zip_path = str(tmp_path / "archive_1.zip")
+    symlink_path = str(tmp_path / "archive.zip")
+    _create_archive(zip_path, ["resource_a_11/file.csv"])
+    os.symlink(zip_path, symlink_path)
+    assert get_archive_resources_ids(symlink_path) == ["11"]
+
+    new_zip_path = str(tmp_path / "archive_2.zip")
+    _create_archive(new_zip_path, ["resource_a_11/file.csv", "resource_b_12/file.xlsx"])
+    set_archive_resources_ids(new_zip_path, ["11", "12"])
+    os.remove(symlink_path)
+    os.symlink(new_zip_path, symlink_path)
+
+    assert get_archive_resources_ids(symlink_path) == ["11", "12"]
@@ -1,5 +1,8 @@
 import os
-from typing import TYPE_CHECKING
+import zipfile
+from typing import TYPE_CHECKING, List
+
+from django.core.cache import caches
 
 from mcod import settings
 
@@ -34,3 +37,31 @@ def create_archive_file_path(filename: str, dataset: "Dataset") -> str:
     storage_location = dataset.archived_resources_files.storage.location
     full_file_name = dataset.archived_resources_files.field.generate_filename(dataset, filename)
     return str(os.path.join(storage_location, full_file_name))
+
+
+ARCHIVE_RESOURCES_IDS_CACHE_KEY = "dataset-archive-resources-ids:{}:{}"
+ARCHIVE_RESOURCES_IDS_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+
+
+def _get_archive_cache_key(zip_path: str) -> str:
+    # archive is never modified in place (a new file is created), so the key is valid as long as the file exists.
+    real_path = os.path.realpath(zip_path)
+    return ARCHIVE_RESOURCES_IDS_CACHE_KEY.format(real_path, os.stat(real_path).st_mtime_ns)
+
+
+def set_archive_resources_ids(zip_path: str, resources_ids: List[str]) -> None:
+    caches["default"].set(_get_archive_cache_key(zip_path), resources_ids, timeout=ARCHIVE_RESOURCES_IDS_CACHE_TIMEOUT)
+
+
+def get_archive_resources_ids(zip_path: str) -> List[str]:
+    """
+    Returns ids of resources (one per archived file) of the archive file, so the download of the archive
+    can be counted without reading the central directory of the ZIP file on every request.
+    """
+    key = _get_archive_cache_key(zip_path)
+    resources_ids = caches["default"].get(key)
+    if resources_ids is None:
+        with zipfile.ZipFile(zip_path) as z:
+            resources_ids = [os.path.dirname(x).split("_")[-1] for x in z.namelist()]
+        caches["default"].set(key, resources_ids, timeout=ARCHIVE_RESOURCES_IDS_CACHE_TIMEOUT)
+    return resources_ids
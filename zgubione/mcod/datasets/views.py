@@ -10,6 +10,7 @@ from django.utils.translation import get_language
 from django.views import View
 from elasticsearch_dsl import A, Q
 
+from mcod.core.api.files import send_file
 from mcod.core.api.handlers import (
     BaseHdlr,
     CreateOneHdlr,
@@ -205,13 +206,8 @@ class CSVMetadataView(BaseView):
     class GETCatalog(BaseHdlr):
 
         def serialize(self, *args, **kwargs):
-            try:
-                with open(f"{settings.METADATA_MEDIA_ROOT}/{get_language()}/katalog.csv", "rb") as f:
-                    catalog_file = f.read()
-            except FileNotFoundError:
-                raise falcon.HTTPNotFound
-            self.response.downloadable_as = "katalog.csv"
-            return catalog_file
+            path = f"{settings.METADATA_MEDIA_ROOT}/{get_language()}/katalog.csv"
+            send_file(self.request, self.response, path, filename="katalog.csv")
 
     def set_content_type(self, resp, **kwargs):
         return settings.EXPORT_FORMAT_TO_MIMETYPE["csv"]
@@ -233,13 +229,8 @@ class XMLMetadataView(BaseView):
     class GETCatalog(BaseHdlr):
 
         def serialize(self, *args, **kwargs):
-            try:
-                with open(f"{settings.METADATA_MEDIA_ROOT}/{get_language()}/katalog.xml", "rb") as f:
-                    catalog_file = f.read()
-            except FileNotFoundError:
-                raise falcon.HTTPNotFound
-            self.response.downloadable_as = "katalog.xml"
-            return catalog_file
+            path = f"{settings.METADATA_MEDIA_ROOT}/{get_language()}/katalog.xml"
+            send_file(self.request, self.response, path, filename="katalog.xml")
 
     def set_content_type(self, resp, **kwargs):
         return settings.EXPORT_FORMAT_TO_MIMETYPE["xml"]
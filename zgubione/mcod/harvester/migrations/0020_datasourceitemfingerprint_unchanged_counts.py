@@ -0,0 +1,51 @@
+# Generated by Django 2.2.9 on 2026-10-17 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("harvester", "0019_auto_20250903_0912"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="datasourceimport",
+            name="datasets_unchanged_count",
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name="number of unchanged datasets"),
+        ),
+        migrations.AddField(
+            model_name="datasourceimport",
+            name="resources_unchanged_count",
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name="number of unchanged resources"),
+        ),
+        migrations.CreateModel(
+            name="DataSourceItemFingerprint",
+            fields=[
+                ("id", models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("dataset_ext_ident", models.CharField(max_length=36, verbose_name="external identifier of dataset")),
+                (
+                    "resource_ext_ident",
+                    models.CharField(blank=True, max_length=36, verbose_name="external identifier of resource"),
+                ),
+                ("fingerprint", models.CharField(max_length=64, verbose_name="fingerprint")),
+                ("modified", models.DateTimeField(verbose_name="modified")),
+                (
+                    "datasource",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fingerprints",
+                        to="harvester.DataSource",
+                        verbose_name="data source",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "harvested item fingerprint",
+                "verbose_name_plural": "harvested items fingerprints",
+                "unique_together": {("datasource", "dataset_ext_ident", "resource_ext_ident")},
+            },
+        ),
+    ]
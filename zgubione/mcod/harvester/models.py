@@ -1,6 +1,6 @@
 import logging
 import os
-from collections import defaultdict
+from collections import Counter, defaultdict
 from io import BytesIO
 from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlencode
@@ -51,7 +51,7 @@ from mcod.harvester.ckan_utils import (
 )
 from mcod.harvester.exceptions import CKANPartialValidationException
 from mcod.harvester.managers import DataSourceManager
-from mcod.harvester.utils import make_request, retrieve_to_file
+from mcod.harvester.utils import get_item_fingerprint, make_request, retrieve_to_file
 from mcod.lib.exceptions import NoResponseException
 from mcod.lib.metadata_validators import (
     validate_conflicting_high_value_data_flags,
@@ -104,6 +104,9 @@ FREQUENCY_CHOICES = (
     (90, _("every quarter")),
 )
 
+# changing the version makes the next imports update all harvested items.
+FINGERPRINT_VERSION = 1
+
 STATUS_OK = "ok"
 STATUS_OK_PARTIAL = "ok-partial"
 STATUS_ERROR = "error"
@@ -383,55 +386,149 @@ class DataSource(AdminMixin, LogMixin, SoftDeletableModel, TimeStampedModel):
         return count
 
     def update_from_items(self, data):
-        ds_imported = 0
-        ds_created = 0
-        ds_updated = 0
-        r_imported = 0
-        r_created = 0
-        r_updated = 0
+        """
+        Saves harvested items, skipping datasets and resources which haven't changed since the last import
+        (their fingerprints are the same as the saved ones). Returns numbers of imported, created, updated
+        and unchanged datasets and resources.
+        """
+        stats = Counter()
+        fingerprints = self._get_fingerprints()
+        existing_datasets = dict(self.dataset_model.raw.filter(source=self).values_list("ext_ident", "id"))
+        existing_resources = set(
+            self.resource_model.raw.filter(dataset__source=self).values_list("dataset__ext_ident", "ext_ident")
+        )
+        context = self._get_fingerprint_context()
+        new_fingerprints = {}
         for item in data:
-            category = self._get_dataset_category(item)
-            categories = self._get_dataset_categories(category, item)
+            resources_data = item.pop("resources")
+            dataset_ext_ident = item["ext_ident"]
+            fingerprint = get_item_fingerprint(item, **context)
+            resource_context = {"dataset_status": item.get("status", "published"), **context}
+            stats["ds_imported"] += 1
+            if fingerprints.get((dataset_ext_ident, "")) == fingerprint and dataset_ext_ident in existing_datasets:
+                stats["ds_unchanged"] += 1
+                dataset = None  # fetched only if some of its resources changed.
+            else:
+                dataset, created = self._update_dataset_from_item(item)
+                if not dataset:
+                    continue
+                stats["ds_created" if created else "ds_updated"] += 1
+                new_fingerprints[(dataset_ext_ident, "")] = fingerprint
+
+            for rd in resources_data:
+                key = (dataset_ext_ident, rd["ext_ident"])
+                fingerprint = get_item_fingerprint(rd, **resource_context)
+                stats["r_imported"] += 1
+                if fingerprints.get(key) == fingerprint and key in existing_resources:
+                    stats["r_unchanged"] += 1
+                    continue
+                if dataset is None:
+                    dataset = self.dataset_model.raw.get(id=existing_datasets[dataset_ext_ident])
+                supplements = rd.pop("supplements", [])
+                resource, created = self._update_or_create_resource(dataset, rd)
+                if resource:
+                    stats["r_created" if created else "r_updated"] += 1
+                    self._update_or_create_supplements(resource, supplements)
+                    new_fingerprints[key] = fingerprint
+        self._save_fingerprints(new_fingerprints)
+        return tuple(
+            stats[key]
+            for key in (
+                "ds_imported",
+                "ds_created",
+                "ds_updated",
+                "ds_unchanged",
+                "r_imported",
+                "r_created",
+                "r_updated",
+                "r_unchanged",
+            )
+        )
 
-            license = self._get_license(item)
-            license_condition_db_or_copyrighted = self._get_license_condition_db_or_copyrighted(item)
-            license_chosen = self._get_license_chosen(item)
+    def _update_dataset_from_item(self, item):
+        category = self._get_dataset_category(item)
+        categories = self._get_dataset_categories(category, item)
+
+        license = self._get_license(item)
+        license_condition_db_or_copyrighted = self._get_license_condition_db_or_copyrighted(item)
+        license_chosen = self._get_license_chosen(item)
+
+        organization = self._get_organization(item)
+        tags = self._prepare_tags(item)
+        item.update(
+            {
+                "category": category,
+                "source": self,
+                "organization": organization,
+                "license": license,
+                "license_condition_db_or_copyrighted": license_condition_db_or_copyrighted,
+                "license_chosen": license_chosen,
+            }
+        )
+        dataset, created = self._update_or_create_dataset(item)
+        if dataset:
+            dataset.tags.set(tags)
+            dataset.categories.set(categories)
+        return dataset, created
+
+    def _get_fingerprint_context(self):
+        """Settings of the data source which affect how harvested items are saved."""
+        return {
+            "version": FINGERPRINT_VERSION,
+            "category": self.category_id,
+            "categories": sorted(self.categories.values_list("id", flat=True)),
+            "organization": self.organization_id,
+            "institution_type": self.institution_type,
+            "license_condition_db_or_copyrighted": self.license_condition_db_or_copyrighted,
+            "xsd_schema_version": getattr(self, "xsd_schema_version", None),
+        }
 
-            organization = self._get_organization(item)
-            tags = self._prepare_tags(item)
-            resources_data = item.pop("resources")
-            item.update(
-                {
-                    "category": category,
-                    "source": self,
-                    "organization": organization,
-                    "license": license,
-                    "license_condition_db_or_copyrighted": license_condition_db_or_copyrighted,
-                    "license_chosen": license_chosen,
-                }
+    def _get_fingerprints(self):
+        return {
+            (dataset_ext_ident, resource_ext_ident): fingerprint
+            for dataset_ext_ident, resource_ext_ident, fingerprint in self.fingerprints.values_list(
+                "dataset_ext_ident", "resource_ext_ident", "fingerprint"
             )
-            dataset, created = self._update_or_create_dataset(item)
-            ds_imported += 1
-            if dataset:
-                if created:
-                    ds_created += 1
-                else:
-                    ds_updated += 1
-
-                dataset.tags.set(tags)
-                dataset.categories.set(categories)
-
-                for rd in resources_data:
-                    supplements = rd.pop("supplements", [])
-                    resource, created = self._update_or_create_resource(dataset, rd)
-                    r_imported += 1
-                    if resource:
-                        if created:
-                            r_created += 1
-                        else:
-                            r_updated += 1
-                        self._update_or_create_supplements(resource, supplements)
-        return ds_imported, ds_created, ds_updated, r_imported, r_created, r_updated
+        }
+
+    def _save_fingerprints(self, fingerprints):
+        if not fingerprints:
+            return
+        now = timezone.now()
+        existing = {
+            (obj.dataset_ext_ident, obj.resource_ext_ident): obj
+            for obj in self.fingerprints.filter(dataset_ext_ident__in={key[0] for key in fingerprints})
+        }
+        to_update, to_create = [], []
+        for (dataset_ext_ident, resource_ext_ident), fingerprint in fingerprints.items():
+            obj = existing.get((dataset_ext_ident, resource_ext_ident))
+            if obj:
+                obj.fingerprint, obj.modified = fingerprint, now
+                to_update.append(obj)
+            else:
+                to_create.append(
+                    DataSourceItemFingerprint(
+                        datasource=self,
+                        dataset_ext_ident=dataset_ext_ident,
+                        resource_ext_ident=resource_ext_ident,
+                        fingerprint=fingerprint,
+                        modified=now,
+                    )
+                )
+        DataSourceItemFingerprint.objects.bulk_update(to_update, ["fingerprint", "modified"], batch_size=1000)
+        DataSourceItemFingerprint.objects.bulk_create(to_create, batch_size=1000)
+
+    def delete_stale_fingerprints(self, data):
+        keys = {(dataset_ext_ident, "") for dataset_ext_ident, _ in data}
+        keys.update((dataset_ext_ident, ext_ident) for dataset_ext_ident, ext_idents in data for ext_ident in ext_idents)
+        stale_ids = [
+            pk
+            for pk, dataset_ext_ident, resource_ext_ident in self.fingerprints.values_list(
+                "pk", "dataset_ext_ident", "resource_ext_ident"
+            )
+            if (dataset_ext_ident, resource_ext_ident) not in keys
+        ]
+        DataSourceItemFingerprint.objects.filter(pk__in=stale_ids).delete()
 
     def _update_or_create_dataset(self, data):
         data.update({"created_by": self.import_user, "status": data.get("status", "published")})
@@ -1163,21 +1260,33 @@ class DataSource(AdminMixin, LogMixin, SoftDeletableModel, TimeStampedModel):
 
         imported_ext_idents = [self._get_ext_idents(item) for item in items]
 
-        ds_imported, ds_created, ds_updated, r_imported, r_created, r_updated = self.update_from_items(items)
+        (
+            ds_imported,
+            ds_created,
+            ds_updated,
+            ds_unchanged,
+            r_imported,
+            r_created,
+            r_updated,
+            r_unchanged,
+        ) = self.update_from_items(items)
 
         r_deleted = 0
         ds_deleted = 0
         if not dsi.is_failed:
             r_deleted = self.delete_stale_resources(imported_ext_idents)
             ds_deleted = self.delete_stale_datasets(imported_ext_idents)
+            self.delete_stale_fingerprints(imported_ext_idents)
         dsi.datasets_count = ds_imported
         dsi.datasets_created_count = ds_created
         dsi.datasets_updated_count = ds_updated
+        dsi.datasets_unchanged_count = ds_unchanged
         dsi.datasets_deleted_count = ds_deleted
         dsi.datasets_rejected_count = ds_rejected
         dsi.resources_count = r_imported
         dsi.resources_created_count = r_created
         dsi.resources_updated_count = r_updated
+        dsi.resources_unchanged_count = r_unchanged
         dsi.resources_deleted_count = r_deleted
         dsi.end = timezone.now()
         dsi.save()
@@ -1214,10 +1323,14 @@ class DataSourceImport(TimeStampedModel):
     datasets_count = models.PositiveIntegerField(verbose_name=_("number of imported datasets"), null=True, blank=True)
     datasets_created_count = models.PositiveIntegerField(verbose_name=_("number of created datasets"), null=True, blank=True)
     datasets_updated_count = models.PositiveIntegerField(verbose_name=_("number of updated datasets"), null=True, blank=True)
+    datasets_unchanged_count = models.PositiveIntegerField(verbose_name=_("number of unchanged datasets"), null=True, blank=True)
     datasets_deleted_count = models.PositiveIntegerField(verbose_name=_("number of deleted datasets"), null=True, blank=True)
     resources_count = models.PositiveIntegerField(verbose_name=_("number of imported resources"), null=True, blank=True)
     resources_created_count = models.PositiveIntegerField(verbose_name=_("number of created resources"), null=True, blank=True)
     resources_updated_count = models.PositiveIntegerField(verbose_name=_("number of updated resources"), null=True, blank=True)
+    resources_unchanged_count = models.PositiveIntegerField(
+        verbose_name=_("number of unchanged resources"), null=True, blank=True
+    )
     resources_deleted_count = models.PositiveIntegerField(verbose_name=_("number of deleted resources"), null=True, blank=True)
     is_report_email_sent = models.BooleanField(verbose_name=_("Is report email sent?"), default=False)
 
@@ -1254,3 +1367,25 @@ class DataSourceImport(TimeStampedModel):
             using=using,
             update_fields=update_fields,
         )
+
+
+class DataSourceItemFingerprint(models.Model):
+    """Hash of the harvested dataset or resource saved by the last import which changed it."""
+
+    datasource = models.ForeignKey(
+        DataSource,
+        on_delete=models.CASCADE,
+        related_name="fingerprints",
+        verbose_name=_("data source"),
+    )
+    dataset_ext_ident = models.CharField(max_length=36, verbose_name=_("external identifier of dataset"))
+    resource_ext_ident = models.CharField(
+        max_length=36, blank=True, verbose_name=_("external identifier of resource")
+    )  # empty for datasets.
+    fingerprint = models.CharField(max_length=64, verbose_name=_("fingerprint"))
+    modified = models.DateTimeField(verbose_name=_("modified"))
+
+    class Meta:
+        verbose_name = _("harvested item fingerprint")
+        verbose_name_plural = _("harvested items fingerprints")
+        unique_together = ("datasource", "dataset_ext_ident", "resource_ext_ident")
@@ -928,6 +928,9 @@ class DataSourceImportsCSVSchema(DataSourceCSVSchema):
     datasource_import_datasets_updated_count = fields.Integer(
         attribute="imports__datasets_updated_count", data_key=_("Import - number of updated datasets"), default=0
     )
+    datasource_import_datasets_unchanged_count = fields.Integer(
+        attribute="imports__datasets_unchanged_count", data_key=_("Import - number of unchanged datasets"), default=0
+    )
     datasource_import_datasets_deleted_count = fields.Integer(
         attribute="imports__datasets_deleted_count", data_key=_("Import - number of deleted datasets"), default=0
     )
@@ -940,6 +943,9 @@ class DataSourceImportsCSVSchema(DataSourceCSVSchema):
     datasource_import_resources_updated_count = fields.Integer(
         attribute="imports__resources_updated_count", data_key=_("Import - number of updated resources"), default=0
     )
+    datasource_import_resources_unchanged_count = fields.Integer(
+        attribute="imports__resources_unchanged_count", data_key=_("Import - number of unchanged resources"), default=0
+    )
     datasource_import_resources_deleted_count = fields.Integer(
         attribute="imports__resources_deleted_count", data_key=_("Import - number of deleted resources"), default=0
     )
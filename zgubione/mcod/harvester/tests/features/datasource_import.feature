@@ -5,6 +5,12 @@ Feature: Datasource import
     When ckan datasource with id 100 finishes importing objects using harvester_ckan_import_example.json
     Then ckan datasource with id 100 created all data in db
 
+  Scenario: CKAN datasets and resources not changed since the last import are skipped
+    Given active ckan_datasource with id 100 for data {"portal_url": "http://mock-portal.pl", "api_url": "http://api.mock-portal.pl/items"}
+    When ckan datasource with id 100 finishes importing objects using harvester_ckan_import_example.json
+    And ckan datasource with id 100 finishes importing objects using harvester_ckan_import_example.json
+    Then last import of datasource with id 100 has 1 unchanged datasets and 2 unchanged resources
+
   Scenario: CKAN resources are properly imported with has_ metadata
     Given active ckan_datasource_no_private_institution with id 100 for data {"portal_url": "http://mock-portal.pl", "api_url": "http://api.mock-portal.pl/items"}
     When ckan datasource with id 100 finishes importing objects using harvester_ckan_import_example_with_has_metadata.json
@@ -0,0 +1,39 @@
+import hashlib
+import os
+
+import requests_mock
+from django.conf import settings
+
+from mcod.harvester.utils import decode_xml, fetch_xml_data, get_xml_as_dict, get_xml_schema
+
+XML_PATH = os.path.join(settings.TEST_SAMPLES_PATH, "harvester", "import_example1.13.xml")
+
+
+def test_xml_schema_is_compiled_once():
+    assert get_xml_schema("1.13") is get_xml_schema("1.13")
+
+
+def test_decode_xml_decodes_datasets_iteratively():
+    data = decode_xml(XML_PATH)
+
+    assert data["xsd_schema_version"] == "1.13"
+    assert data["dataset"] == get_xml_as_dict(XML_PATH, "1.13")["dataset"]
+
+
+def test_fetch_xml_data_downloads_xml_once(mocker):
+    url = "https://mock-portal.pl/datasets.xml"
+    with open(XML_PATH, "rb") as xml_file:
+        content = xml_file.read()
+    remove = mocker.spy(os, "remove")
+    with requests_mock.Mocker() as m:
+        m.head(url, headers={"Content-Type": "application/xml"})
+        m.get(url, content=content)
+        m.get("https://mock-portal.pl/datasets.md5", text=hashlib.md5(content).hexdigest())
+
+        data = fetch_xml_data(url)
+
+        assert [request.method for request in m.request_history if request.url == url] == ["HEAD", "GET"]
+    assert data.xsd_schema_version == "1.13"
+    assert len(data) == 1
+    downloaded_path = remove.call_args.args[0]
+    assert not os.path.exists(downloaded_path)
@@ -1,10 +1,12 @@
+import datetime
 import json
 import logging
 import os
 import re
 import ssl
 import tempfile
-from hashlib import md5
+from functools import lru_cache
+from hashlib import md5, sha256
 from urllib.parse import unquote
 from urllib.request import Request, urlopen
 from xml.etree import ElementTree
@@ -12,6 +14,7 @@ from xml.etree import ElementTree
 import requests
 import xmlschema
 from django.core.exceptions import ValidationError
+from django.db import models
 from django.utils.translation import gettext_lazy as _
 from rdflib.plugins.stores.sparqlstore import SPARQLStore
 
@@ -62,13 +65,18 @@ def fetch_data(url):
     return data["results"] if "results" in data else data
 
 
+def _get_xml_root_tag(xml_path):
+    for _event, element in ElementTree.iterparse(xml_path, events=("start",)):
+        return element.tag
+
+
 def get_xml_schema_version(*, xml_path=None, xml_url=None):
     if xml_url:
-        root = ElementTree.fromstring(requests.get(xml_url, **settings.HTTP_REQUEST_DEFAULT_PARAMS).text)
+        root_tag = ElementTree.fromstring(requests.get(xml_url, **settings.HTTP_REQUEST_DEFAULT_PARAMS).text).tag
     else:
-        root = ElementTree.parse(xml_path).getroot()
+        root_tag = _get_xml_root_tag(xml_path)  # the rest of the document isn't parsed.
 
-    version_match = re.search(r"{urn:otwarte-dane:harvester:(.*)}", root.tag)
+    version_match = re.search(r"{urn:otwarte-dane:harvester:(.*)}", root_tag)
     if not version_match:
         raise Exception("Nie znaleziono informacji o wersji użytego schematu XSD")
 
@@ -89,8 +97,14 @@ def get_xml_schema_path(version):
     return settings.HARVESTER_XML_VERSION_TO_SCHEMA_PATH[version]
 
 
+@lru_cache(maxsize=None)
+def _get_compiled_xml_schema(path):
+    return xmlschema.XMLSchema(path)
+
+
 def get_xml_schema(version):
-    return xmlschema.XMLSchema(get_xml_schema_path(version))
+    """Returns XSD schema of the version, compiled once per process."""
+    return _get_compiled_xml_schema(get_xml_schema_path(version))
 
 
 def get_xml_as_dict(source, version):
@@ -100,17 +114,31 @@ def get_xml_as_dict(source, version):
     return data
 
 
-def decode_xml(url):
-    version = get_xml_schema_version(xml_url=url)
-    return get_xml_as_dict(url, version)
+def iter_xml_datasets(xml_path, version):
+    """
+    Yields decoded `dataset` elements of the XML file one by one - the file is read lazily,
+    so the whole document is never kept in memory.
+    """
+    schema = get_xml_schema(version)
+    resource = xmlschema.XMLResource(xml_path, lazy=True)
+    yield from schema.iter_decode(resource, path="dataset", validation="strict")
+
+
+def decode_xml(xml_path):
+    version = get_xml_schema_version(xml_path=xml_path)
+    return {"dataset": list(iter_xml_datasets(xml_path, version)), "xsd_schema_version": version}
 
 
 def fetch_xml_data(url):
+    xml_path = None
     try:
-        validate_xml_url(url)
-        data = decode_xml(url)
+        xml_path, xml_hash = validate_xml_url(url)
+        data = decode_xml(xml_path)  # decoded from the file downloaded during validation.
     except Exception as exc:
         raise Exception(f"XML Validation error!\n{exc}")
+    finally:
+        if xml_path:
+            os.remove(xml_path)
 
     result = ExtendedList(data["dataset"]) if isinstance(data, dict) and "dataset" in data else None
     result.xsd_schema_version = data["xsd_schema_version"]
@@ -126,10 +154,11 @@ def mock_data(url):
 
 def validate_xml(xml_path, boolean_result=False):
     xml_schema = get_xml_schema(get_xml_schema_version(xml_path=xml_path))
+    resource = xmlschema.XMLResource(xml_path, lazy=True)
     if boolean_result:
-        return xml_schema.is_valid(xml_path)
+        return xml_schema.is_valid(resource)
     try:
-        xml_schema.validate(xml_path)
+        xml_schema.validate(resource)
     except Exception as exc:
         raise Exception(str(exc))
 
@@ -183,6 +212,17 @@ def retrieve_to_file(url):
     return tmp_file.name, response.headers
 
 
+def download_xml(url):
+    """Downloads the XML file to a temporary file, returns path of the file and its MD5 hash."""
+    response = make_request(url)
+    xml_hash = md5()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".xml") as tmp_file:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            tmp_file.write(chunk)
+            xml_hash.update(chunk)
+    return tmp_file.name, xml_hash.hexdigest()
+
+
 def validate_md5(filename, remote_xml_hash):
     m = md5()
     with open(filename, "rb") as fp:
@@ -194,17 +234,49 @@ def validate_md5(filename, remote_xml_hash):
     return xml_hash
 
 
+def _fingerprint_value(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if isinstance(value, models.Model):
+        return f"{value._meta.label}:{value.pk}"
+    if hasattr(value, "read") and hasattr(value, "seek"):  # downloaded content of supplement.
+        position = value.tell()
+        content = value.read()
+        value.seek(position)
+        return md5(content if isinstance(content, bytes) else content.encode()).hexdigest()
+    return str(value)  # e.g. decimals, lazy translations.
+
+
+def get_item_fingerprint(item, **context):
+    """
+    Returns stable hash of the harvested item (dataset without resources or resource) and of the context
+    of the import (settings of the data source) which affects how the item is saved.
+    """
+    payload = json.dumps({"item": item, "context": context}, sort_keys=True, default=_fingerprint_value)
+    return sha256(payload.encode()).hexdigest()
+
+
 def validate_xml_url(url):
+    """
+    Validates the XML file available under the url. The file is downloaded only once - returns path
+    of the downloaded file (to be removed by the caller) and its MD5 hash.
+    """
+    filename = None
     try:
         check_xml_filename(url)
         headers = get_xml_headers(url)
         check_content_type(headers)
         xml_hash_url, remote_hash = get_remote_xml_hash(url)
-        filename, headers = retrieve_to_file(url)
-        xml_hash = validate_md5(filename, remote_hash)
+        filename, xml_hash = download_xml(url)
+        if xml_hash != remote_hash:
+            raise Exception(_("Remote MD5 hash is not valid!"))
         validate_xml(filename)
 
     except Exception as exc:
+        if filename:
+            os.remove(filename)
         raise ValidationError({"xml_url": str(exc)})
     return filename, xml_hash
 
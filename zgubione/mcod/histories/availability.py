@@ -0,0 +1,170 @@
+"""
+History of availability (publication) of resources used by the statistics of `fill_kibana_history_data` command.
+
+A resource is available if it's published and not removed. The history is derived from log entries of resources,
+which are applied in order of their ids (keyset pagination) to the `ResourceAvailabilityState` of the resource.
+Periods of availability are stored as `ResourceAvailabilityPeriod` rows. The id of the last applied log entry
+is the high-water mark of the next update, so every update reads only log entries created since the previous one.
+
+Ids of log entries are assigned before their transactions are committed, so an entry with a lower id may become
+visible after an entry with a higher id was already applied - and it would be skipped by the high-water mark.
+That's why only log entries older than `RESOURCES_AVAILABILITY_LAG` minutes are applied: the update stops
+at the first (in order of ids) entry which is too new, and it's applied by one of the next updates.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import caches
+from django.db.models import Max
+from django.db.transaction import atomic
+from django.utils import timezone
+
+logger = logging.getLogger("mcod")
+
+AVAILABILITY_LOCK_KEY = "resources-availability-lock"
+AVAILABILITY_LOCK_TIMEOUT = 2 * 60 * 60
+
+
+def is_significant(status, is_removed) -> bool:
+    return status == "published" and is_removed is False
+
+
+class _AvailabilityUpdate:
+    """Applies a batch of log entries to the states and periods of availability of their resources."""
+
+    def __init__(self, resources_ids):
+        self.State = apps.get_model("histories", "ResourceAvailabilityState")
+        self.Period = apps.get_model("histories", "ResourceAvailabilityPeriod")
+        self.states = {state.resource_id: state for state in self.State.objects.filter(resource_id__in=resources_ids)}
+        self.new_states = []
+        # the latest period of every resource - the only one which may be changed.
+        self.periods = {
+            period.resource_id: period
+            for period in self.Period.objects.filter(resource_id__in=resources_ids)
+            .order_by("resource_id", "-published_from")
+            .distinct("resource_id")
+        }
+        self.changed_periods = {}
+        self.deleted_periods_ids = []
+
+    def apply(self, log_entry) -> None:
+        resource_id = log_entry.object_id
+        state = self.states.get(resource_id)
+        if state is None:
+            state = self.states[resource_id] = self.State(resource_id=resource_id)
+            self.new_states.append(state)
+            if not log_entry.is_create:
+                logger.debug(f"{log_entry.get_action_display()} earlier than CREATE for resource {resource_id}")
+                state.last_log_entry_id = log_entry.id
+                return
+        state.last_log_entry_id = log_entry.id
+        day = log_entry.timestamp.date()
+        if log_entry.is_delete:
+            self._close_period(resource_id, day)
+            return
+        was_significant = not log_entry.is_create and is_significant(state.status, state.is_removed)
+        default_status, default_is_removed = ("draft", True) if log_entry.is_create else (state.status, state.is_removed)
+        state.status = log_entry.get_changed_value("status", default_status)
+        state.is_removed = log_entry.get_changed_value("is_removed", default_is_removed)
+        if is_significant(state.status, state.is_removed):
+            if not was_significant:
+                self._open_period(resource_id, day)
+        elif was_significant:
+            self._close_period(resource_id, day)
+
+    def _open_period(self, resource_id, day) -> None:
+        period = self.periods.get(resource_id)
+        if period and period.published_till is None:
+            return
+        if period and period.published_till == day:
+            period.published_till = None
+        else:
+            period = self.periods[resource_id] = self.Period(resource_id=resource_id, published_from=day)
+        self.changed_periods[id(period)] = period
+
+    def _close_period(self, resource_id, day) -> None:
+        period = self.periods.get(resource_id)
+        if not period or period.published_till is not None:
+            return
+        if period.published_from >= day:
+            # resource was available for a part of the day only.
+            del self.periods[resource_id]
+            self.changed_periods.pop(id(period), None)
+            if period.pk:
+                self.deleted_periods_ids.append(period.pk)
+        else:
+            period.published_till = day
+            self.changed_periods[id(period)] = period
+
+    def save(self) -> None:
+        new_states_ids = {id(state) for state in self.new_states}
+        updated_states = [state for state in self.states.values() if id(state) not in new_states_ids]
+        new_periods = [period for period in self.changed_periods.values() if not period.pk]
+        updated_periods = [period for period in self.changed_periods.values() if period.pk]
+        self.State.objects.bulk_create(self.new_states)
+        self.State.objects.bulk_update(updated_states, ["status", "is_removed", "last_log_entry_id"])
+        self.Period.objects.filter(pk__in=self.deleted_periods_ids).delete()
+        self.Period.objects.bulk_create(new_periods)
+        self.Period.objects.bulk_update(updated_periods, ["published_till"])
+
+
+def _apply_log_entries(log_entries: List) -> None:
+    update = _AvailabilityUpdate({log_entry.object_id for log_entry in log_entries})
+    for log_entry in sorted(log_entries, key=lambda log_entry: (log_entry.timestamp, log_entry.id)):
+        update.apply(log_entry)
+    update.save()
+
+
+def update_resources_availability(blocking: bool = True) -> int:
+    """
+    Applies log entries of resources created since the last update to the history of availability of resources.
+    Log entries younger than `RESOURCES_AVAILABILITY_LAG` minutes (and all following them) are left for the next update.
+    Returns number of applied log entries.
+    """
+    LogEntry = apps.get_model("histories", "LogEntry")
+    State = apps.get_model("histories", "ResourceAvailabilityState")
+    lock = caches["default"].lock(AVAILABILITY_LOCK_KEY, timeout=AVAILABILITY_LOCK_TIMEOUT)
+    if not lock.acquire(blocking=blocking):
+        logger.info("Resources availability is being updated by another task, skipping.")
+        return 0
+    try:
+        resource_type = ContentType.objects.get(app_label="resources", model="resource")
+        log_entries = LogEntry.objects.filter(content_type_id=resource_type.pk, object_id__isnull=False).only(
+            "id", "object_id", "action", "changes", "timestamp"
+        )
+        last_id = State.objects.aggregate(last_id=Max("last_log_entry_id"))["last_id"] or 0
+        max_timestamp = timezone.now() - timedelta(minutes=settings.RESOURCES_AVAILABILITY_LAG)
+        applied_count = 0
+        while True:
+            batch = list(log_entries.filter(id__gt=last_id).order_by("id")[: settings.RESOURCES_AVAILABILITY_BATCH_SIZE])
+            too_new = next((i for i, log_entry in enumerate(batch) if log_entry.timestamp >= max_timestamp), None)
+            if too_new is not None:
+                batch = batch[:too_new]
+            if batch:
+                with atomic():
+                    _apply_log_entries(batch)
+                last_id = batch[-1].id
+                applied_count += len(batch)
+            if too_new is not None or len(batch) < settings.RESOURCES_AVAILABILITY_BATCH_SIZE:
+                break
+        logger.debug(f"{applied_count} log entries applied to the resources availability history.")
+        return applied_count
+    finally:
+        lock.release()
+
+
+def get_resources_availability_dict() -> Dict[int, Dict[str, int]]:
+    """Returns dates of changes of availability of resources: {resource_id: {date: 1 (available) or 0}}."""
+    Period = apps.get_model("histories", "ResourceAvailabilityPeriod")
+    d = defaultdict(dict)
+    for period in Period.objects.order_by("resource_id", "published_from").iterator(chunk_size=10000):
+        d[period.resource_id][period.published_from.strftime("%Y-%m-%d")] = 1
+        if period.published_till:
+            d[period.resource_id][period.published_till.strftime("%Y-%m-%d")] = 0
+    return d
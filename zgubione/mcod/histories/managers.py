@@ -3,9 +3,12 @@ import time
 from collections import defaultdict
 
 from auditlog.models import LogEntryManager as BaseLogEntryManager
-from django.contrib.contenttypes.models import ContentType
-from django.core.paginator import Paginator
-from django.db.models import Manager
+from django.db.models import Manager, Q
+
+from mcod.histories.availability import (
+    get_resources_availability_dict,
+    update_resources_availability,
+)
 
 logger = logging.getLogger("mcod")
 
@@ -21,42 +24,38 @@ class HistoryManager(Manager):
         status = None
         is_removed = None
         h = self.filter(table_name="resource").order_by("row_id", "change_timestamp")
-        p = Paginator(h, 10000)
-        logger.debug("num_pages {}".format(p.num_pages))
         last_row_id = None
-        for page_nr in p.page_range:
-            start = time.perf_counter()
-            for i, history in enumerate(p.page(page_nr)):
-                date_str = history.change_timestamp.date().strftime("%Y-%m-%d")
-                key = history.row_id
-                inner_key = date_str
-                if last_row_id != history.row_id:
-                    last_row_id = history.row_id
-                    status = None
-                    is_removed = None
-                    assert history.action == "INSERT"
-                if history.action == "INSERT":
-                    status = history.new_value.get("status", "draft")
-                    is_removed = history.new_value.get("is_removed", True)
-                    old_is_significant = self.is_significant(status, is_removed)
-                    if old_is_significant:
+        start = time.perf_counter()
+        for history in h.iterator(chunk_size=10000):
+            date_str = history.change_timestamp.date().strftime("%Y-%m-%d")
+            key = history.row_id
+            inner_key = date_str
+            if last_row_id != history.row_id:
+                last_row_id = history.row_id
+                status = None
+                is_removed = None
+                assert history.action == "INSERT"
+            if history.action == "INSERT":
+                status = history.new_value.get("status", "draft")
+                is_removed = history.new_value.get("is_removed", True)
+                old_is_significant = self.is_significant(status, is_removed)
+                if old_is_significant:
+                    d[key][inner_key] = 1
+            elif history.action == "UPDATE":
+                old_is_significant = self.is_significant(status, is_removed)
+                new_status = history.new_value.get("status", status)
+                new_is_removed = history.new_value.get("is_removed", is_removed)
+                new_is_significant = self.is_significant(new_status, new_is_removed)
+                if old_is_significant != new_is_significant:
+                    if new_is_significant:
                         d[key][inner_key] = 1
-                elif history.action == "UPDATE":
-                    old_is_significant = self.is_significant(status, is_removed)
-                    new_status = history.new_value.get("status", status)
-                    new_is_removed = history.new_value.get("is_removed", is_removed)
-                    new_is_significant = self.is_significant(new_status, new_is_removed)
-                    if old_is_significant != new_is_significant:
-                        if new_is_significant:
-                            d[key][inner_key] = 1
-                        else:
-                            d[key][inner_key] = 0
-                    status = new_status
-                    is_removed = new_is_removed
-                elif history.action == "DELETE":
-                    d[key][inner_key] = -1
-            end = time.perf_counter()
-            logger.debug("page_nr {}, time {}".format(page_nr, end - start))
+                    else:
+                        d[key][inner_key] = 0
+                status = new_status
+                is_removed = new_is_removed
+            elif history.action == "DELETE":
+                d[key][inner_key] = -1
+        logger.debug("time {}".format(time.perf_counter() - start))
         return d
 
     def get_history_other(
@@ -110,62 +109,20 @@ class LogEntryManager(BaseLogEntryManager):
         models = [x for x in models if x not in exclude_models]
         return self.get_queryset().filter(content_type__model__in=models).select_related("content_type")
 
-    @staticmethod
-    def is_significant(status, is_removed):
-        return status == "published" and is_removed is False
+    def resources_availability_as_dict(self):
+        """
+        Returns dates of changes of availability of resources ({resource_id: {date: 1 or 0}}),
+        updating the availability history with log entries created since the last update first.
+        """
+        update_resources_availability()
+        return get_resources_availability_dict()
 
-    def get_availability_status(self, d, log_entry, object_id, dt, status, is_removed):
-        if log_entry.is_create:
-            status = log_entry.get_changed_value("status", "draft")
-            is_removed = log_entry.get_changed_value("is_removed", True)
-            old_is_significant = self.is_significant(status, is_removed)
-            if old_is_significant:
-                d[object_id][dt] = 1
-        elif log_entry.is_update:
-            old_is_significant = self.is_significant(status, is_removed)
-            new_status = log_entry.get_changed_value("status", status)
-            new_is_removed = log_entry.get_changed_value("is_removed", is_removed)
-            new_is_significant = self.is_significant(new_status, new_is_removed)
-            if old_is_significant != new_is_significant:
-                if new_is_significant:
-                    d[object_id][dt] = 1
-                else:
-                    d[object_id][dt] = 0
-            status = new_status
-            is_removed = new_is_removed
-        elif log_entry.is_delete:
-            d[object_id][dt] = -1
-        return status, is_removed
 
-    def resources_availability_as_dict(self):
-        d = defaultdict(dict)
-        status = None
-        is_removed = None
-        resource_type = ContentType.objects.get(app_label="resources", model="resource")
-        entries = self.filter(content_type_id=resource_type.pk).order_by("object_id", "timestamp")
-        p = Paginator(entries, 10000)
-        logger.debug("num_pages {}".format(p.num_pages))
-        last_row_id = None
-        for page_nr in p.page_range:
-            start = time.perf_counter()
-            for i, log_entry in enumerate(p.page(page_nr)):
-                date_str = log_entry.timestamp.date().strftime("%Y-%m-%d")
-                current_id = log_entry.object_id
-                inner_key = date_str
-                if last_row_id != log_entry.object_id:
-                    last_row_id = log_entry.object_id
-                    status = None
-                    is_removed = None
-                    try:
-                        assert log_entry.is_create
-                    except AssertionError:
-                        logger.debug(
-                            f"{log_entry.get_action_display()} earlier than" f" CREATE for resource {log_entry.object_id}"
-                        )
-                        logger.debug(f"Timestamp: {log_entry.timestamp}")
-                        logger.debug(f"Changes: {log_entry.changes}")
-                        continue
-                status, is_removed = self.get_availability_status(d, log_entry, current_id, inner_key, status, is_removed)
-            end = time.perf_counter()
-            logger.debug("page_nr {}, time {}".format(page_nr, end - start))
-        return d
+class ResourceAvailabilityPeriodManager(Manager):
+
+    def published_on(self, day):
+        """Returns periods of availability of resources published (and not removed) on the day."""
+        return self.filter(Q(published_till__isnull=True) | Q(published_till__gt=day), published_from__lte=day)
+
+    def resources_published_on(self, day):
+        return self.published_on(day).values_list("resource_id", flat=True)
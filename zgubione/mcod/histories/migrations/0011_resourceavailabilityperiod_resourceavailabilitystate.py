@@ -0,0 +1,70 @@
+# Generated by Django 2.2.9 on 2026-10-17 12:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("resources", "0073_auto_20250929_0728"),
+        ("histories", "0010_delete_triggers"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResourceAvailabilityState",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("status", models.CharField(max_length=20, null=True)),
+                ("is_removed", models.BooleanField(null=True)),
+                ("last_log_entry_id", models.IntegerField(db_index=True)),
+                (
+                    "resource",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="resources.Resource",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ResourceAvailabilityPeriod",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("published_from", models.DateField()),
+                ("published_till", models.DateField(null=True)),
+                (
+                    "resource",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="resources.Resource",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="resourceavailabilityperiod",
+            index=models.Index(fields=["published_from", "published_till"], name="resource_availability_idx"),
+        ),
+    ]
@@ -17,7 +17,11 @@ from pygments.lexers.data import JsonLexer
 
 from mcod.core.api.search.helpers import get_document_for_model
 from mcod.core.api.search.tasks import delete_document_task, update_document_task
-from mcod.histories.managers import HistoryManager, LogEntryManager
+from mcod.histories.managers import (
+    HistoryManager,
+    LogEntryManager,
+    ResourceAvailabilityPeriodManager,
+)
 
 
 class History(models.Model):
@@ -227,6 +231,35 @@ class LogEntry(BaseLogEntry):
             item.save(update_fields=["timestamp"])
 
 
+class ResourceAvailabilityState(models.Model):
+    """
+    Stan zasobu (status i flaga usunięcia) wyliczony z wpisów dziennika zmian do wpisu `last_log_entry_id` włącznie.
+    Tabela jest aktualizowana przyrostowo przez `mcod.histories.availability`.
+    """
+
+    resource = models.OneToOneField("resources.Resource", on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    status = models.CharField(max_length=20, null=True)
+    is_removed = models.BooleanField(null=True)
+    last_log_entry_id = models.IntegerField(db_index=True)
+
+
+class ResourceAvailabilityPeriod(models.Model):
+    """
+    Okres, w którym zasób był opublikowany i nieusunięty - od dnia `published_from` włącznie do dnia `published_till`
+    wyłącznie (pusta data oznacza zasób nadal dostępny).
+    Tabela jest aktualizowana przyrostowo przez `mcod.histories.availability`.
+    """
+
+    resource = models.ForeignKey("resources.Resource", on_delete=models.DO_NOTHING, db_constraint=False, related_name="+")
+    published_from = models.DateField()
+    published_till = models.DateField(null=True)
+
+    objects = ResourceAvailabilityPeriodManager()
+
+    class Meta:
+        indexes = [models.Index(fields=["published_from", "published_till"], name="resource_availability_idx")]
+
+
 @receiver(post_save, sender=LogEntry)
 @receiver(post_save, sender=BaseLogEntry)
 def update_log_entry_handler(sender, instance, *args, **kwargs):
@@ -0,0 +1,7 @@
+from mcod.core.tasks import extended_shared_task
+from mcod.histories.availability import update_resources_availability
+
+
+@extended_shared_task
+def update_resources_availability_task():
+    return {"log_entries": update_resources_availability(blocking=False)}
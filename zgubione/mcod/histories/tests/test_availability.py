@@ -0,0 +1,85 @@
+import json
+from datetime import date, datetime
+
+import pytest
+import pytz
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+from mcod.histories import availability
+from mcod.histories.models import LogEntry, ResourceAvailabilityPeriod
+
+
+def create_log_entry(resource_id, action, day, **changes):
+    entry = LogEntry.objects.create(
+        content_type=ContentType.objects.get(app_label="resources", model="resource"),
+        object_pk=str(resource_id),
+        object_id=resource_id,
+        object_repr=f"resource {resource_id}",
+        action=action,
+        changes=json.dumps({field: ["None", value] for field, value in changes.items()}),
+    )
+    LogEntry.objects.filter(pk=entry.pk).update(timestamp=datetime(2024, 1, day, 12, tzinfo=pytz.utc))
+    return entry
+
+
+def get_periods(resource_id):
+    periods = ResourceAvailabilityPeriod.objects.filter(resource_id=resource_id).order_by("published_from")
+    return list(periods.values_list("published_from", "published_till"))
+
+
+@pytest.mark.django_db
+def test_resources_availability_is_updated_incrementally(mocker):
+    create_log_entry(1, LogEntry.Action.CREATE, 1, status="published", is_removed="False")
+    create_log_entry(2, LogEntry.Action.CREATE, 1, status="draft", is_removed="False")
+    create_log_entry(2, LogEntry.Action.UPDATE, 2, status="published")
+
+    assert availability.update_resources_availability() == 3
+    assert availability.update_resources_availability() == 0
+    assert sorted(ResourceAvailabilityPeriod.objects.resources_published_on(date(2024, 1, 1))) == [1]
+
+    create_log_entry(1, LogEntry.Action.UPDATE, 5, status="draft")
+    create_log_entry(2, LogEntry.Action.DELETE, 6)
+    apply_log_entries = mocker.spy(availability, "_apply_log_entries")
+
+    assert availability.update_resources_availability() == 2
+    assert [len(call.args[0]) for call in apply_log_entries.call_args_list] == [2]
+    assert get_periods(1) == [(date(2024, 1, 1), date(2024, 1, 5))]
+    assert get_periods(2) == [(date(2024, 1, 2), date(2024, 1, 6))]
+    assert sorted(ResourceAvailabilityPeriod.objects.resources_published_on(date(2024, 1, 4))) == [1, 2]
+    assert sorted(ResourceAvailabilityPeriod.objects.resources_published_on(date(2024, 1, 5))) == [2]
+    assert LogEntry.objects.resources_availability_as_dict() == {
+        1: {"2024-01-01": 1, "2024-01-05": 0},
+        2: {"2024-01-02": 1, "2024-01-06": 0},
+    }
+
+
+@pytest.mark.django_db
+def test_resources_availability_changed_within_a_day(settings):
+    settings.RESOURCES_AVAILABILITY_BATCH_SIZE = 1
+    create_log_entry(1, LogEntry.Action.CREATE, 1, status="published", is_removed="False")
+    create_log_entry(1, LogEntry.Action.UPDATE, 3, is_removed="True")
+    create_log_entry(1, LogEntry.Action.UPDATE, 3, is_removed="False")
+    create_log_entry(2, LogEntry.Action.CREATE, 1, status="draft", is_removed="False")
+    create_log_entry(2, LogEntry.Action.UPDATE, 4, status="published")
+    create_log_entry(2, LogEntry.Action.UPDATE, 4, status="draft")
+
+    assert availability.update_resources_availability() == 6
+    assert get_periods(1) == [(date(2024, 1, 1), None)]
+    assert get_periods(2) == []
+
+
+@pytest.mark.django_db
+def test_resources_availability_is_not_updated_with_recent_log_entries():
+    create_log_entry(1, LogEntry.Action.CREATE, 1, status="published", is_removed="False")
+    recent = create_log_entry(2, LogEntry.Action.CREATE, 1, status="published", is_removed="False")
+    LogEntry.objects.filter(pk=recent.pk).update(timestamp=timezone.now())
+    create_log_entry(3, LogEntry.Action.CREATE, 1, status="published", is_removed="False")
+
+    assert availability.update_resources_availability() == 1
+    assert sorted(ResourceAvailabilityPeriod.objects.resources_published_on(date(2024, 1, 1))) == [1]
+
+    LogEntry.objects.filter(pk=recent.pk).update(timestamp=datetime(2024, 1, 1, 13, tzinfo=pytz.utc))
+
+    assert availability.update_resources_availability() == 2
+    assert sorted(ResourceAvailabilityPeriod.objects.resources_published_on(date(2024, 1, 1))) == [1, 2, 3]
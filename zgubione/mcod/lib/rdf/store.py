@@ -1,3 +1,4 @@
+import requests
 from rdflib import BNode
 from rdflib.plugins.stores.sparqlstore import (
     SPARQLStore as BaseSPARQLStore,
@@ -121,23 +122,46 @@ def my_bnode_ext(node):
         return "<bnode:b%s>" % node
 
 
+def _get_readonly_params(return_format="xml", external_sparql_endpoint=None):
+    params = {
+        "auth": (settings.SPARQL_USER, settings.SPARQL_PASSWORD),
+        "query_endpoint": settings.SPARQL_QUERY_ENDPOINT,
+        "method": "POST_FORM",
+        "returnFormat": return_format,
+    }
+    external_endpoint_details = (
+        settings.SPARQL_ENDPOINTS[external_sparql_endpoint]
+        if external_sparql_endpoint and settings.SPARQL_ENDPOINTS.get(external_sparql_endpoint)
+        else None
+    )
+    if external_endpoint_details:
+        params.pop("auth")
+        params.update(**external_endpoint_details)
+    return params
+
+
+def stream_sparql_query(query, content_type, external_sparql_endpoint=None, chunk_size=64 * 1024):
+    """
+    Sends the query directly to the SPARQL endpoint and returns iterator over chunks of the raw response
+    (in `content_type` format) - the result is neither parsed nor kept in memory as a whole.
+    """
+    params = _get_readonly_params(external_sparql_endpoint=external_sparql_endpoint)
+    prefixes = "".join(f"PREFIX {prefix}: <{namespace}>\n" for prefix, namespace in NAMESPACES.items())
+    response = requests.post(
+        params["query_endpoint"],
+        data={"query": prefixes + query},
+        headers={"Accept": content_type},
+        auth=params.get("auth"),
+        stream=True,
+        timeout=settings.SPARQL_STREAM_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.iter_content(chunk_size=chunk_size)
+
+
 def get_sparql_store(readonly=False, return_format="xml", external_sparql_endpoint=None):
     if readonly:
-        params = {
-            "auth": (settings.SPARQL_USER, settings.SPARQL_PASSWORD),
-            "query_endpoint": settings.SPARQL_QUERY_ENDPOINT,
-            "method": "POST_FORM",
-            "returnFormat": return_format,
-        }
-        external_endpoint_details = (
-            settings.SPARQL_ENDPOINTS[external_sparql_endpoint]
-            if external_sparql_endpoint and settings.SPARQL_ENDPOINTS.get(external_sparql_endpoint)
-            else None
-        )
-        if external_endpoint_details:
-            params.pop("auth")
-            params.update(**external_endpoint_details)
-        return SPARQLStore(**params)
+        return SPARQLStore(**_get_readonly_params(return_format, external_sparql_endpoint))
 
     params = {
         "auth": (settings.SPARQL_USER, settings.SPARQL_PASSWORD),
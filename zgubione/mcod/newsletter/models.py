@@ -1,10 +1,13 @@
 import logging
+from functools import lru_cache
 
 import magic
 from bs4 import BeautifulSoup
 from constance import config
+from django.conf import settings as dj_settings
 from django.contrib.auth.hashers import get_hasher
 from django.core.exceptions import ValidationError
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.db import models
 from django.template.loader import render_to_string
 from django.utils.timezone import now
@@ -16,13 +19,15 @@ from mcod.core.db.models import TimeStampedModel
 from mcod.lib.model_sanitization import SanitizedCharField, SanitizedTextField
 from mcod.newsletter.tasks import (
     remove_inactive_subscription,
-    send_newsletter_mail,
+    send_newsletter_mails,
     send_subscription_confirm_mail,
 )
 from mcod.newsletter.utils import make_activation_code
 
 logger = logging.getLogger("mcod")
 
+RESIGN_URL_PLACEHOLDER = "%%RESIGN_NEWSLETTER_URL%%"
+
 
 class Subscription(TimeStampedModel):
     NEWSLETTER_LANGUAGES = (
@@ -284,23 +289,78 @@ class Newsletter(TimeStampedModel):
         if errors:
             raise ValidationError(errors)
 
+    def get_html_template(self):
+        """Returns html of the newsletter with placeholders of resignation urls, cached on the worker."""
+        return _get_html_template(self.file.path)
+
     def send(self):
-        with open(self.file.path, "r") as f:
-            html_template = f.read()
-            required_links = [str(x) for x in self._get_required_links(html_template)]
-            for obj in Subscription.objects.filter(is_active=True):
-                html_message = str(html_template)
-                for link in required_links:
-                    updated_link = link.replace(
-                        'href="#"',
-                        'href="{}"'.format(obj.resign_newsletter_absolute_url),
-                    )
-                    html_message = html_message.replace(link, updated_link)
-                send_newsletter_mail.s(self.id, obj.id, html_message).apply_async_on_commit()
+        subscriptions_ids = list(Subscription.objects.filter(is_active=True).order_by("id").values_list("id", flat=True))
+        batch_size = settings.NEWSLETTER_MAILS_BATCH_SIZE
+        for start in range(0, len(subscriptions_ids), batch_size):
+            send_newsletter_mails.s(self.id, subscriptions_ids[start : start + batch_size]).apply_async_on_commit()
         self.sending_date = now()
         self.status = "sent"
         self.save()
 
+    @staticmethod
+    def _send_submissions_mails(mails, connection):
+        sent_count = 0
+        for submission, mail in mails:
+            mail.connection = connection
+            try:
+                sent_count += mail.send()
+                submission.message = ""
+            except Exception as exc:
+                submission.message = str(exc)
+        return sent_count
+
+    def send_mails(self, subscriptions_ids):
+        """
+        Sends the newsletter to active subscriptions through one connection and records submissions
+        (with errors of failed mails) in bulk. Returns number of sent mails.
+        """
+        html_template = self.get_html_template()
+        subscriptions = Subscription.objects.filter(pk__in=subscriptions_ids, is_active=True)
+        submissions = self.newsletter_submissions.filter(subscription_id__in=subscriptions_ids)
+        submissions = {obj.subscription_id: obj for obj in submissions}
+        new_submissions = []
+        mails = []
+        for subscription in subscriptions:
+            submission = submissions.get(subscription.id)
+            if submission is None:
+                submission = Submission(newsletter=self, subscription=subscription)
+                new_submissions.append(submission)
+            mail = EmailMultiAlternatives(self.title, "", config.NEWSLETTER_EMAIL, [subscription.email])
+            html_message = html_template.replace(RESIGN_URL_PLACEHOLDER, subscription.resign_newsletter_absolute_url)
+            mail.attach_alternative(html_message, "text/html")
+            mails.append((submission, mail))
+
+        sent_count = 0
+        try:
+            with get_connection(dj_settings.EMAIL_BACKEND) as connection:
+                sent_count = self._send_submissions_mails(mails, connection)
+        except Exception as exc:
+            logger.error(f"Newsletter {self.id} could not be sent: {exc}")
+            for submission, mail in mails:
+                if mail.connection is None:
+                    submission.message = str(exc)
+
+        modified = now()
+        for submission in submissions.values():
+            submission.modified = modified
+        Submission.objects.bulk_create(new_submissions)
+        Submission.objects.bulk_update(submissions.values(), ["message", "modified"])
+        return sent_count
+
+
+@lru_cache(maxsize=8)
+def _get_html_template(path):
+    with open(path, "r") as f:
+        html_template = f.read()
+    for link in [str(x) for x in Newsletter._get_required_links(html_template)]:
+        html_template = html_template.replace(link, link.replace('href="#"', f'href="{RESIGN_URL_PLACEHOLDER}"'))
+    return html_template
+
 
 class Submission(TimeStampedModel):
     newsletter = models.ForeignKey(
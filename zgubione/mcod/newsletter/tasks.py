@@ -30,6 +30,15 @@ def send_newsletter_mail(newsletter_id, subscription_id, html_message):
     return {}
 
 
+@extended_shared_task
+def send_newsletter_mails(newsletter_id, subscriptions_ids):
+    newsletter_model = apps.get_model("newsletter.Newsletter")
+    newsletter = newsletter_model.objects.get(pk=newsletter_id)
+    sent_count = newsletter.send_mails(subscriptions_ids)
+    logger.debug(f"Newsletter {newsletter_id} sent to {sent_count} of {len(subscriptions_ids)} subscriptions.")
+    return {"sent": sent_count}
+
+
 @extended_shared_task
 def send_subscription_confirm_mail(obj_id):
     subscription_model = apps.get_model("newsletter.Subscription")
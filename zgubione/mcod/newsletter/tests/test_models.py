@@ -1,9 +1,13 @@
 from datetime import date
+from smtplib import SMTPException
 
+import pytest
 from django.conf import settings
+from django.core import mail
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail import EmailMultiAlternatives
 
-from mcod.newsletter.models import Newsletter
+from mcod.newsletter.models import Newsletter, Submission, Subscription
 
 
 class TestSubscriptionModel:
@@ -31,3 +35,66 @@ class TestSubscriptionModel:
             created_by=admin,
         )
         nl.clean()
+
+
+class TestNewsletterModel:
+
+    @pytest.fixture
+    def newsletter(self, admin):
+        return Newsletter.objects.create(
+            file=SimpleUploadedFile(
+                "newsletter.html",
+                b'<html><head></head><body>Newsletter <a href="#">Rezygnacja</a></body></html>',
+                content_type="text/html",
+            ),
+            title="newsletter-title",
+            planned_sending_date=date.today(),
+            created_by=admin,
+        )
+
+    def test_send_enqueues_batches_of_subscriptions(self, newsletter, mocker):
+        subscriptions = [Subscription.objects.create(email=f"test-{i}@mcod.test", lang="pl", is_active=True) for i in range(3)]
+        mocker.patch("mcod.newsletter.models.settings.NEWSLETTER_MAILS_BATCH_SIZE", 2)
+        signature = mocker.patch("mcod.newsletter.models.send_newsletter_mails.s")
+
+        newsletter.send()
+
+        ids = [subscription.id for subscription in subscriptions]
+        assert signature.call_args_list == [mocker.call(newsletter.id, ids[:2]), mocker.call(newsletter.id, ids[2:])]
+        assert newsletter.status == "sent"
+
+    def test_send_mails(self, newsletter, mocker):
+        active = Subscription.objects.create(email="active@mcod.test", lang="en", is_active=True)
+        failing = Subscription.objects.create(email="failing@mcod.test", lang="pl", is_active=True)
+        inactive = Subscription.objects.create(email="inactive@mcod.test", lang="pl")
+        Submission.objects.create(newsletter=newsletter, subscription=failing, message="previous error")
+        send = EmailMultiAlternatives.send
+
+        def send_mail(message, *args, **kwargs):
+            if message.to == [failing.email]:
+                raise SMTPException("Recipient refused")
+            return send(message, *args, **kwargs)
+
+        mocker.patch.object(EmailMultiAlternatives, "send", autospec=True, side_effect=send_mail)
+
+        sent_count = newsletter.send_mails([active.id, failing.id, inactive.id])
+
+        assert sent_count == 1
+        assert len(mail.outbox) == 1
+        html_message, _ = mail.outbox[0].alternatives[0]
+        assert f'href="{active.resign_newsletter_absolute_url}"' in html_message
+        submissions = {obj.subscription_id: obj.message for obj in newsletter.newsletter_submissions.all()}
+        assert submissions == {active.id: "", failing.id: "Recipient refused"}
+
+    def test_send_mails_records_failed_connection(self, newsletter, mocker):
+        subscriptions = [Subscription.objects.create(email=f"test-{i}@mcod.test", lang="pl", is_active=True) for i in range(2)]
+        Submission.objects.create(newsletter=newsletter, subscription=subscriptions[0])
+        get_connection = mocker.patch("mcod.newsletter.models.get_connection")
+        get_connection.return_value.__enter__.side_effect = SMTPException("Connection refused")
+
+        sent_count = newsletter.send_mails([subscription.id for subscription in subscriptions])
+
+        assert sent_count == 0
+        get_connection.assert_called_once_with(settings.EMAIL_BACKEND)
+        submissions = {obj.subscription_id: obj.message for obj in newsletter.newsletter_submissions.all()}
+        assert submissions == {subscription.id: "Connection refused" for subscription in subscriptions}
@@ -1,3 +1,4 @@
+import hashlib
 import json
 import logging
 from collections import OrderedDict
@@ -12,11 +13,14 @@ import panel as pn
 import param
 from bokeh.io.export import get_screenshot_as_png
 from bokeh.models import BasicTicker, CompositeTicker, FuncTickFormatter
+from django.conf import settings
+from django.core.cache import caches
 from django.db import connections
 from django.utils.functional import cached_property
 from django.utils.translation import gettext as _
 from panel.io.state import state
 
+from mcod.counters.stats import get_stats_version
 from mcod.organizations.models import Organization
 from mcod.pn_apps.bokeh.tools.base import (
     LocalizedHoverTool,
@@ -38,6 +42,8 @@ from mcod.pn_apps.widgets import BootstrapTableTemplate, TabbedBootstrapTableTem
 q_log = logging.getLogger("stats-queries")
 profile_log = logging.getLogger("stats-profile")
 
+DATAFRAME_CACHE_KEY = "stats-dataframe:{}:{}:{}:{}"
+
 
 class StatsPanel(param.Parameterized):
     table_template_cls = BootstrapTableTemplate
@@ -46,6 +52,9 @@ class StatsPanel(param.Parameterized):
     show_table_index = True
     show_initial_table = True
     generic_dim_names = {"Variable", "value"}
+    # dataframes of panels reading only daily statistics (and not depending on the user) are cached for all users
+    # until daily statistics change.
+    shared_dataframe = False
 
     def __init__(
         self,
@@ -203,7 +212,21 @@ class StatsPanel(param.Parameterized):
 
     @cached_property
     def cached_df(self):
-        return self.post_process_dataframe()
+        timeout = settings.STATS_DATAFRAME_CACHE_TIMEOUT
+        if not (self.shared_dataframe and timeout):
+            return self.post_process_dataframe()
+        cache = caches["default"]
+        key = self.get_dataframe_cache_key()
+        df = cache.get(key)
+        if df is None:
+            df = self.post_process_dataframe()
+            cache.set(key, df, timeout=timeout)
+        return df
+
+    def get_dataframe_cache_key(self):
+        params = sorted((name, repr(getattr(self, name))) for name in self.widgets)
+        params_hash = hashlib.md5(repr(params).encode()).hexdigest()
+        return DATAFRAME_CACHE_KEY.format(get_stats_version(), self.__class__.__name__, self.lang, params_hash)
 
     @property
     def variable_dim_label(self):
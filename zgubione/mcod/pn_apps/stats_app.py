@@ -2,7 +2,6 @@ import json
 import logging
 from collections import OrderedDict
 from datetime import date
-from functools import partial
 from time import time
 
 import holoviews as hv
@@ -31,7 +30,13 @@ from django.utils.translation import activate, gettext as _
 from user_agents import parse
 
 from mcod.categories.models import Category
-from mcod.counters.models import ResourceDownloadCounter, ResourceViewCounter
+from mcod.counters.models import (
+    DailyDatasetStats,
+    DailyDatasetUsageStats,
+    DailyResourceStats,
+    ResourceDownloadCounter,
+    ResourceViewCounter,
+)
 from mcod.datasets.models import Dataset
 from mcod.organizations.models import Organization
 from mcod.pn_apps.base import (
@@ -74,12 +79,60 @@ types_map = {
 
 profile_log = logging.getLogger("stats-profile")
 
+viz_types_filters = {
+    "ct_table": Q(has_table=True),
+    "ct_chart": Q(has_chart=True),
+    "ct_map": Q(has_map=True),
+    "ct_none": Q(has_no_visualization=True),
+}
+
+published_organization_filter = Q(
+    organization__status="published",
+    organization__is_removed=False,
+    organization__is_permanently_removed=False,
+)
+
+published_dataset_filter = Q(
+    dataset__status="published",
+    dataset__is_removed=False,
+    dataset__is_permanently_removed=False,
+)
+
+
+def get_datasets_stats_by_time_period(timeperiod, viztypes):
+    count_filter = None
+    single_type_counts = {}
+    for viz, _i in viztypes or []:
+        type_query = viz_types_filters[viz]
+        count_filter = type_query if count_filter is None else count_filter | type_query
+        single_type_counts[f"{viz.split('_')[1]}_count"] = Coalesce(Sum("count", filter=type_query), 0)
+    dataset_count = Sum("count", filter=count_filter) if count_filter else Sum("count")
+    return (
+        DailyDatasetStats.objects.annotate(period=Trunc("day", kind=timeperiod))
+        .values("period")
+        .annotate(dataset_count=Coalesce(dataset_count, 0), **single_type_counts)
+        .order_by("period")
+        .values("period", "dataset_count", *list(single_type_counts.keys()))
+    )
+
+
+def get_resources_stats_by_time_period(timeperiod, restypes):
+    res_types = [itm[0] for itm in restypes] if restypes else []
+    values = ["period"]
+    num = Sum("count")
+    if res_types:
+        num.filter = Q(type__in=res_types)
+        values.append("type")
+    qs = DailyResourceStats.objects.annotate(period=Trunc("day", kind=timeperiod)).values(*values)
+    return qs.annotate(num=Coalesce(num, 0)).values("num", *values).order_by("period")
+
 
 class Top10ProvidersByResourcesCount(RankingPanel):
     """
     Ranking instytucji o największej liczbie danych z podziałem na typ danych
     """
 
+    shared_dataframe = True
     widgets_cls = {"restypes": ResourceTypeParamWidget}
     model = Organization
     variable_widget = "restypes"
@@ -90,33 +143,15 @@ class Top10ProvidersByResourcesCount(RankingPanel):
         return any(perms)
 
     def get_queryset(self):
-        _Q = partial(
-            Q,
-            ("datasets__resources__status", "published"),
-            ("datasets__resources__is_removed", False),
-        )
-
-        annotate = {}
-        restypes = self.restypes or []
-        _fs = None
-
-        for rt, i in restypes:
-            _f = Q(datasets__resources__type=rt)
-            key = f"ct_{rt}"
-            annotate[key] = Count("datasets__resources", filter=_Q().add(_f, Q.AND))
-
-            if not _fs:
-                _fs = _f
-            else:
-                _fs.add(_f, Q.OR)
-
-        ct_total = Count("datasets__resources", filter=_Q())
-
-        if _fs:
-            ct_total.filter.add(_fs, Q.AND)
-        annotate["ct_total"] = ct_total
+        res_types = [rt for rt, _i in self.restypes or []]
+        annotate = {f"ct_{rt}": Coalesce(Sum("count", filter=Q(type=rt)), 0) for rt in res_types}
+        ct_total = Sum("count")
+        if res_types:
+            ct_total.filter = Q(type__in=res_types)
+        annotate["ct_total"] = Coalesce(ct_total, 0)
 
-        return super().get_queryset().annotate(**annotate).order_by("-ct_total")
+        qs = DailyResourceStats.objects.filter(published_organization_filter)
+        return qs.values("organization_id", title=F("organization__title")).annotate(**annotate).order_by("-ct_total")
 
     def get_dataframe(self):
         results = self.get_results()
@@ -126,15 +161,15 @@ class Top10ProvidersByResourcesCount(RankingPanel):
             idx = data.setdefault(_("Entry"), [])
             idx.append(j + 1)
             p = data.setdefault("Nazwa dostawcy", [])
-            p.append(inst.title)
+            p.append(inst["title"])
             if restypes:
                 for _rt, _z in restypes:
-                    val = getattr(inst, f"ct_{_rt}", 0)
+                    val = inst.get(f"ct_{_rt}", 0)
                     i = data.setdefault(types_map[_rt], [])
                     i.append(val)
             else:
                 m = data.setdefault(types_map["all"], [])
-                m.append(inst.ct_total)
+                m.append(inst["ct_total"])
 
         df = pd.DataFrame(data=data)
         df.set_index(_("Entry"), inplace=True)
@@ -151,6 +186,7 @@ class Top10MostDownloadedDatasets(RankingPanel):
     Ranking zbiorów o największej liczbie pobrań'
     """
 
+    shared_dataframe = True
     model = Dataset
 
     def has_perm(self):
@@ -160,14 +196,10 @@ class Top10MostDownloadedDatasets(RankingPanel):
 
     def get_queryset(self):
         qs = (
-            ResourceDownloadCounter.objects.filter(
-                resource__dataset__status="published",
-                resource__dataset__is_removed=False,
-                resource__dataset__is_permanently_removed=False,
-            )
-            .values("resource__dataset__title")
-            .annotate(downloads_count=Coalesce(Sum("count"), 0))
-            .annotate(title_i18n=F("resource__dataset__title_i18n"))
+            DailyDatasetUsageStats.objects.filter(published_dataset_filter, downloads__gt=0)
+            .values("dataset_id")
+            .annotate(downloads_count=Coalesce(Sum("downloads"), 0))
+            .annotate(title_i18n=F("dataset__title_i18n"))
             .order_by("-downloads_count")
         )
         return qs.values("title_i18n", "downloads_count")
@@ -202,6 +234,7 @@ class Top10MostViewedDatasets(RankingPanel):
     Ranking zbiorów o największej popularności (liczbie odsłon)
     """
 
+    shared_dataframe = True
     model = Dataset
 
     def has_perm(self):
@@ -211,14 +244,10 @@ class Top10MostViewedDatasets(RankingPanel):
 
     def get_queryset(self):
         qs = (
-            ResourceViewCounter.objects.filter(
-                resource__dataset__status="published",
-                resource__dataset__is_removed=False,
-                resource__dataset__is_permanently_removed=False,
-            )
-            .values("resource__dataset__title")
-            .annotate(views_count=Coalesce(Sum("count"), 0))
-            .annotate(title_i18n=F("resource__dataset__title_i18n"))
+            DailyDatasetUsageStats.objects.filter(published_dataset_filter, views__gt=0)
+            .values("dataset_id")
+            .annotate(views_count=Coalesce(Sum("views"), 0))
+            .annotate(title_i18n=F("dataset__title_i18n"))
         )
         return qs.order_by("-views_count").values("views_count", "title_i18n")
 
@@ -254,6 +283,7 @@ class Top10ProvidersByDatasetsCount(RankingPanel):
     Ranking instytucji o największej liczbie zbiorów danych w podziale na rodzaj wizualizacji (TOP10)
     """
 
+    shared_dataframe = True
     model = Organization
     widgets_cls = {
         "viztypes": VizTypeParamWidget,
@@ -265,42 +295,17 @@ class Top10ProvidersByDatasetsCount(RankingPanel):
         return any(perms)
 
     def get_queryset(self):
-        _Q = partial(
-            Q,
-            ("datasets__status", "published"),
-            ("datasets__is_removed", False),
-        )
-
         annotate = {}
-        viztypes = self.viztypes or []
-
-        _fs = None
-        for viz, i in viztypes:
-            if viz == "ct_table":
-                _f = Q(datasets__resources__has_table=True)
-            elif viz == "ct_chart":
-                _f = Q(datasets__resources__has_chart=True)
-            elif viz == "ct_map":
-                _f = Q(datasets__resources__has_map=True)
-            else:
-                _f = Q(
-                    datasets__resources__has_table=False,
-                    datasets__resources__has_chart=False,
-                    datasets__resources__has_map=False,
-                )
-            annotate[viz] = Count("datasets__pk", filter=_Q().add(_f, Q.AND), distinct=True)
-
-            if not _fs:
-                _fs = _f
-            else:
-                _fs.add(_f, Q.OR)
-
-        ct_total = Count("datasets__pk", filter=_Q(), distinct=True)
-        if _fs:
-            ct_total.filter.add(_fs, Q.AND)
-        annotate["ct_total"] = ct_total
+        count_filter = None
+        for viz, _i in self.viztypes or []:
+            type_query = viz_types_filters[viz]
+            annotate[viz] = Coalesce(Sum("count", filter=type_query), 0)
+            count_filter = type_query if count_filter is None else count_filter | type_query
+        ct_total = Sum("count", filter=count_filter) if count_filter else Sum("count")
+        annotate["ct_total"] = Coalesce(ct_total, 0)
 
-        return super().get_queryset().annotate(**annotate).order_by("-ct_total")
+        qs = DailyDatasetStats.objects.filter(published_organization_filter)
+        return qs.values("organization_id", title=F("organization__title")).annotate(**annotate).order_by("-ct_total")
 
     def get_dataframe(self):
         results = self.get_results()
@@ -313,15 +318,15 @@ class Top10ProvidersByDatasetsCount(RankingPanel):
             idx = data.setdefault(_("Entry"), [])
             idx.append(_i + 1)
             p = data.setdefault("Nazwa dostawcy", [])
-            p.append(inst.title)
+            p.append(inst["title"])
             if viztypes:
                 for key, val in selectedVizTypes:
                     m = data.setdefault(key, [])
-                    num = getattr(inst, val[0]) or 0
+                    num = inst[val[0]] or 0
                     m.append(num)
             else:
                 m = data.setdefault("Liczba zbiorów", [])
-                m.append(inst.ct_total)
+                m.append(inst["ct_total"])
 
         df = pd.DataFrame(data=data)
         df.set_index(_("Entry"), inplace=True)
@@ -340,6 +345,7 @@ class DatasetsCountByTimePeriod(StatsPanel):
     Liczba zbiorów danych w podziale na miesiące/kwartały/lata i rodzaj wizualizacji
     """
 
+    shared_dataframe = True
     model = Dataset
 
     widgets_cls = {
@@ -356,38 +362,7 @@ class DatasetsCountByTimePeriod(StatsPanel):
         return any(perms)
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        viz_types_dict = {
-            "ct_table": Resource.objects.filter(dataset=OuterRef("pk"), has_table=True),
-            "ct_chart": Resource.objects.filter(dataset=OuterRef("pk"), has_chart=True),
-            "ct_map": Resource.objects.filter(dataset=OuterRef("pk"), has_map=True),
-            "ct_none": Resource.objects.filter(dataset=OuterRef("pk"), has_map=False, has_chart=False, has_table=False),
-        }
-        if self.viztypes:
-            selected_types = {v_type[0]: Exists(viz_types_dict[v_type[0]]) for v_type in self.viztypes}
-        else:
-            selected_types = {}
-        qs = qs.annotate(**selected_types)
-        count_filter = None
-        single_type_counts = {}
-        for selected_type in selected_types.keys():
-            type_query = Q(**{selected_type: True})
-            type_name = selected_type.split("_")[1]
-            if not count_filter:
-                count_filter = type_query
-            else:
-                count_filter |= type_query
-            single_type_counts[f"{type_name}_count"] = Count("pk", filter=type_query)
-        overall_count_expr = Count("pk", filter=count_filter, distinct=True) if count_filter else Count("pk")
-        all_annotations = {"dataset_count": overall_count_expr}
-        all_annotations.update(single_type_counts)
-        return (
-            qs.annotate(period=Trunc("created", kind=self.timeperiod))
-            .values("period")
-            .annotate(**all_annotations)
-            .order_by("period")
-            .values("dataset_count", "period", *list(single_type_counts.keys()))
-        )
+        return get_datasets_stats_by_time_period(self.timeperiod, self.viztypes)
 
     def get_dataframe(self):
         qs = self.get_results()
@@ -439,6 +414,7 @@ class ResourcesCountByTimePeriod(StatsPanel):
     Liczba danych w podziale na miesiące/kwartały/lata oraz typ danych
     """
 
+    shared_dataframe = True
     model = Resource
     widgets_cls = {
         "timeperiod": TimePeriodParamWidget,
@@ -454,15 +430,7 @@ class ResourcesCountByTimePeriod(StatsPanel):
         return any(perms)
 
     def get_queryset(self):
-        qs = super().get_queryset().annotate(period=Trunc("created", kind=self.timeperiod)).values("period")
-        rtc = Count("type")
-        res_types = [itm[0] for itm in self.restypes] if self.restypes else []
-        values = ["period", "num"]
-        if res_types:
-            rtc.filter = Q(type__in=res_types)
-            values.append("type")
-
-        return qs.annotate(num=rtc).values(*values).order_by("period")
+        return get_resources_stats_by_time_period(self.timeperiod, self.restypes)
 
     def get_dataframe(self):
         qs = self.get_results()
@@ -514,6 +482,7 @@ class NewDatasetsCountByTimePeriod(StatsPanel):
     Liczba nowych zbiorów danych w podziale na miesiące/kwartały/lata i typ wizualizacji
     """
 
+    shared_dataframe = True
     model = Dataset
     widgets_cls = {
         "timeperiod": TimePeriodParamWidget,
@@ -542,37 +511,7 @@ class NewDatasetsCountByTimePeriod(StatsPanel):
         return self.p_map[self.presentation_type]
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        viz_types_dict = {
-            "ct_table": Resource.objects.filter(dataset=OuterRef("pk"), has_table=True),
-            "ct_chart": Resource.objects.filter(dataset=OuterRef("pk"), has_chart=True),
-            "ct_map": Resource.objects.filter(dataset=OuterRef("pk"), has_map=True),
-            "ct_none": Resource.objects.filter(dataset=OuterRef("pk"), has_map=False, has_chart=False, has_table=False),
-        }
-        selected_types = {}
-        if self.viztypes:
-            selected_types = {v_type[0]: Exists(viz_types_dict[v_type[0]]) for v_type in self.viztypes}
-            qs = qs.annotate(**selected_types)
-        count_filter = None
-        single_type_counts = {}
-        for selected_type in selected_types.keys():
-            type_query = Q(**{selected_type: True})
-            type_name = selected_type.split("_")[1]
-            if not count_filter:
-                count_filter = type_query
-            else:
-                count_filter |= type_query
-            single_type_counts[f"{type_name}_count"] = Count("pk", filter=type_query)
-        overall_count_expr = Count("pk", filter=count_filter, distinct=True) if count_filter else Count("pk")
-        all_annotations = {"dataset_count": overall_count_expr}
-        all_annotations.update(single_type_counts)
-        return (
-            qs.annotate(period=Trunc("created", kind=self.timeperiod))
-            .values("period")
-            .annotate(**all_annotations)
-            .order_by("period")
-            .values("period", "dataset_count", *list(single_type_counts.keys()))
-        )
+        return get_datasets_stats_by_time_period(self.timeperiod, self.viztypes)
 
     def get_dataframe(self):
         qs = self.get_results()
@@ -632,6 +571,7 @@ class NewResourcesCountByTimePeriod(StatsPanel):
     Liczba nowych danych w podziale na miesiące/kwartały/lata i typ danych
     """
 
+    shared_dataframe = True
     model = Resource
     widgets_cls = {
         "timeperiod": TimePeriodParamWidget,
@@ -656,15 +596,7 @@ class NewResourcesCountByTimePeriod(StatsPanel):
         return any(perms)
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        period_grouped_qs = qs.annotate(period=Trunc("created", kind=self.timeperiod)).values("period")
-        rtc = Count("type")
-        res_types = [itm[0] for itm in self.restypes] if self.restypes else []
-        values = ["period", "num"]
-        if res_types:
-            rtc.filter = Q(type__in=res_types)
-            values.append("type")
-        return period_grouped_qs.annotate(num=rtc).values(*values).order_by("period")
+        return get_resources_stats_by_time_period(self.timeperiod, self.restypes)
 
     def get_dataframe(self):
         qs = self.get_results()
@@ -779,6 +711,7 @@ class ResourceOpennessReportChart(ChartPanel):
     Liczba danych w podziale na stopień otwartości
     """
 
+    shared_dataframe = True
     model = Resource
     y_axis_attr_name = "openness_count"
     x_axis_attr_name = "openness_label"
@@ -796,9 +729,8 @@ class ResourceOpennessReportChart(ChartPanel):
         return any(perms)
 
     def get_queryset(self):
-        qs = super().get_queryset()
-        qs = qs.values("openness_score").annotate(openness_count=Count("openness_score")).order_by("-openness_count")
-        return qs
+        qs = DailyResourceStats.objects.values("openness_score")
+        return qs.annotate(openness_count=Sum("count")).order_by("-openness_count")
 
     def get_dataframe(self):
         results = self.get_results()
@@ -987,6 +919,7 @@ class Top10FileFormats(RankingPanel):
     Ranking formatów o największej liczbie plików
     """
 
+    shared_dataframe = True
     model = Resource
     x_axis_attr_name = "format"
     y_axis_attr_name = "resource_count"
@@ -1002,8 +935,8 @@ class Top10FileFormats(RankingPanel):
         return any(perms)
 
     def get_queryset(self):
-        qs = super().get_queryset().filter(format__isnull=False)
-        return qs.values("format").annotate(resource_count=Count("pk")).order_by("-resource_count")
+        qs = DailyResourceStats.objects.filter(format__isnull=False).values("format")
+        return qs.annotate(resource_count=Sum("count")).order_by("-resource_count")
 
 
 class MostUsedCategories(RankingPanel):
@@ -1284,20 +1217,17 @@ class CountChartByTimePeriod(ChartPanel):
     y_axis_attr_name = "count_sum"
     x_axis_attr_name = "period"
     show_table_index = False
+    stats_field = None
 
     def init_labels(self):
         self.x_axis_label = _("Period")
 
     def get_queryset(self):
-        qs = self.model.objects.filter(
-            resource__dataset__status="published",
-            resource__dataset__is_removed=False,
-            resource__dataset__is_permanently_removed=False,
-        )
+        qs = DailyDatasetUsageStats.objects.filter(published_dataset_filter)
         qs = (
-            qs.annotate(period=Trunc("timestamp", kind=self.timeperiod))
+            qs.annotate(period=Trunc("day", kind=self.timeperiod))
             .values("period")
-            .annotate(count_sum=Sum("count"))
+            .annotate(count_sum=Sum(self.stats_field))
             .values("period", "count_sum")
             .order_by("period")
         )
@@ -1335,6 +1265,9 @@ class CountChartByTimePeriod(ChartPanel):
 
 
 class DatasetViewsCountByTimePeriod(CountChartByTimePeriod):
+    shared_dataframe = True
+    stats_field = "views"
+
     def has_perm(self):
         perms = (self.user.is_authenticated,)
 
@@ -1348,7 +1281,9 @@ class DatasetViewsCountByTimePeriod(CountChartByTimePeriod):
 
 
 class DatasetDownloadsCountByTimePeriod(CountChartByTimePeriod):
+    shared_dataframe = True
     model = ResourceDownloadCounter
+    stats_field = "downloads"
 
     def init_labels(self):
         super().init_labels()
@@ -1,6 +1,42 @@
+import uuid
+
+import pandas as pd
+import pytest
 from pytest_bdd import scenarios
 
+from mcod.pn_apps import base
+from mcod.pn_apps.stats_app import MostUsedTags, Top10FileFormats
+from mcod.users.factories import UserFactory
+
 scenarios(
     "features/stats_rendering.feature",
     "features/stats_widgets_filter.feature",
 )
+
+
+@pytest.mark.django_db
+def test_dataframes_of_rollup_panels_are_shared_until_stats_refresh(mocker, settings):
+    settings.STATS_DATAFRAME_CACHE_TIMEOUT = 60
+    stats_version = mocker.patch.object(base, "get_stats_version", return_value=uuid.uuid4().hex)
+    post_process = mocker.patch.object(Top10FileFormats, "post_process_dataframe", side_effect=lambda: pd.DataFrame())
+    users = UserFactory.create_batch(2)
+
+    for user in users:
+        Top10FileFormats(user, "pl").cached_df
+    assert post_process.call_count == 1
+
+    stats_version.return_value = uuid.uuid4().hex
+    Top10FileFormats(users[0], "pl").cached_df
+    assert post_process.call_count == 2
+
+
+@pytest.mark.django_db
+def test_dataframes_of_live_panels_are_not_shared(mocker, settings):
+    settings.STATS_DATAFRAME_CACHE_TIMEOUT = 60
+    post_process = mocker.patch.object(MostUsedTags, "post_process_dataframe", side_effect=lambda: pd.DataFrame())
+    user = UserFactory.create()
+
+    MostUsedTags(user, "pl").cached_df
+    MostUsedTags(user, "pl").cached_df
+
+    assert post_process.call_count == 2
@@ -0,0 +1,64 @@
+"""
+Streaming export of reports to CSV files - rows are written to the file as they are read from the database,
+so memory used by the report doesn't grow with the size of the catalog.
+"""
+
+import csv
+import gzip
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import QuerySet
+
+
+def open_report_file(path, compress: bool = False) -> IO[str]:
+    """Opens the report file for writing, gzip-compressed if `compress` is set."""
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8", newline="")
+    return open(path, "w", newline="")
+
+
+def write_csv(file: IO[str], headers: Sequence[str], rows: Iterable[Dict], delimiter: str = ",") -> None:
+    writer = csv.DictWriter(file, fieldnames=headers, delimiter=delimiter)
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def iter_serialized(serializer, queryset: QuerySet, chunk_size: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Yields objects of the `queryset` (in its order) dumped by the `serializer` - only `chunk_size` objects
+    are fetched and kept in memory at once.
+    """
+    chunk_size = chunk_size or settings.REPORTS_EXPORT_CHUNK_SIZE
+    pks = list(queryset.values_list("pk", flat=True))
+    for start in range(0, len(pks), chunk_size):
+        chunk = pks[start : start + chunk_size]
+        objects = queryset.in_bulk(chunk)
+        yield from serializer.dump([objects[pk] for pk in chunk if pk in objects])
+
+
+def export_query(
+    file: IO[str],
+    sql: str,
+    params=None,
+    format_header: Callable[[str], str] = str,
+    delimiter: str = ",",
+) -> int:
+    """
+    Writes results of the query to the CSV file using a server-side cursor. Headers are names of columns
+    formatted by `format_header`. Returns number of written rows.
+    """
+    writer = csv.writer(file, delimiter=delimiter)
+    count = 0
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchmany(settings.REPORTS_EXPORT_CHUNK_SIZE)
+        # description of the server-side cursor is available after the first fetch.
+        headers: List[str] = [format_header(column[0]) for column in cursor.description]
+        writer.writerow(headers)
+        while rows:
+            writer.writerows(rows)
+            count += len(rows)
+            rows = cursor.fetchmany(settings.REPORTS_EXPORT_CHUNK_SIZE)
+    return count
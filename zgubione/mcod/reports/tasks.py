@@ -1,4 +1,3 @@
-import csv
 import datetime
 import json
 import logging
@@ -37,10 +36,11 @@ from mcod.reports.broken_links import (
     generate_public_broken_links_reports,
 )
 from mcod.reports.broken_links.tasks_helpers import BrokenLinksIntermediaryJSON
+from mcod.reports.csv_export import export_query, iter_serialized, open_report_file, write_csv
 from mcod.reports.exceptions import NoDataForReportException
 from mcod.reports.models import Report, SummaryDailyReport
 from mcod.resources.models import Resource
-from mcod.resources.tasks import validate_link
+from mcod.resources.tasks import validate_links_batch
 from mcod.showcases.serializers import ShowcaseProposalCSVSerializer
 from mcod.suggestions.serializers import DatasetSubmissionCSVSerializer
 from mcod.users.serializers import UserLocalTimeCSVSerializer
@@ -87,10 +87,12 @@ def generate_harvesters_imports_report(imports_pks: List[int], model_name: str,
             "imports__datasets_count",
             "imports__datasets_created_count",
             "imports__datasets_updated_count",
+            "imports__datasets_unchanged_count",
             "imports__datasets_deleted_count",
             "imports__resources_count",
             "imports__resources_created_count",
             "imports__resources_updated_count",
+            "imports__resources_unchanged_count",
             "imports__resources_deleted_count",
         )
     )
@@ -206,7 +208,6 @@ def generate_csv(pks, model_name, user_id, file_name_postfix):
 
     serializer = serializer_cls(many=True)
     queryset = model.objects.filter(pk__in=pks)
-    data = serializer_cls(many=True).dump(queryset)
     user = User.objects.get(pk=user_id)
     file_name = f"{_model.lower()}s_{file_name_postfix}.csv"
     reports_path = os.path.join(settings.REPORTS_MEDIA_ROOT, app)
@@ -215,8 +216,8 @@ def generate_csv(pks, model_name, user_id, file_name_postfix):
     file_path = os.path.join(reports_path, file_name)
     file_url_path = f"{settings.REPORTS_MEDIA}/{app}/{file_name}"
 
-    with open(file_path, "w") as f:
-        save_as_csv(f, serializer.get_csv_headers(), data)
+    with open_report_file(file_path) as f:
+        save_as_csv(f, serializer.get_csv_headers(), iter_serialized(serializer, queryset))
 
     return json.dumps(
         {
@@ -286,10 +287,8 @@ def create_resources_report_task(data, headers, report_name):
     os.makedirs(reports_path, exist_ok=True)
     file_path = os.path.join(reports_path, file_name)
     file_url_path = f"{settings.REPORTS_MEDIA}/{app_name}/{file_name}"
-    with open(file_path, "w") as f:
-        w = csv.DictWriter(f, headers)
-        w.writeheader()
-        w.writerows(data)
+    with open_report_file(file_path) as f:
+        write_csv(f, headers, data)
     return json.dumps({"file": file_url_path, "model": "resources.Resource"})
 
 
@@ -331,12 +330,6 @@ def generating_report_success(sender, result, **kwargs):
         logger.error(f"reports.task: exception on generating_report_success:\n{e}")
 
 
-def dict_fetch_all(cursor):
-    """Return all rows from a cursor as a OrderedDict"""
-    columns = [col[0] for col in cursor.description]
-    return [OrderedDict(zip(columns, row)) for row in cursor.fetchall()]
-
-
 def format_report_header(header: str) -> str:
     """
     Formats a header string to be more readable and conform to specific
@@ -362,7 +355,7 @@ def create_daily_resources_report():
     view_name = "mv_resource_dataset_organization_report_d_hv_r_data"
     report_fields = """
             id_zasobu,
-            NULL as link_zasobu,
+            %(url)s || '/dataset/' || id_zbioru_danych::text || '/resource/' || id_zasobu::text as link_zasobu,
             nazwa,
             opis,
             typ,
@@ -383,12 +376,12 @@ def create_daily_resources_report():
             zbior_danych_posiada_dane_wysokiej_wartosci_z_wykazu_ke,
             zbior_danych_posiada_dane_dynamiczne,
             zbior_danych_posiada_dane_badawcze,
-            NULL as link_zbioru,
+            %(url)s || '/dataset/' || id_zbioru_danych::text as link_zbioru,
             data_utworzenia_zbioru_danych,
             data_modyfikacji_zbioru_danych,
             liczba_obserwujacych,
             id_instytucji,
-            NULL as link_instytucji,
+            %(url)s || '/institution/' || id_instytucji::text as link_instytucji,
             tytul,
             rodzaj,
             data_utworzenia_instytucji,
@@ -396,33 +389,21 @@ def create_daily_resources_report():
         """
     with connection.cursor() as cursor:
         cursor.execute(f"""REFRESH MATERIALIZED VIEW {view_name}""")
-        cursor.execute(
-            f"""
-            SELECT {report_fields}
-            FROM {view_name}
-        """
-        )
-        results = dict_fetch_all(cursor)
-
-    for r in results:
-        if r["id_zasobu"]:
-            r["link_zasobu"] = f"{settings.BASE_URL}/{get_language()}/dataset/{r['id_zbioru_danych']}/resource/{r['id_zasobu']}"
-        if r["id_zbioru_danych"]:
-            r["link_zbioru"] = f"{settings.BASE_URL}/{get_language()}/dataset/{r['id_zbioru_danych']}"
-        if r["id_instytucji"]:
-            r["link_instytucji"] = f"{settings.BASE_URL}/{get_language()}/institution/{r['id_instytucji']}"
 
+    compress: bool = settings.DAILY_RESOURCES_REPORT_COMPRESS
+    file_name = f"Zbiorczy_raport_dzienny_{str_date}.csv{'.gz' if compress else ''}"
     os.makedirs(Path(settings.REPORTS_MEDIA_ROOT, "daily"), exist_ok=True)
-    file_path = Path(settings.REPORTS_MEDIA[1:], "daily", f"Zbiorczy_raport_dzienny_{str_date}.csv")
-    save_path = Path(settings.REPORTS_MEDIA_ROOT, "daily", f"Zbiorczy_raport_dzienny_{str_date}.csv")
-
-    with open(save_path, "w") as f:
-        results_new_format: List[OrderedDict] = [
-            OrderedDict({format_report_header(k): v for k, v in element.items()}) for element in results
-        ]
-        w = csv.DictWriter(f, results_new_format[0].keys())
-        w.writeheader()
-        w.writerows(results_new_format)
+    file_path = Path(settings.REPORTS_MEDIA[1:], "daily", file_name)
+    save_path = Path(settings.REPORTS_MEDIA_ROOT, "daily", file_name)
+
+    # links are built by the query and rows are written to the file as they are fetched.
+    with open_report_file(save_path, compress=compress) as f:
+        export_query(
+            f,
+            f"SELECT {report_fields} FROM {view_name}",
+            {"url": f"{settings.BASE_URL}/{get_language()}"},
+            format_header=format_report_header,
+        )
 
     SummaryDailyReport.objects.create(
         file=file_path,
@@ -526,8 +507,8 @@ def validate_resources_links():
     Triggers the validation of external links for all published resources.
 
     This task gathers all published resources containing external links and creates
-    a separate validation task for each one. These tasks are executed in parallel
-    using a Celery chord. After all validation tasks have completed, a callback
+    a validation task for each batch of them (`LINK_VALIDATION_BATCH_SIZE`). These tasks
+    are executed in parallel using a Celery chord. After all validation tasks have completed, a callback
     triggers the generation of broken links reports:
     - Admin Broken Links report (visible via PA)
     - Public Broken Links report (visible via OD frontend site)
@@ -544,8 +525,9 @@ def validate_resources_links():
 
     resources_ids: List[int] = list(qs.values_list("pk", flat=True))
 
-    # Prepare a list of individual validation subtasks, one for each resource.
-    subtasks = [validate_link.s(res_id) for res_id in resources_ids]
+    # Prepare a list of validation subtasks, one for each batch of resources.
+    batch_size: int = settings.LINK_VALIDATION_BATCH_SIZE
+    subtasks = [validate_links_batch.s(resources_ids[i : i + batch_size]) for i in range(0, len(resources_ids), batch_size)]
 
     # Define the callback task to be executed after all validations are finished.
     # The .on_error handler ensures that the report generation task runs even if
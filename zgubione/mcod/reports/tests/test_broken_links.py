@@ -508,11 +508,9 @@ class TestReportFolder:
             file.exists()
 
 
-@pytest.mark.parametrize(
-    "env_variable_value_broken_links_exclude_developers, expected_validations_count", ([True, 3], [False, 10])
-)
+@pytest.mark.parametrize("env_variable_value_broken_links_exclude_developers, expected_batches_count", ([True, 2], [False, 5]))
 def test_developers_resources_included_excluded_from_broken_links(
-    mocker: MockerFixture, env_variable_value_broken_links_exclude_developers: bool, expected_validations_count: int
+    mocker: MockerFixture, env_variable_value_broken_links_exclude_developers: bool, expected_batches_count: int
 ):
     # GIVEN - 10 all resoures (7 developers, 3 non-developers)
     dev_api_resource_ids: List[int] = [
@@ -541,18 +539,22 @@ def test_developers_resources_included_excluded_from_broken_links(
     all_resource_ids: List[int] = sorted(dev_api_resource_ids + dev_web_resource_ids + non_developers_resource_ids)
 
     mocked_chord: MagicMock = mocker.patch("mcod.reports.tasks.chord", return_value=MagicMock())
-    mocked_validate_link: MagicMock = mocker.patch("mcod.reports.tasks.validate_link")
+    mocked_validate_links_batch: MagicMock = mocker.patch("mcod.reports.tasks.validate_links_batch")
 
-    with override_settings(BROKEN_LINKS_EXCLUDE_DEVELOPERS=env_variable_value_broken_links_exclude_developers):
+    with override_settings(
+        BROKEN_LINKS_EXCLUDE_DEVELOPERS=env_variable_value_broken_links_exclude_developers, LINK_VALIDATION_BATCH_SIZE=2
+    ):
         # WHEN
         validate_resources_links()
     # THEN
     mocked_chord.assert_called_once()
     args, kwargs = mocked_chord.call_args
     subtask = args[0]
-    assert len(subtask) == expected_validations_count
+    assert len(subtask) == expected_batches_count
 
-    validated_resource_ids: List[int] = sorted([args[0] for args, kwargs in mocked_validate_link.s.call_args_list])
+    validated_resource_ids: List[int] = sorted(
+        [res_id for args, kwargs in mocked_validate_links_batch.s.call_args_list for res_id in args[0]]
+    )
 
     if env_variable_value_broken_links_exclude_developers:
         assert validated_resource_ids == non_developers_resource_ids
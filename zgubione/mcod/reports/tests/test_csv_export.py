@@ -0,0 +1,20 @@
+import pytest
+
+from mcod.reports.csv_export import iter_serialized
+from mcod.users.factories import UserFactory
+from mcod.users.models import User
+
+
+class IdSerializer:
+    def dump(self, objects):
+        return [{"id": obj.pk} for obj in objects]
+
+
+@pytest.mark.django_db
+def test_iter_serialized_keeps_order_of_queryset():
+    pks = [user.pk for user in UserFactory.create_batch(5)]
+    queryset = User.objects.filter(pk__in=pks).order_by("-pk")
+
+    rows = list(iter_serialized(IdSerializer(), queryset, chunk_size=2))
+
+    assert rows == [{"id": pk} for pk in sorted(pks, reverse=True)]
@@ -19,6 +19,7 @@ from django.contrib.auth import get_user_model
 from django.db.models import Sum
 from django.test import override_settings
 from django.utils.timezone import now
+from django.utils.translation import get_language
 
 from mcod.counters.models import ResourceDownloadCounter, ResourceViewCounter
 from mcod.datasets.factories import DatasetFactory
@@ -216,6 +217,21 @@ class TestTasks:
             assert "Zbior danych posiada dane dynamiczne" in dataframe_report
             assert "Zbior danych posiada dane badawcze" in dataframe_report
 
+    @mock.patch("mcod.reports.tasks.datetime")
+    def test_daily_resources_report_links(self, mock_datetime, tmp_path, admin_with_id_1, resource):
+        mock_datetime.datetime.now.return_value.strftime.return_value = "2020_02_05_2310"
+        with override_settings(REPORTS_MEDIA_ROOT=tmp_path, DAILY_RESOURCES_REPORT_COMPRESS=True):
+            create_daily_resources_report()
+        report = SummaryDailyReport.objects.last()
+        assert report.file.endswith("Zbiorczy_raport_dzienny_2020_02_05_2310.csv.gz")
+
+        dataframe_report = pd.read_csv(Path(tmp_path, "daily", "Zbiorczy_raport_dzienny_2020_02_05_2310.csv.gz"), sep=",")
+        row = dataframe_report[dataframe_report["Id zasobu"] == resource.id].iloc[0]
+        base_url = f"{settings.BASE_URL}/{get_language()}"
+        assert row["Link zasobu"] == f"{base_url}/dataset/{resource.dataset_id}/resource/{resource.id}"
+        assert row["Link zbioru"] == f"{base_url}/dataset/{resource.dataset_id}"
+        assert row["Link instytucji"] == f"{base_url}/institution/{resource.dataset.organization_id}"
+
     class TestHarvesterReportTasks:
         def test_generate_harvesters_imports_report(self, active_user: User):
             model_name = "harvester.DataSourceImport"
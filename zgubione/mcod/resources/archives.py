@@ -1,9 +1,11 @@
+import io
 import logging
 import os
+import shutil
 import tempfile
 import zipfile
 from pathlib import Path
-from typing import IO, BinaryIO, Iterator, Literal, Tuple, Union
+from typing import IO, BinaryIO, Dict, Iterable, Iterator, Literal, Optional, Tuple, Union
 
 import libarchive
 import magic
@@ -76,6 +78,28 @@ def is_password_protected_archive_file(file: BinaryIO) -> bool:
     return content_type_2_func[content_type](file)
 
 
+class _BlocksReader(io.RawIOBase):
+    """Read-only file-like object over an iterator of data blocks (e.g. `libarchive` entry blocks)."""
+
+    def __init__(self, blocks: Iterator[bytes]):
+        self._blocks = blocks
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        while not self._buffer:
+            self._buffer = next(self._blocks, None)
+            if self._buffer is None:
+                self._buffer = b""
+                return 0
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
 class ArchiveReader:
     format: Literal["rar", "other"]
 
@@ -83,6 +107,8 @@ class ArchiveReader:
         self.files: Tuple[Union[Path, str], ...] = ()
         self._source_file = Path(source)
         self._rar = None
+        self._rar_members: Dict[str, rarfile.RarInfo] = {}
+        self._extracted: Dict[str, Path] = {}
         if not self._source_file.exists():
             raise ValueError(f"File {self._source_file} does not exist")
         with open(self._source_file, "rb") as fd:
@@ -91,6 +117,7 @@ class ArchiveReader:
         self.root_dir = tempfile.TemporaryDirectory()
         if rarfile.is_rarfile(self._source_file):
             _rar_archive = rarfile.RarFile(self._source_file)
+            self._rar_members = {f.filename: f for f in _rar_archive.infolist() if f.is_file()}
             self.files = tuple([f.filename for f in _rar_archive.infolist() if f.is_file()])
             self._rar = _rar_archive
         else:
@@ -128,30 +155,53 @@ class ArchiveReader:
 
     def get_by_extension(self, extension: str) -> Iterator[Path]:
         extension = extension[1:] if extension.startswith(".") else extension
-        for f in self.files:
-            if f.endswith(f".{extension}"):
-                extracted_path = self.extract(f)
-                yield extracted_path
+        matching = [f for f in self.files if f.endswith(f".{extension}")]
+        extracted = self.extract_many(matching)
+        for f in matching:
+            yield extracted[f]
 
     def extract(self, path_in_archive: str) -> Path:
-        if path_in_archive not in self.files:
-            raise KeyError(path_in_archive)
-        target = os.path.join(self.root_dir.name, path_in_archive)
-        target_dir = os.path.dirname(target)
-        os.makedirs(target_dir, exist_ok=True)
+        return self.extract_many([path_in_archive])[path_in_archive]
+
+    def extract_many(self, paths_in_archive: Iterable[str]) -> Dict[str, Path]:
+        """
+        Extracts all requested files in a single sequential pass over the archive.
+        Already extracted files are not extracted again.
+        """
+        paths_in_archive = list(dict.fromkeys(paths_in_archive))
+        for path_in_archive in paths_in_archive:
+            if path_in_archive not in self.files:
+                raise KeyError(path_in_archive)
+        wanted = [p for p in paths_in_archive if p not in self._extracted or not self._extracted[p].exists()]
+        if wanted:
+            for path_in_archive, stream in self.iter_members(wanted):
+                target = os.path.join(self.root_dir.name, path_in_archive)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "wb") as f:
+                    shutil.copyfileobj(stream, f)
+                self._extracted[path_in_archive] = Path(target)
+        return {p: self._extracted[p] for p in paths_in_archive}
+
+    def iter_members(self, paths_in_archive: Optional[Iterable[str]] = None) -> Iterator[Tuple[str, BinaryIO]]:
+        """
+        Streams files of the archive (all or only requested ones) in a single sequential pass,
+        without writing them to the temporary directory. Every stream is valid only until the next
+        item is requested.
+        """
+        wanted = set(self.files if paths_in_archive is None else paths_in_archive)
         if self._rar:
-            for f in self._rar.infolist():
-                if f.filename == path_in_archive:
-                    self._rar.extract(f, target_dir)
-        else:
-            with libarchive.file_reader(str(self._source_file)) as archive:
-                for entry in archive:
-                    if entry.isfile:
-                        if entry.path == path_in_archive:
-                            with open(target, "wb") as f:
-                                for block in entry.get_blocks():
-                                    f.write(block)
-        return Path(target)
+            for path_in_archive, member in self._rar_members.items():
+                if path_in_archive in wanted:
+                    with self._rar.open(member) as stream:
+                        yield path_in_archive, stream
+            return
+        with libarchive.file_reader(str(self._source_file)) as archive:
+            for entry in archive:
+                if not wanted:
+                    break
+                if entry.isfile and entry.path in wanted:
+                    wanted.discard(entry.path)
+                    yield entry.path, io.BufferedReader(_BlocksReader(iter(entry.get_blocks())))
 
     def extract_single(self) -> Path:
         if len(self.files) != 1:
@@ -159,6 +209,17 @@ class ArchiveReader:
         path_in_archive = self.files[0]
         return self.extract(path_in_archive)
 
+    def read_single(self) -> bytes:
+        """Returns content of the only file of the archive without extracting it to the temporary directory."""
+        if len(self.files) != 1:
+            raise KeyError(0)
+        members = self.iter_members(self.files[:1])
+        try:
+            _, stream = next(members)
+            return stream.read()
+        finally:
+            members.close()
+
     def __repr__(self) -> str:
         files_ = ", ".join(self.files[:4])
         if len(self.files) > 4:
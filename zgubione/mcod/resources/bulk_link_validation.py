@@ -0,0 +1,184 @@
+"""
+Concurrent validation of links of many resources at once (used by the broken links reports).
+
+Requests are sent from a thread pool scheduled by the asyncio event loop, which limits the number of
+simultaneous requests to a single host (`LINK_VALIDATION_HOST_CONCURRENCY`) - links of different hosts
+are checked in parallel, but no publisher gets flooded with requests. Once requests to a host failed
+`LINK_VALIDATION_HOST_MAX_ERRORS` times in a row because of connection errors or timeouts, the rest
+of its links fail with the same error without sending requests.
+
+Validators (ETag, Last-Modified) of valid links are cached and sent in conditional requests next time,
+`304 Not Modified` response means that the link is still valid. GET requests (sent if HEAD request
+failed) are closed as soon as the response headers are received.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from uuid import uuid4
+
+import requests
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db.transaction import atomic
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from mcod.resources.link_validation import (
+    generate_random_user_agent,
+    validate_link_response,
+    validate_url,
+)
+
+logger = logging.getLogger("mcod")
+
+LINK_VALIDATORS_KEY = "link-validators:{}"
+LINK_VALIDATORS_TIMEOUT = 40 * 24 * 60 * 60  # links are validated for the monthly broken links report.
+VALIDATE_LINK_TASK_NAME = "mcod.resources.tasks.validate_link"
+
+
+@dataclass
+class LinkCheck:
+    resource_id: int
+    url: str
+    resource_type: str
+    error: Optional[Exception] = None
+    validators: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def is_valid(self) -> bool:
+        return self.error is None
+
+
+def get_link_validators_key(url: str) -> str:
+    return LINK_VALIDATORS_KEY.format(hashlib.sha1(url.encode()).hexdigest())
+
+
+def _create_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _check_link(session: requests.Session, check: LinkCheck, previous_validators: Dict[str, str]) -> Dict[str, str]:
+    """Validates the link the same way as `check_link_status`, returns validators of the valid link."""
+    validate_url(check.url)
+    headers = {"User-Agent": generate_random_user_agent()}
+    if "etag" in previous_validators:
+        headers["If-None-Match"] = previous_validators["etag"]
+    if "last_modified" in previous_validators:
+        headers["If-Modified-Since"] = previous_validators["last_modified"]
+    timeout = (settings.LINK_VALIDATION_CONNECT_TIMEOUT, settings.LINK_VALIDATION_READ_TIMEOUT)
+
+    response = session.head(check.url, allow_redirects=True, timeout=timeout, headers=headers)
+    if response.status_code not in (200, 304):
+        with session.get(check.url, allow_redirects=True, timeout=timeout, headers=headers, stream=True) as response:
+            pass  # body is not read.
+    if response.status_code == 304 and previous_validators:
+        return previous_validators
+    validate_link_response(check.url, check.resource_type, response)
+    validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+    return {name: value for name, value in validators.items() if value}
+
+
+class LinkChecker:
+
+    def __init__(self, concurrency: Optional[int] = None, host_concurrency: Optional[int] = None):
+        self.concurrency = concurrency or settings.LINK_VALIDATION_CONCURRENCY
+        self.host_concurrency = host_concurrency or settings.LINK_VALIDATION_HOST_CONCURRENCY
+        self.host_max_errors = settings.LINK_VALIDATION_HOST_MAX_ERRORS
+
+    def check(self, checks: List[LinkCheck]) -> List[LinkCheck]:
+        cache = caches["default"]
+        keys = {check.url: get_link_validators_key(check.url) for check in checks}
+        previous_validators = cache.get_many(list(set(keys.values())))
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor, _create_session(self.concurrency) as session:
+            asyncio.run(self._check_all(checks, previous_validators, keys, executor, session))
+
+        cache.set_many(
+            {keys[check.url]: check.validators for check in checks if check.is_valid and check.validators},
+            timeout=LINK_VALIDATORS_TIMEOUT,
+        )
+        cache.delete_many([keys[check.url] for check in checks if not check.is_valid])
+        return checks
+
+    async def _check_all(self, checks, previous_validators, keys, executor, session):
+        loop = asyncio.get_running_loop()
+        host_semaphores = defaultdict(lambda: asyncio.Semaphore(self.host_concurrency))
+        host_errors = defaultdict(list)  # connection errors in a row.
+
+        async def check_link(check):
+            host = urlsplit(check.url).hostname or ""
+            async with host_semaphores[host]:
+                if len(host_errors[host]) >= self.host_max_errors:
+                    check.error = host_errors[host][-1]
+                    return
+                validators = previous_validators.get(keys[check.url]) or {}
+                try:
+                    check.validators = await loop.run_in_executor(executor, _check_link, session, check, validators)
+                except (requests.ConnectionError, requests.Timeout) as exc:
+                    host_errors[host].append(exc)
+                    check.error = exc
+                except Exception as exc:
+                    host_errors[host].clear()
+                    check.error = exc
+                else:
+                    host_errors[host].clear()
+
+        await asyncio.gather(*(check_link(check) for check in checks))
+        skipped_hosts = [host for host, errors in host_errors.items() if len(errors) >= self.host_max_errors]
+        if skipped_hosts:
+            logger.info(f"Links of hosts {', '.join(skipped_hosts)} were not checked after connection errors.")
+
+
+def save_link_checks(checks: List[LinkCheck], resources: Dict[int, dict]) -> None:
+    """
+    Saves results of link checks of `resources` (dicts with id, uuid, link, format and type by id) the same way
+    as `validate_link` task, with a few queries for the whole batch.
+    """
+    Resource = apps.get_model("resources", "Resource")
+    TaskResult = apps.get_model("resources", "TaskResult")
+    check_time = timezone.now()
+    task_results = []
+    for check in checks:
+        resource = resources[check.resource_id]
+        result = {
+            "uuid": str(resource["uuid"]),
+            "link": resource["link"],
+            "format": resource["format"],
+            "type": resource["type"],
+        }
+        if not check.is_valid:
+            result = {"exc_type": check.error.__class__.__name__, "exc_message": str(check.error), **result}
+        task_results.append(
+            TaskResult(
+                task_id=str(uuid4()),
+                task_name=VALIDATE_LINK_TASK_NAME,
+                status="SUCCESS" if check.is_valid else "FAILURE",
+                result=json.dumps(result),
+                content_type="application/json",
+                content_encoding="utf-8",
+                meta='{"children": []}',
+                date_done=check_time,
+            )
+        )
+
+    link_tasks = Resource.link_tasks.through
+    with atomic():
+        TaskResult.objects.bulk_create(task_results)
+        link_tasks.objects.bulk_create(
+            [link_tasks(resource_id=check.resource_id, taskresult_id=task.pk) for check, task in zip(checks, task_results)]
+        )
+        for status in ("SUCCESS", "FAILURE"):
+            resources_ids = [check.resource_id for check, task in zip(checks, task_results) if task.status == status]
+            if resources_ids:
+                Resource.raw.filter(pk__in=resources_ids).update(link_tasks_last_status=status, verified=check_time)
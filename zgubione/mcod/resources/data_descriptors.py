@@ -0,0 +1,68 @@
+"""
+Cache of tabular data descriptors used by the tabular data API (`/resources/{id}/data`).
+
+Descriptor of resource's data consists of:
+- shared part (stored in Redis): information if the `resource-<id>` index exists and headers map read from
+  the index mapping - building it requires ES calls,
+- compiled part (stored in process memory): dynamic `Document` class, API fields and sort map - built from
+  the shared part and the data schema.
+
+Shared part is rebuilt when data schema of the resource changes (it is stored together with the schema hash)
+or when it is invalidated (after reindexing or deleting of the resource data index). Compiled part is stored
+under the version of the shared part, so it is rebuilt whenever the shared part is.
+"""
+
+import hashlib
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+from django.core.cache import caches
+
+from mcod import settings
+
+DESCRIPTOR_CACHE_KEY = "tabular-data-descriptor:{}"
+
+_compiled_cache: "OrderedDict[Hashable, Any]" = OrderedDict()
+_compiled_cache_lock = threading.Lock()
+
+
+def _cache():
+    return caches[settings.TABULAR_DATA_DESCRIPTOR_CACHE_ALIAS]
+
+
+def get_schema_hash(schema: Any) -> str:
+    return hashlib.md5(json.dumps(schema, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def get_descriptor(idx_name: str, schema_hash: str, build: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    """Returns shared descriptor of the resource data index. `build` is called if there is no valid one in cache."""
+    key = DESCRIPTOR_CACHE_KEY.format(idx_name)
+    timeout = settings.TABULAR_DATA_DESCRIPTOR_CACHE_TIMEOUT
+    descriptor = _cache().get(key) if timeout else None
+    if not descriptor or descriptor.get("schema_hash") != schema_hash:
+        descriptor = build()
+        descriptor.update(schema_hash=schema_hash, version=uuid.uuid4().hex)
+        if timeout:
+            _cache().set(key, descriptor, timeout=timeout)
+    return descriptor
+
+
+def get_compiled(key: Hashable, build: Callable[[], Any]) -> Any:
+    """In-process LRU cache of objects compiled from the descriptor (document class, API fields, sort map)."""
+    with _compiled_cache_lock:
+        if key in _compiled_cache:
+            _compiled_cache.move_to_end(key)
+            return _compiled_cache[key]
+    value = build()
+    with _compiled_cache_lock:
+        _compiled_cache[key] = value
+        while len(_compiled_cache) > settings.TABULAR_DATA_DESCRIPTOR_LOCAL_CACHE_SIZE:
+            _compiled_cache.popitem(last=False)
+    return value
+
+
+def invalidate_descriptor(idx_name: str) -> None:
+    _cache().delete(DESCRIPTOR_CACHE_KEY.format(idx_name))
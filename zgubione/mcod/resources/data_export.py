@@ -0,0 +1,49 @@
+"""
+Streaming export of the resource's data (`/resources/{id}/data/export.{format}`).
+
+Rows are read from the `resource-<id>` index with scroll API and written to the response as they arrive,
+so whole table can be downloaded with a single request.
+"""
+
+import csv
+import io
+import json
+
+
+def iter_csv(rows, buffer_rows=500):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row_no, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if row_no % buffer_rows == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_ndjson(rows, buffer_rows=500):
+    rows = iter(rows)
+    headers = next(rows, None)
+    if headers is None:
+        return
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(headers, row)), ensure_ascii=False, default=str))
+        if len(lines) == buffer_rows:
+            yield "{}\n".format("\n".join(lines)).encode("utf-8")
+            lines = []
+    if lines:
+        yield "{}\n".format("\n".join(lines)).encode("utf-8")
+
+
+EXPORTERS = {
+    "csv": iter_csv,
+    "ndjson": iter_ndjson,
+}
+
+
+def export_data(data, export_format):
+    """Returns generator of the `export_format` encoded chunks of the data (IndexedData instance)."""
+    return EXPORTERS[export_format](data.iter_export_rows())
@@ -234,6 +234,11 @@ class TableApiSearchRequest(ListingSchema):
     )
     sum = search_fields.ColumnMetricAggregationField(aggregation_type="sum")
     avg = search_fields.ColumnMetricAggregationField(aggregation_type="avg")
+    after = search_fields.SearchAfterField(
+        required=False,
+        description="Cursor of the row (see meta.cursor of the row) after which the page starts. "
+        "Allows paging through all rows of the table, regardless of the page number limit.",
+    )
 
     class Meta:
         strict = True
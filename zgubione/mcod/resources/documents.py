@@ -3,6 +3,7 @@ from django_elasticsearch_dsl import fields
 from django_elasticsearch_dsl.registries import registry
 
 from mcod import settings as mcs
+from mcod.counters.models import ResourceDownloadCounter, ResourceViewCounter
 from mcod.harvester.serializers import DataSourceSerializer
 from mcod.lib.search.fields import TranslatedTextField
 from mcod.regions.documents import regions_field
@@ -128,6 +129,14 @@ class ResourceDocument(ExtendedDocument):
     language = fields.KeywordField()
     contains_protected_data = fields.BooleanField()
 
+    prefetch_related_lookups = (
+        "dataset__category",
+        "dataset__organization",
+        "dataset__source",
+        "regions",
+        "supplements",
+    )
+
     class Index:
         name = mcs.ELASTICSEARCH_INDEX_NAMES["resources"]
         settings = mcs.ELASTICSEARCH_DSL_SEARCH_INDEX_SETTINGS
@@ -149,6 +158,22 @@ class ResourceDocument(ExtendedDocument):
         elif isinstance(related_instance, Resource):
             return related_instance.related_data.filter(status="published")
 
+    def prepare_batch(self, instances):
+        super().prepare_batch(instances)
+        ids = [instance.id for instance in instances]
+        self.batch_data["downloads_counts"] = ResourceDownloadCounter.sum_counts_by("resource_id", ids)
+        self.batch_data["views_counts"] = ResourceViewCounter.sum_counts_by("resource_id", ids)
+
+    def prepare_computed_downloads_count(self, instance):
+        if "downloads_counts" in self.batch_data:
+            return self.batch_data["downloads_counts"].get(instance.id, 0)
+        return instance.computed_downloads_count
+
+    def prepare_computed_views_count(self, instance):
+        if "views_counts" in self.batch_data:
+            return self.batch_data["views_counts"].get(instance.id, 0)
+        return instance.computed_views_count
+
     def prepare_model_name(self, instance):
         return instance.category.type
 
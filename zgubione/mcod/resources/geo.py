@@ -1,16 +1,22 @@
+import hashlib
+import json
 import logging
 import os
 import string
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from pathlib import Path
 from typing import Dict, List, Tuple, Union
 
 import ijson
+import numpy as np
 import requests
 import shapefile
 import xmlschema
+from django.core.cache import caches
 from lxml import etree
 from pyproj import CRS, Transformer
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from tifffile import TiffFile
 
@@ -195,6 +201,28 @@ class NoTransformationRequired(Exception):
 WGS84_CRS_CODE = 4326
 
 
+def _coords_to_arrays(coords, arrays):
+    """
+    Replaces every list of coordinates (or a single point) of geojson `coordinates` with
+    an index of (n, 2) array appended to `arrays`. Returns the template of coordinates structure.
+    """
+    if isinstance(coords[0], (float, int)):
+        arrays.append(np.asarray([coords[:2]], dtype=float))
+        return len(arrays) - 1, True
+    if isinstance(coords[0][0], (float, int)):
+        arrays.append(np.asarray(coords, dtype=float)[:, :2])
+        return len(arrays) - 1, False
+    return [_coords_to_arrays(sub, arrays) for sub in coords]
+
+
+def _arrays_to_coords(template, arrays):
+    if isinstance(template, tuple):
+        idx, is_point = template
+        coords = arrays[idx].tolist()
+        return tuple(coords[0]) if is_point else tuple(tuple(co) for co in coords)
+    return tuple(_arrays_to_coords(sub, arrays) for sub in template)
+
+
 class ShapeTransformer:
     _transformer = None
 
@@ -208,29 +236,40 @@ class ShapeTransformer:
         except (StopIteration, NoTransformationRequired):
             pass
 
-    def recurrent_transform(self, coord_list):
-        if isinstance(coord_list[0], float):
-            return self._transformer.transform(*coord_list)[::-1]
-        elif isinstance(coord_list[0][0], (list, tuple)):
-            return tuple(self.recurrent_transform(sub_list) for sub_list in coord_list)
-        else:
-            return tuple(self._transformer.transform(*co)[::-1] for co in coord_list)
-
     def transform(self, shape):
-        geojson = shape.__geo_interface__
-        if self._transformer is not None:
-            geojson["coordinates"] = self.recurrent_transform(geojson["coordinates"])
-        return geojson
+        return self.transform_many([shape])[0]
+
+    def transform_many(self, shapes):
+        """
+        Converts shapes to geojson. Coordinates of all shapes are flattened into arrays
+        and transformed with a single (vectorized) call of the transformer.
+        """
+        geojsons = [shape.__geo_interface__ for shape in shapes]
+        if self._transformer is None:
+            return geojsons
+
+        arrays, templates = [], []
+        for geojson in geojsons:
+            coords = geojson.get("coordinates")
+            templates.append(_coords_to_arrays(coords, arrays) if coords else None)
+        if not arrays:
+            return geojsons
+
+        xy = np.concatenate(arrays)
+        lat, lon = self._transformer.transform(xy[:, 0], xy[:, 1])
+        transformed = np.split(np.column_stack((lon, lat)), np.cumsum([len(a) for a in arrays])[:-1])
+        for geojson, template in zip(geojsons, templates):
+            if template is not None:
+                geojson["coordinates"] = _arrays_to_coords(template, transformed)
+        return geojsons
 
 
 def _coord_list_median(coords, skip_last=False):
     if isinstance(coords[0][0], (float, int)):
+        arr = np.asarray(coords, dtype=float)[:, :2]
         if skip_last:
-            return sum(co[0] for co in coords[:-1]) / float(len(coords) - 1), sum(co[1] for co in coords[:-1]) / float(
-                len(coords) - 1
-            )
-        else:
-            return sum(co[0] for co in coords) / float(len(coords)), sum(co[1] for co in coords) / float(len(coords))
+            arr = arr[:-1]
+        return tuple(arr.mean(axis=0).tolist())
     else:
         sub_coords = [_coord_list_median(sub, skip_last) for sub in coords]
         return (
@@ -252,29 +291,51 @@ def median_point(geojson):
     return _coord_list_median(geojson["coordinates"], skip_last=geojson["type"].endswith("Polygon"))
 
 
-def _request_geocoder(text=None, **kwargs):
-    try:
-        params = {}
-        url = f"{settings.GEOCODER_URL}/v1/search"
-        if len(kwargs) == 0:
-            params["text"] = text
-        else:
-            params = kwargs
-            url += "/structured"
+_geocoder_session = None
 
-        response = requests.get(
-            url,
-            params=params,
-            auth=HTTPBasicAuth(settings.GEOCODER_USER, settings.GEOCODER_PASS),
-        )
 
+def get_geocoder_session():
+    """Returns shared HTTP session (with connection pool) used for geocoder requests."""
+    global _geocoder_session
+    if _geocoder_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=settings.GEOCODER_MAX_WORKERS)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.auth = HTTPBasicAuth(settings.GEOCODER_USER, settings.GEOCODER_PASS)
+        _geocoder_session = session
+    return _geocoder_session
+
+
+class GeocoderError(Exception):
+    pass
+
+
+def _request_geocoder(text=None, **kwargs):
+    """
+    Returns geometry of the first feature found by the geocoder or None if nothing was found.
+    Raises GeocoderError if the geocoder didn't respond properly.
+    """
+    params = {}
+    url = f"{settings.GEOCODER_URL}/v1/search"
+    if len(kwargs) == 0:
+        params["text"] = text
+    else:
+        params = kwargs
+        url += "/structured"
+
+    try:
+        response = get_geocoder_session().get(url, params=params, timeout=settings.GEOCODER_TIMEOUT)
         if response.status_code != 200:
-            raise Exception()
-        features = response.json().get("features")
-        if features:
-            return features[0].get("geometry")
-    except Exception:
-        pass
+            raise GeocoderError(f"Geocoder responded with status {response.status_code}")
+        data = response.json()
+    except (requests.RequestException, ValueError) as exc:
+        raise GeocoderError(str(exc)) from exc
+    if not isinstance(data, dict):
+        raise GeocoderError("Invalid geocoder response")
+    features = data.get("features")
+    if features:
+        return features[0].get("geometry")
 
 
 def first_non_digit(s):
@@ -308,7 +369,12 @@ def clean_house_number(number):
     return number
 
 
-def geocode(*args, **kwargs):
+GEOCODE_NOT_FOUND = "not-found"
+# result of geocoding which failed because of the geocoder error - not cached.
+GEOCODER_FAILED = object()
+
+
+def _structured_query(**kwargs):
     query = {}
     for kw in kwargs:
         if kw == "address":
@@ -323,14 +389,106 @@ def geocode(*args, **kwargs):
             "country",
         }:
             query[kw] = kwargs[kw]
+    return query
+
+
+def _geocode(*args, **kwargs):
+    query = _structured_query(**kwargs)
     result = None
+    error = None
     if query:
-        result = _request_geocoder(**query)
+        try:
+            result = _request_geocoder(**query)
+        except GeocoderError as exc:
+            error = exc
     if not result:
-        result = _request_geocoder(" ".join(str(v) for v in args) + " ".join(str(v) for v in kwargs.values()))
+        try:
+            result = _request_geocoder(" ".join(str(v) for v in args) + " ".join(str(v) for v in kwargs.values()))
+        except GeocoderError as exc:
+            error = exc
+    if not result and error:
+        # the address may exist, so it mustn't be cached as not found.
+        raise error
     return result
 
 
+def _safe_geocode(*args, **kwargs):
+    try:
+        return _geocode(*args, **kwargs)
+    except GeocoderError as exc:
+        logger.warning(f"Geocoding of {args or kwargs} failed: {exc}")
+        return GEOCODER_FAILED
+
+
+def _normalize_geocode_value(value):
+    return " ".join(str(value).lower().split())
+
+
+def geocode_cache_key(*args, **kwargs):
+    """Cache key of geocoder query - hash of the normalized address tuple."""
+    address = (
+        [_normalize_geocode_value(v) for v in args],
+        sorted((k, _normalize_geocode_value(v)) for k, v in kwargs.items()),
+    )
+    digest = hashlib.md5(json.dumps(address).encode("utf-8")).hexdigest()
+    return f"geocode:{digest}"
+
+
+def _geocoder_cache():
+    return caches[settings.GEOCODER_CACHE_ALIAS]
+
+
+def _get_cached_geocodes(keys):
+    if not settings.GEOCODER_CACHE_TIMEOUT or not keys:
+        return {}
+    return {key: None if value == GEOCODE_NOT_FOUND else value for key, value in _geocoder_cache().get_many(keys).items()}
+
+
+def _cache_geocodes(results):
+    if not settings.GEOCODER_CACHE_TIMEOUT or not results:
+        return
+    results = {key: value for key, value in results.items() if value is not GEOCODER_FAILED}
+    found = {key: value for key, value in results.items() if value}
+    not_found = {key: GEOCODE_NOT_FOUND for key, value in results.items() if not value}
+    cache = _geocoder_cache()
+    if found:
+        cache.set_many(found, timeout=settings.GEOCODER_CACHE_TIMEOUT)
+    if not_found:
+        cache.set_many(not_found, timeout=settings.GEOCODER_NEGATIVE_CACHE_TIMEOUT)
+
+
+def geocode(*args, **kwargs):
+    key = geocode_cache_key(*args, **kwargs)
+    cached = _get_cached_geocodes([key])
+    if key in cached:
+        return cached[key]
+    result = _safe_geocode(*args, **kwargs)
+    _cache_geocodes({key: result})
+    return None if result is GEOCODER_FAILED else result
+
+
+class BatchGeocoder:
+    """
+    Resolves many geocoder queries (dicts of `geocode` keyword arguments) at once.
+    Queries are deduplicated by cache key, cached results are read with a single cache call
+    and the rest is requested concurrently using shared connection pool.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or settings.GEOCODER_MAX_WORKERS
+
+    def resolve(self, queries):
+        queries = {geocode_cache_key(**query): query for query in queries}
+        results = _get_cached_geocodes(list(queries))
+        missing = [key for key in queries if key not in results]
+        if missing:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                resolved = dict(zip(missing, executor.map(lambda key: _safe_geocode(**queries[key]), missing)))
+            _cache_geocodes(resolved)
+            results.update({key: None if value is GEOCODER_FAILED else value for key, value in resolved.items()})
+        return results
+
+
 crs_CS92 = CRS.from_epsg(2180)
 transformer_CS92 = Transformer.from_crs(crs_CS92, WGS84_CRS_CODE)
 
@@ -342,6 +500,25 @@ def extract_coords_from_uaddress(uaddress):
         raise ExtractUAddressError(uaddress)
 
 
+def extract_coords_from_uaddresses(uaddresses):
+    """
+    Vectorized version of `extract_coords_from_uaddress`. Returns dict: uaddress -> coords.
+    Invalid uaddresses are omitted.
+    """
+    parsed = {}
+    for uaddress in set(uaddresses):
+        try:
+            x, y = uaddress.split("|")[5:7]
+            parsed[uaddress] = (float(x), float(y))
+        except (AttributeError, ValueError):
+            continue
+    if not parsed:
+        return {}
+    xy = np.asarray(list(parsed.values()), dtype=float)
+    lat, lon = transformer_CS92.transform(xy[:, 0], xy[:, 1])
+    return {uaddress: coords for uaddress, coords in zip(parsed, zip(lon.tolist(), lat.tolist()))}
+
+
 def check_geodata(path: Union[Path, str], content_type: str, family: str, is_extracted: bool = False) -> Tuple[str, str]:
     if is_geotiff(path):
         content_type += ";application=geotiff"
@@ -1,29 +1,42 @@
 import os
+import tempfile
 import uuid
 from collections import OrderedDict, namedtuple
 from datetime import datetime, time
+from itertools import islice
 
 import shapefile
+import unicodecsv
 from constance import config as constance_config
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django_elasticsearch_dsl import Index
 from elasticsearch import exceptions as es_exceptions
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import bulk, parallel_bulk
 from elasticsearch_dsl import Document, field as dsl_field
 from elasticsearch_dsl.connections import Connections
 from goodtables import validate as validate_table
-from tableschema import config
+from tableschema import Schema, config, exceptions as tableschema_exceptions
+from tabulator import Stream
 
 from mcod import settings
 from mcod.core.api import fields as api_fields
 from mcod.core.api.search.analyzers import polish_analyzer
 from mcod.resources.archives import ArchiveReader
+from mcod.resources.data_descriptors import (
+    get_compiled,
+    get_descriptor,
+    get_schema_hash,
+    invalidate_descriptor,
+)
 from mcod.resources.geo import (
+    BatchGeocoder,
     ShapeTransformer,
     clean_house_number,
     extract_coords_from_uaddress,
+    extract_coords_from_uaddresses,
     geocode,
+    geocode_cache_key,
     median_point,
 )
 from mcod.resources.goodtables_checks import ZERO_DATA_ROWS
@@ -41,6 +54,18 @@ class ResourceDataValidationError(Exception):
     pass
 
 
+def skip_empty(data):
+    """Removes empty values from document source the same way as `Document.to_dict(skip_empty=True)` does."""
+    out = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            value = skip_empty(value)
+        if value in ([], {}, None):
+            continue
+        out[key] = value
+    return out
+
+
 def get_float_or_none(value):
     try:
         val = float(value)
@@ -62,6 +87,7 @@ class IndexedData:
             self.idx_name = "{}-{}".format(idx_prefix, self.idx_name)
         self._idx_cache = None
         self._doc_cache = None
+        self._descriptor_cache = None
         self._reversed_headers_map_cache = None
         self._headers_map_cache = None
 
@@ -79,23 +105,66 @@ class IndexedData:
 
     @property
     def available(self):
-        if not self.idx.exists():
+        if not self.descriptor["index_exists"]:
             return False
         return self.resource.data_is_valid
 
+    @property
+    def descriptor(self):
+        """Cached information about the data index (see `mcod.resources.data_descriptors`)."""
+        if not self._descriptor_cache:
+            self._descriptor_cache = get_descriptor(
+                self.idx_name,
+                get_schema_hash(self.resource.tabular_data_schema),
+                self._build_descriptor,
+            )
+        return self._descriptor_cache
+
+    def _build_descriptor(self):
+        index_exists = bool(self.idx.exists())
+        headers = None
+        if index_exists:
+            try:
+                headers = self.idx.get_mapping()[self.idx_name]["mappings"]["doc"]["_meta"]["headers"]
+            except (es_exceptions.NotFoundError, KeyError):
+                pass
+        return {"index_exists": index_exists, "headers": headers}
+
+    def _get_compiled(self, name, build):
+        return get_compiled((self.idx_name, self.descriptor["version"], name), build)
+
+    def invalidate_descriptor(self):
+        invalidate_descriptor(self.idx_name)
+        self._descriptor_cache = None
+        self._reversed_headers_map_cache = None
+        self._headers_map_cache = None
+
     def prepare_doc(self):
         raise NotImplementedError
 
     @property
     def doc(self):
         if not self._doc_cache:
-            self._doc_cache = self.prepare_doc()
+            self._doc_cache = self._get_compiled("doc", self.prepare_doc)
         return self._doc_cache
 
     def get_api_fields(self):
+        return dict(self._get_compiled("api_fields", self._get_api_fields))
+
+    def _get_api_fields(self):
         raise NotImplementedError
 
+    def get_api_schema(self, name, factory):
+        """
+        Returns serializer schema class built by `factory` from the API fields of the data.
+        Class is dedicated to the data index (and its schema) so shared schemas are never modified.
+        """
+        return self._get_compiled(name, lambda: factory(self.get_api_fields()))
+
     def get_sort_map(self):
+        return dict(self._get_compiled("sort_map", self._get_sort_map))
+
+    def _get_sort_map(self):
         sort_map = {}
         for k, v in self.get_api_fields().items():
             f = f"{k}.val"
@@ -130,10 +199,7 @@ class IndexedData:
     @property
     def reversed_headers_map(self):
         if not self._reversed_headers_map_cache:
-            try:
-                headers = self.idx.get_mapping()[self.idx_name]["mappings"]["doc"]["_meta"]["headers"]
-            except (es_exceptions.NotFoundError, KeyError):
-                headers = self.doc._doc_type.mapping._meta["_meta"]["headers"]
+            headers = self.descriptor["headers"] or self.doc._doc_type.mapping._meta["_meta"]["headers"]
             headers = {item: key for key, item in headers.items()}
             self._reversed_headers_map_cache = OrderedDict(
                 sorted(
@@ -159,6 +225,31 @@ class IndexedData:
         for result in results.hits:
             yield result
 
+    def scan(self, chunk_size=None):
+        """Yields all documents of the data index in `row_no` order - uses scroll API instead of (deep) paging."""
+        _search = (
+            self.doc.search()
+            .sort("row_no")
+            .params(
+                preserve_order=True,
+                size=chunk_size or settings.RESOURCE_DATA_EXPORT_CHUNK_SIZE,
+                scroll=settings.RESOURCE_DATA_EXPORT_SCROLL,
+            )
+        )
+        yield from _search.scan()
+
+    def iter_export_rows(self, chunk_size=None):
+        """Yields list of headers and then rows of the data index - values are returned as they were in the file."""
+        headers = list(self.reversed_headers_map.items())
+        yield [header for header, col_name in headers]
+        for hit in self.scan(chunk_size=chunk_size):
+            source = hit.to_dict()
+            row = []
+            for header, col_name in headers:
+                value = source.get(col_name)
+                row.append(value.get("repr") if isinstance(value, dict) else value)
+            yield row
+
     def get_schema(self, **kwargs):
         raise NotImplementedError
 
@@ -166,13 +257,25 @@ class IndexedData:
     def schema(self):
         return self.doc.search()
 
-    def _docs_iter(self, doc):
+    def _sources_iter(self, rows=None):
+        """Yields (document id, document source) tuples."""
         raise NotImplementedError
 
-    def index(self, force=False, chunk_size=500):
+    def _docs_iter(self, doc, rows=None):
+        for row_id, source in self._sources_iter(rows=rows):
+            d = doc(**source)
+            d.meta.id = row_id
+            yield d
+
+    def _actions_iter(self, rows=None):
+        for row_id, source in self._sources_iter(rows=rows):
+            yield {"_id": row_id, "_source": skip_empty(source)}
+
+    def index(self, force=False, chunk_size=500, rows=None, parallel=None):
         doc = self.doc
         if force:
             self.idx.delete(ignore_unavailable=True)
+        self.invalidate_descriptor()
 
         self.idx.settings(**settings.ELASTICSEARCH_DSL_INDEX_SETTINGS)
         self.idx.mapping(doc._doc_type.mapping)
@@ -181,9 +284,18 @@ class IndexedData:
 
         es = es_connections.get_connection()
 
+        parallel = settings.RESOURCE_DATA_PARALLEL_INDEXING if parallel is None else parallel
+        try:
+            if parallel:
+                return self._parallel_index(es, doc, rows=rows)
+            return self._bulk_index(es, doc, rows=rows, chunk_size=chunk_size)
+        finally:
+            self.invalidate_descriptor()
+
+    def _bulk_index(self, es, doc, rows=None, chunk_size=500):
         success, failed = bulk(
             es,
-            (d.to_dict(True) for d in self._docs_iter(doc)),
+            (d.to_dict(True) for d in self._docs_iter(doc, rows=rows)),
             index=self.idx_name,
             doc_type=doc._doc_type.name,
             chunk_size=chunk_size,
@@ -195,6 +307,43 @@ class IndexedData:
 
         return success, failed
 
+    def _parallel_index(self, es, doc, rows=None):
+        """
+        Indexes raw action dicts in chunks limited by size in bytes, sent concurrently by a pool of threads.
+        Refreshing and replication of the index are disabled during loading and restored afterwards.
+        """
+        self.idx.put_settings(body={"index": {"refresh_interval": "-1", "number_of_replicas": 0}})
+        success, failed = 0, 0
+        try:
+            for ok, _item in parallel_bulk(
+                es,
+                self._actions_iter(rows=rows),
+                index=self.idx_name,
+                doc_type=doc._doc_type.name,
+                thread_count=settings.RESOURCE_DATA_INDEXING_THREAD_COUNT,
+                chunk_size=settings.RESOURCE_DATA_INDEXING_MAX_CHUNK_ROWS,
+                max_chunk_bytes=settings.RESOURCE_DATA_INDEXING_MAX_CHUNK_BYTES,
+            ):
+                if ok:
+                    success += 1
+                else:
+                    failed += 1
+        finally:
+            self.idx.put_settings(
+                body={
+                    "index": {
+                        "refresh_interval": None,
+                        "number_of_replicas": settings.ELASTICSEARCH_DSL_INDEX_SETTINGS.get("number_of_replicas", 1),
+                    }
+                }
+            )
+
+        if success:
+            self.idx.refresh()
+            self.idx.flush()
+
+        return success, failed
+
     @property
     def has_geo_data(self):
         return False
@@ -272,11 +421,13 @@ class ShpData(IndexedData):
     @property
     def source(self):
         if not self._source:
-            with ArchiveReader(self.resource.main_file.path) as extracted:
-                shp_path = next(extracted.get_by_extension("shp"))
-                self._source = shapefile.Reader(shp_path)
-                prj_path = next(extracted.get_by_extension("prj"))
-                self._transformer = ShapeTransformer(prj_path)
+            with ArchiveReader(self.resource.main_file.path) as archive:
+                shp_name = next(f for f in archive if f.endswith(".shp"))
+                prj_name = next(f for f in archive if f.endswith(".prj"))
+                shp_base = shp_name[: -len(".shp")]
+                extracted = archive.extract_many([prj_name] + [f for f in archive if f.rsplit(".", 1)[0] == shp_base])
+                self._source = shapefile.Reader(str(extracted[shp_name]))
+                self._transformer = ShapeTransformer(extracted[prj_name])
         return self._source
 
     def get_schema(self, **kwargs):
@@ -330,7 +481,7 @@ class ShpData(IndexedData):
         doc._doc_type.mapping._meta["_meta"] = {"headers": _map}
         return doc
 
-    def get_api_fields(self):
+    def _get_api_fields(self):
         record_fields = {}
         for f in self.schema:
             field_name = self.reversed_headers_map[f.name]
@@ -342,9 +493,18 @@ class ShpData(IndexedData):
     def _get_row_id(row):
         return str(uuid.uuid5(uuid.NAMESPACE_DNS, "+|+".join(str(i)[:10000] for i in row)))
 
-    def _docs_iter(self, doc):
-        for row_no, sr in enumerate(self.source.shapeRecords(), 1):
-            geojson = self._transformer.transform(sr.shape)
+    def _transformed_iter(self, rows, chunk_size=500):
+        """Yields (shape record, geojson) tuples - shapes are transformed in chunks."""
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            yield from zip(chunk, self._transformer.transform_many([sr.shape for sr in chunk]))
+
+    def _sources_iter(self, rows=None):
+        rows = self.source.shapeRecords() if rows is None else rows
+        for row_no, (sr, geojson) in enumerate(self._transformed_iter(rows), 1):
             v = {
                 "shape": geojson,
                 "updated_at": datetime.now(),
@@ -359,9 +519,7 @@ class ShpData(IndexedData):
             tds = self.resource.tabular_data_schema
             if tds is not None and "geo" in tds and "label" in tds["geo"]:
                 v["label"] = sr.record[tds["geo"]["label"].get("col_name")]
-            d = doc(**v)
-            d.meta.id = self._get_row_id(sr.record)
-            yield d
+            yield self._get_row_id(sr.record), v
 
 
 def prepare_item(item, col_type=None, special_signs=None):
@@ -369,7 +527,7 @@ def prepare_item(item, col_type=None, special_signs=None):
     Prepare some values to work with ElasticSearch.
     We need this because cast of values is disabled in function:
 
-        def _docs_iter(self, doc):
+        def _sources_iter(self, rows=None):
             for row_no, row in enumerate(self.table.iter(keyed=True, cast=False)):
 
     you may need to combine this with the column type in the future
@@ -472,6 +630,8 @@ class TabularData(IndexedData):
         self._table_cache = None
         self._schema_cache = None
         self._reversed_headers_map_cache = None
+        self._geocoded = None
+        self._uaddress_points = None
 
     @property
     def has_geo_data(self):
@@ -532,7 +692,7 @@ class TabularData(IndexedData):
         doc._doc_type.mapping._meta["_meta"] = {"headers": _map}
         return doc
 
-    def get_api_fields(self):
+    def _get_api_fields(self):
         _fields = {}
         for _f in self.schema["fields"]:
             field_name = self.reversed_headers_map[_f["name"]]
@@ -572,7 +732,11 @@ class TabularData(IndexedData):
 
         return _schema
 
-    def infer_schema(self):
+    def infer_schema(self, source=None):
+        """
+        Infers schema of the resource file. If `source` (inline list of rows, headers first) is passed,
+        schema is inferred from it instead of reading the file again.
+        """
         if not self.resource.main_file:
             raise ValidationError(_("File does not exist"))
 
@@ -580,10 +744,10 @@ class TabularData(IndexedData):
             raise ValidationError(_("Invalid file type"))
 
         _table = Table(
-            self.resource.file_data_path,
+            source if source is not None else self.resource.file_data_path,
             ignore_blank_headers=True,
-            format=self.resource_format,
-            encoding=self.resource_encoding or "utf-8",
+            format="inline" if source is not None else self.resource_format,
+            encoding=None if source is not None else self.resource_encoding or "utf-8",
             skip_rows={"type": "preset", "value": "blank"},
         )
         _schema = _table.infer(limit=5000, missing_values=self.missing_values)
@@ -607,7 +771,11 @@ class TabularData(IndexedData):
 
         return self._schema_cache
 
-    def validate(self):
+    def validate(self, source=None):
+        """
+        Validates structure of the resource file. If `source` (inline list of rows, headers first) is passed,
+        it is validated instead of the file.
+        """
         kwargs = dict(
             checks=["structure", "schema", ZERO_DATA_ROWS],
             skip_checks=["extra-header", "blank-header", "blank-row", "duplicate-row"],
@@ -628,12 +796,17 @@ class TabularData(IndexedData):
                     and ";" in kwargs["schema"]["fields"][0]["name"]
                 ):
                     kwargs["delimiter"] = ";"
+                    # rows of inline source are already split with detected delimiter.
+                    source = None
             except (KeyError, TypeError):
                 pass
         else:
             kwargs["infer_schema"] = True
 
-        report = validate_table(self.resource.file_data_path, **kwargs)
+        if source is not None:
+            kwargs["format"] = "inline"
+            kwargs.pop("encoding")
+        report = validate_table(source if source is not None else self.resource.file_data_path, **kwargs)
         if not report["valid"]:
             raise ResourceDataValidationError(report["tables"][0]["errors"])
 
@@ -656,7 +829,29 @@ class TabularData(IndexedData):
         return self._table_cache
 
     @staticmethod
-    def _get_point(row, gd):
+    def _requires_geocoding(gd):
+        return (
+            not all(co in gd for co in ("l", "b")) and "uaddress" not in gd and all(co in gd for co in ("place", "postal_code"))
+        )
+
+    @staticmethod
+    def _requires_uaddress_transformation(gd):
+        return not all(co in gd for co in ("l", "b")) and "uaddress" in gd
+
+    @staticmethod
+    def _get_geocode_kwargs(row, gd):
+        def get_col(col):
+            return row[gd[col]["col_name"]] or ""
+
+        kwargs = dict(postalcode=get_col("postal_code"), locality=get_col("place"))
+        if "street" in gd:
+            kwargs["address"] = get_col("street")
+            if "house_number" in gd:
+                kwargs["address"] += f" {clean_house_number(get_col('house_number'))}"
+        return kwargs
+
+    @staticmethod
+    def _get_point(row, gd, geocoded=None, uaddress_points=None):
         def get_col(col):
             return row[gd[col]["col_name"]] or ""
 
@@ -666,21 +861,62 @@ class TabularData(IndexedData):
             if l and b:
                 point = [l, b]
         elif "uaddress" in gd:
-            point = extract_coords_from_uaddress(get_col("uaddress"))
+            uaddress = get_col("uaddress")
+            if uaddress_points and uaddress in uaddress_points:
+                point = uaddress_points[uaddress]
+            else:
+                point = extract_coords_from_uaddress(uaddress)
         elif all(co in gd for co in ("place", "postal_code")):
-            kwargs = dict(postalcode=get_col("postal_code"), locality=get_col("place"))
-            if "street" in gd:
-                kwargs["address"] = get_col("street")
-                if "house_number" in gd:
-                    kwargs["address"] += f" {clean_house_number(get_col('house_number'))}"
-            point = geocode(**kwargs)
+            kwargs = TabularData._get_geocode_kwargs(row, gd)
+            key = geocode_cache_key(**kwargs)
+            point = geocoded[key] if geocoded and key in geocoded else geocode(**kwargs)
             if point:
                 point = point["coordinates"]
         return point
 
-    def _docs_iter(self, doc):
-
-        for row_no, row in enumerate(self.table.iter(keyed=True, cast=False)):
+    def _iter_chunks(self, rows):
+        """Yields chunks of rows together with non empty rows of the chunk converted to dicts."""
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, settings.GEOCODER_BATCH_SIZE))
+            if not chunk:
+                break
+            dict_rows = (self._row_2_dict(row) if isinstance(row, (list, tuple)) else row for row in chunk)
+            yield chunk, [row for row in dict_rows if row and not all(x is None for x in row.values())]
+
+    def _prefetch_geocodes(self, rows, gd):
+        """
+        Reads rows in chunks and resolves addresses of the whole chunk at once (see `BatchGeocoder`)
+        before the rows are yielded. Results are available in `self._geocoded`.
+        """
+        geocoder = BatchGeocoder()
+        for chunk, dict_rows in self._iter_chunks(rows):
+            self._geocoded = geocoder.resolve([self._get_geocode_kwargs(row, gd) for row in dict_rows])
+            yield from chunk
+        self._geocoded = None
+
+    def _prefetch_uaddress_points(self, rows, gd):
+        """
+        Reads rows in chunks and transforms coordinates of all uaddresses of the chunk with a single
+        (vectorized) call before the rows are yielded. Results are available in `self._uaddress_points`.
+        """
+        col_name = gd["uaddress"]["col_name"]
+        for chunk, dict_rows in self._iter_chunks(rows):
+            self._uaddress_points = extract_coords_from_uaddresses(row[col_name] for row in dict_rows if row[col_name])
+            yield from chunk
+        self._uaddress_points = None
+
+    def _prefetch_points(self, rows):
+        gd = self.schema.get("geo", {}) if self.schema else {}
+        if gd and self._requires_geocoding(gd):
+            return self._prefetch_geocodes(rows, gd)
+        if gd and self._requires_uaddress_transformation(gd):
+            return self._prefetch_uaddress_points(rows, gd)
+        return rows
+
+    def _sources_iter(self, rows=None):
+        rows = self.table.iter(keyed=True, cast=False) if rows is None else rows
+        for row_no, row in enumerate(self._prefetch_points(rows)):
             if not row:
                 continue
 
@@ -710,7 +946,7 @@ class TabularData(IndexedData):
             if self.schema:
                 gd = self.schema.get("geo", {})
                 if gd:
-                    point = self._get_point(row, gd)
+                    point = self._get_point(row, gd, geocoded=self._geocoded, uaddress_points=self._uaddress_points)
                     if point is not None:
                         r.update(
                             {
@@ -720,6 +956,126 @@ class TabularData(IndexedData):
                                 "shape_type": 1,
                             }
                         )
-            d = doc(**r)
-            d.meta.id = row_id
-            yield d
+            yield row_id, r
+
+
+class TabularDataIngestion:
+    """
+    Single pass ingestion of the tabular resource file.
+
+    The file is decoded only once. First `sample_size` rows are buffered and used for schema inference
+    and structural validation. Buffered rows followed by the rest of the stream are then used to generate
+    ES documents and - if `convert_to_csv` is set - written to the CSV conversion file at the same time.
+
+    Usage:
+
+        with TabularDataIngestion(resource.data, convert_to_csv=True) as ingestion:
+            schema = ingestion.infer_schema()
+            ingestion.validate()
+            success, failed = ingestion.index(force=True)
+            csv_path = ingestion.csv_path
+    """
+
+    sample_size = 5000
+
+    def __init__(self, data, convert_to_csv=False, sample_size=None):
+        self.data = data
+        self.convert_to_csv = convert_to_csv
+        self.sample_size = sample_size or self.sample_size
+        self.csv_path = None
+        self._stream = None
+        self._rows = None
+        self._headers = None
+        self._sample = []
+        self._consumed = False
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        if exc_type is not None:
+            self.discard_csv()
+
+    def open(self):
+        resource = self.data.resource
+        self._stream = Stream(
+            resource.file_data_path,
+            headers=1,
+            ignore_blank_headers=True,
+            format=self.data.resource_format,
+            encoding=self.data.resource_encoding or "utf-8",
+        )
+        self._stream.open()
+        self._headers = self._stream.headers or []
+        self._rows = self._stream.iter()
+        for row in self._rows:
+            self._sample.append(row)
+            if len(self._sample) >= self.sample_size:
+                break
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def discard_csv(self):
+        if self.csv_path and os.path.exists(self.csv_path):
+            os.remove(self.csv_path)
+        self.csv_path = None
+
+    @property
+    def headers(self):
+        return self._headers
+
+    @property
+    def inline_sample(self):
+        return [list(self._headers)] + [list(row) for row in self._sample]
+
+    def infer_schema(self):
+        return self.data.infer_schema(source=self.inline_sample)
+
+    def validate(self):
+        return self.data.validate(source=self.inline_sample)
+
+    def _iter_rows(self):
+        if self._consumed:
+            raise RuntimeError("Rows of the ingested file can be iterated only once.")
+        self._consumed = True
+        yield from self._sample
+        self._sample = []
+        yield from self._rows
+
+    def _iter_keyed_rows(self, csv_writer=None, csv_schema=None):
+        for row in self._iter_rows():
+            if csv_writer is not None:
+                try:
+                    csv_writer.writerow(csv_schema.cast_row(list(row)))
+                except tableschema_exceptions.TableSchemaException:
+                    # conversion falls back to Resource.increase_openness_score.
+                    csv_writer = None
+            yield dict(zip(self._headers, row))
+        if csv_writer is None:
+            self.discard_csv()
+
+    def _csv_schema(self):
+        schema = Schema(self.data.schema)
+        if schema.field_names != list(self._headers):
+            return None
+        return schema
+
+    def index(self, force=False, chunk_size=500):
+        csv_schema = self._csv_schema() if self.convert_to_csv else None
+        if csv_schema is None:
+            return self.data.index(force=force, chunk_size=chunk_size, rows=self._iter_keyed_rows())
+
+        fd, self.csv_path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "wb") as f:
+            csv_writer = unicodecsv.writer(f, encoding="utf-8")
+            csv_writer.writerow(csv_schema.field_names)
+            return self.data.index(
+                force=force,
+                chunk_size=chunk_size,
+                rows=self._iter_keyed_rows(csv_writer=csv_writer, csv_schema=csv_schema),
+            )
@@ -212,16 +212,24 @@ def check_link_scheme(link):
 
 def check_link_status(url, resource_type):
     logger.debug(f"check_link_status({url})")
-    try:
-        URLValidator()(url)
-    except ValidationError:
-        raise InvalidUrl("Invalid url address: %s" % url)
+    validate_url(url)
 
     headers = {"User-Agent": generate_random_user_agent()}
     response = session.head(url, allow_redirects=True, timeout=30, headers=headers)
     if response.status_code != 200:
         response = session.get(url, allow_redirects=True, timeout=30, headers=headers)
 
+    validate_link_response(url, resource_type, response)
+
+
+def validate_url(url):
+    try:
+        URLValidator()(url)
+    except ValidationError:
+        raise InvalidUrl("Invalid url address: %s" % url)
+
+
+def validate_link_response(url, resource_type, response):
     if response.status_code != 200:
         raise InvalidResponseCode("Invalid response code: %s" % response.status_code)
 
@@ -61,6 +61,7 @@ from mcod.core.db.models import (
     update_watcher,
 )
 from mcod.counters.models import ResourceDownloadCounter, ResourceViewCounter
+from mcod.counters.stats import mark_changed_day
 from mcod.datasets.models import BaseSupplement, Dataset
 from mcod.lib.data_rules import painless_body
 from mcod.lib.date_utils import date_at_midnight
@@ -916,15 +917,25 @@ class Resource(ExtendedModel):
             return self.data
         return None
 
-    def increase_openness_score(self):
-        csv_file = None
+    @property
+    def is_csv_conversion_required(self):
         xls_formats = ["xls", "xlsx"]
-        if (
-            (self.format in xls_formats or self.main_file_compressed_format in xls_formats)
-            and not self.is_linked
-            and self.has_data
-            and self.data.table
-        ):
+        return (self.format in xls_formats or self.main_file_compressed_format in xls_formats) and not self.is_linked
+
+    def increase_openness_score(self, converted_csv_path=None):
+        """
+        Creates CSV (for XLS/XLSX files) and JSON-LD conversions of the resource file.
+        If `converted_csv_path` is passed, CSV conversion written during data ingestion is used
+        (and removed afterwards) instead of reading the file again.
+        """
+        csv_file = None
+        if converted_csv_path and os.path.exists(converted_csv_path):
+            if self.is_csv_conversion_required:
+                csv_filename = os.path.splitext(self.file_basename)[0]
+                with open(converted_csv_path, "rb") as f:
+                    csv_file = self.save_file(f, f"{csv_filename}.csv")
+            os.remove(converted_csv_path)
+        elif self.is_csv_conversion_required and self.has_data and self.data.table:
             csv_filename = os.path.splitext(self.file_basename)[0]
             headers = self.data.table.schema.field_names
             f = BytesIO()
@@ -986,7 +997,7 @@ class Resource(ExtendedModel):
         os.makedirs(dest_dir, exist_ok=True)
         file_path = os.path.join(dest_dir, filename)
         with open(file_path, "wb") as f:
-            f.write(content.read())
+            shutil.copyfileobj(content, f)
         return "%s/%s" % (subdir, filename)
 
     def revalidate(self, update_verification_date: bool = True):
@@ -1857,9 +1868,9 @@ def update_modified_by(sender, instance, *args, **kwargs):
 
 @receiver(update_chart_resource, sender=Chart)
 def update_chart_resource_handler(sender, instance, *args, **kwargs):
-    Resource.objects.filter(id=instance.resource_id).update(
-        has_chart=instance.resource.charts.filter(is_removed=False, is_permanently_removed=False, is_default=True).exists()
-    )
+    has_chart = instance.resource.charts.filter(is_removed=False, is_permanently_removed=False, is_default=True).exists()
+    if Resource.objects.filter(id=instance.resource_id).exclude(has_chart=has_chart).update(has_chart=has_chart):
+        mark_changed_day(instance.resource.created)
     sender.log_debug(instance, "Reindex resource after chart updated", "update_chart_resource")
     search_signals.update_document_with_related.send(instance.resource._meta.model, instance.resource)
 
@@ -40,9 +40,7 @@ def calculate_score_for_archive(source_data: SourceData) -> Tuple[Optional[Optio
                     extension = source_data.extension
                 else:
                     extension = extensions[0]
-                extracted = archive.extract_single()
-                with open(extracted, "rb") as inner_fd:
-                    inner_data = inner_fd.read()
+                inner_data = archive.read_single()
                 return None, SourceData(
                     extension=extension,
                     data=inner_data,
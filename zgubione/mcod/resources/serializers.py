@@ -3,8 +3,10 @@ import json
 import marshmallow as ma
 from django.utils.html import strip_tags
 from django.utils.translation import gettext_lazy as _
+from querystring_parser import builder
 
 import mcod.core.api.rdf.namespaces as ns
+from mcod import settings
 from mcod.core.api import fields, schemas
 from mcod.core.api.jsonapi.serializers import (
     Aggregation,
@@ -21,6 +23,7 @@ from mcod.core.api.rdf.schema_mixins import ProfilesMixin
 from mcod.core.api.rdf.schemas import ResponseSchema as RDFResponseSchema
 from mcod.core.api.rdf.vocabs.common import VocabSKOSConcept, VocabSKOSConceptScheme
 from mcod.core.api.schemas import ExtSchema
+from mcod.core.api.search.fields import SearchAfterField
 from mcod.core.serializers import CSVSchemaRegistrator, CSVSerializer, ListWithoutNoneStrElement
 from mcod.lib.extended_graph import ExtendedGraph
 from mcod.lib.serializers import TranslatedStr
@@ -357,9 +360,16 @@ class TableApiRelationships(Relationships):
     )
 
 
+def get_row_cursor(row):
+    """Returns `after` (search_after) cursor pointing at the row - only for rows returned by a sorted search."""
+    sort_values = getattr(getattr(row, "meta", None), "sort", None)
+    return SearchAfterField.encode(sort_values) if sort_values else None
+
+
 class TableApiAttrsMeta(ObjectAttrsMeta):
     updated_at = fields.DateTime()
     row_no = fields.Integer()
+    cursor = fields.Function(get_row_cursor)
 
 
 class TableApiAttrs(ObjectAttrs):
@@ -387,6 +397,26 @@ class TableApiMeta(TopLevelMeta):
 
 
 class TableApiResponse(TopLevel):
+    @ma.pre_dump
+    def prepare_top_level(self, c, **kwargs):
+        super().prepare_top_level(c, **kwargs)
+        request = self.context["request"]
+        cleaned_data = dict(getattr(request.context, "cleaned_data", {}))
+        if not self.context["is_listing"] or not cleaned_data.get("after"):
+            return c
+
+        # cursor (search_after) pagination - page links are meaningless here.
+        for name in ("first", "prev", "last", "next"):
+            c.links.pop(name, None)
+        hits = getattr(c.data, "hits", None) or []
+        if len(hits) == cleaned_data.get("per_page", 20):
+            cursor = get_row_cursor(hits[-1])
+            if cursor:
+                cleaned_data.pop("page", None)
+                cleaned_data["after"] = cursor
+                c.links["next"] = "{}{}?{}".format(settings.API_URL, request.path, builder.build(cleaned_data))
+        return c
+
     class Meta:
         attrs_schema = TableApiAttrs
         meta_schema = TableApiMeta
@@ -690,3 +720,27 @@ class AggregatedDGAInfoApiResponse(ExtSchema):
     dataset_slug = fields.Str(attribute="resource.dataset.slug", data_key="dataset_slug")
     resource_id = fields.Int(attribute="resource.id", data_key="resource_id")
     resource_slug = fields.Str(attribute="resource.slug", data_key="resource_slug")
+
+
+def get_table_api_response_schema(api_fields):
+    """Returns dedicated `TableApiResponse` subclass serializing rows with the given (resource specific) fields."""
+    attrs_schema = TableApiAttrs.from_dict(api_fields, name="TableApiAttrs")
+    meta = type("Meta", (TableApiResponse.Meta,), {"attrs_schema": attrs_schema})
+    return type("TableApiResponse", (TableApiResponse,), {"Meta": meta})
+
+
+def get_geo_api_response_schema(api_fields):
+    """Returns dedicated `GeoApiResponse` subclass serializing shape records with the given fields."""
+    record_meta = type("Meta", (), {"fields": tuple(api_fields), "register": False})
+    record_schema = type("GeoFeatureRecord", (GeoFeatureRecord,), {"Meta": record_meta})
+
+    shape_schema = GeoShapeObject.from_dict({"record": fields.Nested(record_schema, many=False)}, name="GeoShapeObject")
+    attrs_schema = GeoApiAttrs.from_dict({"record": fields.Nested(record_schema, many=False)}, name="GeoApiAttrs")
+    tiles_schema = GeoTileShapesAggregation.from_dict(
+        {"shapes": fields.Nested(shape_schema, many=True)}, name="GeoTileShapesAggregation"
+    )
+    aggs_schema = GeoAggregations.from_dict({"tiles": fields.Nested(tiles_schema, many=True)}, name="GeoAggregations")
+    meta_schema = GeoApiMeta.from_dict({"aggregations": fields.Nested(aggs_schema)}, name="GeoApiMeta")
+
+    meta = type("Meta", (GeoApiResponse.Meta,), {"attrs_schema": attrs_schema, "meta_schema": meta_schema})
+    return type("GeoApiResponse", (GeoApiResponse,), {"Meta": meta})
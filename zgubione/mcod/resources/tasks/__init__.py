@@ -21,7 +21,7 @@ from mcod.resources.tasks.tasks import (
     update_resource_validation_results_task,
     update_resource_with_archive_format,
 )
-from mcod.resources.tasks.validate_link import validate_link
+from mcod.resources.tasks.validate_link import validate_link, validate_links_batch
 
 __all__ = (
     "clean_dga_temp_directory",
@@ -43,6 +43,7 @@ __all__ = (
     "update_resource_validation_results_task",
     "update_resource_with_archive_format",
     "validate_link",
+    "validate_links_batch",
     "get_ckan_resource_format_from_url_task",
     "delete_es_resource_tabular_data_indexes_for_organization",
 )
@@ -1,5 +1,6 @@
 import json
 import logging
+import os
 from copy import deepcopy
 from typing import Any, Dict
 
@@ -9,7 +10,12 @@ from elasticsearch.helpers.errors import BulkIndexError
 from sentry_sdk import set_tag
 
 from mcod.core.tasks import extended_shared_task
-from mcod.resources.indexed_data import ResourceDataValidationError
+from mcod.counters.stats import mark_changed_day
+from mcod.resources.indexed_data import (
+    ResourceDataValidationError,
+    TabularData,
+    TabularDataIngestion,
+)
 from mcod.resources.tasks.common import save_task_result_for_resource_after_task_failure
 from mcod.unleash import is_enabled
 
@@ -30,9 +36,22 @@ def process_resource_file_data_task(resource_id: int, /):
     logger.info(f"process_resource_file_data_task: Resource {resource_id}")
     if not resource.data:
         raise Exception("Nieobsługiwany format danych lub błąd w jego rozpoznaniu.")
+    if not isinstance(resource.data, TabularData):
+        return _process_resource_data(resource_model, resource)
+
+    with TabularDataIngestion(resource.data, convert_to_csv=resource.is_csv_conversion_required) as ingestion:
+        return _process_resource_data(resource_model, resource, ingestion=ingestion)
+
+
+def _process_resource_data(resource_model, resource, ingestion=None):
+    """
+    Updates tabular data schema, validates and indexes data of the resource. If `ingestion` is passed, all steps
+    are fed from the same (once decoded) row stream of the resource file.
+    """
+    resource_id = resource.id
     tds = resource.tabular_data_schema
     if not tds or tds.get("missingValues") != resource.special_signs_symbols_list:
-        tds = resource.data.get_schema(revalidate=True)
+        tds = ingestion.infer_schema() if ingestion else resource.data.get_schema(revalidate=True)
     if resource.from_resource and resource.from_resource.tabular_data_schema:
         old_fields = deepcopy(resource.from_resource.tabular_data_schema.get("fields"))
         for f in old_fields:
@@ -43,9 +62,13 @@ def process_resource_file_data_task(resource_id: int, /):
 
     resource_model.objects.filter(pk=resource_id).update(tabular_data_schema=tds)
     resource = resource_model.objects.get(pk=resource_id)
-    resource.data.validate()
-
-    success, failed = resource.data.index(force=True)
+    if ingestion:
+        ingestion.data = resource.data
+        ingestion.validate()
+        success, failed = ingestion.index(force=True)
+    else:
+        resource.data.validate()
+        success, failed = resource.data.index(force=True)
     logger.info(f"process_resource_file_data_task: {success=}, {failed=}")
 
     return json.dumps(
@@ -59,6 +82,7 @@ def process_resource_file_data_task(resource_id: int, /):
             "path": resource.main_file.path,
             "resource_id": resource_id,
             "url": resource.file_url,
+            "csv_path": ingestion.csv_path if ingestion else None,
         }
     )
 
@@ -111,6 +135,8 @@ def process_resource_file_data_task_postrun_handler(sender, task_id, task, signa
         res_update_data["has_table"] = bool(resource.has_tabular_format(["shp"]) and indexed)
 
         Resource.raw.filter(pk=resource_id).update(**res_update_data)  # we don't want signals here - just updates.
+        if (res_update_data["has_map"], res_update_data["has_table"]) != (resource.has_map, resource.has_table):
+            mark_changed_day(resource.created)
 
         if not is_enabled("S67_less_updates_es_end_rdf_in_resource_processing.be"):
             resource.update_es_and_rdf_db()
@@ -127,12 +153,16 @@ def process_resource_file_data_task_success_handler(sender, result, *args, **kwa
         data = {}
     indexed = data.get("indexed")
     resource_id = data.get("resource_id")
+    csv_path = data.get("csv_path")
     if indexed and resource_id:
         Resource = apps.get_model("resources", "Resource")
         resource = Resource.raw.filter(id=resource_id).first()
         if resource:
-            resource.increase_openness_score()
+            resource.increase_openness_score(converted_csv_path=csv_path)
             resource.dataset.archive_files()
+            return
+    if csv_path and os.path.exists(csv_path):
+        os.remove(csv_path)
 
 
 @task_failure.connect(sender=process_resource_file_data_task)
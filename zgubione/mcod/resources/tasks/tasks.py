@@ -19,9 +19,11 @@ from sentry_sdk import set_tag
 from urllib3.exceptions import NewConnectionError
 
 from mcod.core.tasks import FIVE_MINUTES, extended_shared_task
+from mcod.counters.stats import mark_changed_day
 from mcod.lib.db_utils import IndexConsistency, get_db_and_es_inconsistencies
 from mcod.lib.file_format_from_response import get_resource_format_from_response
 from mcod.resources.archives import ArchiveReader
+from mcod.resources.data_descriptors import invalidate_descriptor
 from mcod.resources.file_validation import analyze_file
 from mcod.resources.link_validation import check_link_scheme
 from mcod.resources.tasks.entrypoint_res import entrypoint_process_resource_validation_task
@@ -60,6 +62,7 @@ def update_resource_has_table_has_map_task(resource_id):
             data["has_map"] = has_map
         if data:
             resource_model.raw.filter(id=resource_id).update(**data)
+            mark_changed_day(obj.created)
             result.update(data)
     return result
 
@@ -225,6 +228,7 @@ def update_resource_with_archive_format(res_file_id):
 
 def delete_index(index_name: str) -> bool:
     index = Index(index_name)
+    invalidate_descriptor(index_name)
     if index.exists():
         result = index.delete()
         if result.get("acknowledged") is True:
@@ -1,6 +1,7 @@
 import json
 import logging
 from datetime import datetime
+from typing import List
 
 from celery.signals import task_prerun
 from django.apps import apps
@@ -8,6 +9,7 @@ from django.utils import timezone
 from sentry_sdk import set_tag
 
 from mcod.core.tasks import extended_shared_task
+from mcod.resources.bulk_link_validation import LinkCheck, LinkChecker, save_link_checks
 
 logger = logging.getLogger("mcod")
 
@@ -62,6 +64,26 @@ def validate_link(self, resource_id: int, /):
     }
 
 
+@extended_shared_task(ignore_result=False, name="mcod.resources.tasks.validate_links_batch")
+def validate_links_batch(resources_ids: List[int]) -> int:
+    """
+    Validates links of many resources concurrently and saves results of validation the same way
+    as `validate_link` task does. Returns number of broken links.
+    """
+    Resource = apps.get_model("resources", "Resource")
+    resources = {
+        resource["id"]: resource
+        for resource in Resource.objects.filter(pk__in=resources_ids)
+        .prefetch_related(None)
+        .values("id", "uuid", "link", "format", "type")
+    }
+    logger.debug(f"Validating links of {len(resources)} resources")
+    checks = [LinkCheck(resource["id"], resource["link"], resource["type"]) for resource in resources.values()]
+    LinkChecker().check(checks)
+    save_link_checks(checks, resources)
+    return sum(1 for check in checks if not check.is_valid)
+
+
 @task_prerun.connect(sender=validate_link)
 def validate_link_task_prerun_handler(sender, task_id, task, signal, **kwargs):
     """
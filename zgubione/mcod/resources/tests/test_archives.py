@@ -109,6 +109,27 @@ def test_archive_reader_extracts_files(
     assert not extracted_file.exists()
 
 
+@pytest.mark.parametrize("archive_file_name", ["multi_file.rar", "multi_pdf_xlsx.zip", "csv_in_folders.zip"])
+def test_archive_reader_streams_and_extracts_members_in_one_pass(archive_file_name: str) -> None:
+    file_path = Path(settings.TEST_SAMPLES_PATH) / archive_file_name
+    with ArchiveReader(file_path) as archive:
+        streamed = {path: stream.read() for path, stream in archive.iter_members()}
+        assert set(streamed) == set(archive.files)
+        extracted = archive.extract_many(archive.files)
+        assert set(extracted) == set(archive.files)
+        for path, extracted_path in extracted.items():
+            assert extracted_path.read_bytes() == streamed[path]
+            assert archive.extract(path) == extracted_path
+        with pytest.raises(KeyError):
+            archive.extract_many(["not-existing.csv"])
+
+
+def test_archive_reader_reads_single_file() -> None:
+    file_path = Path(settings.TEST_SAMPLES_PATH) / "single_csv.zip"
+    with ArchiveReader(file_path) as archive:
+        assert archive.read_single() == archive.extract_single().read_bytes()
+
+
 @pytest.mark.otd_1152
 def test_archive_reader_doesnt_handle_single_compressed_file() -> None:
     """A bzip without a tar confuses libarchive, the list of "files" is basically a list of lines of
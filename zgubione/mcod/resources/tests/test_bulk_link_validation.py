@@ -0,0 +1,107 @@
+import json
+
+import pytest
+import requests
+import requests_mock
+from django.core.cache import caches
+from django.test import override_settings
+
+from mcod.resources.bulk_link_validation import (
+    LinkCheck,
+    LinkChecker,
+    get_link_validators_key,
+    save_link_checks,
+)
+from mcod.resources.factories import ResourceFactory
+from mcod.resources.link_validation import InvalidResponseCode
+from mcod.resources.models import Resource
+from mcod.resources.tasks import validate_links_batch
+
+
+@pytest.fixture
+def links():
+    urls = [f"http://bulk-links-{i}.mocker-test.com/data.json" for i in range(3)]
+    caches["default"].delete_many([get_link_validators_key(url) for url in urls])
+    yield urls
+    caches["default"].delete_many([get_link_validators_key(url) for url in urls])
+
+
+class TestLinkChecker:
+
+    headers = {"Content-Type": "application/json"}
+
+    @requests_mock.Mocker(kw="mock_request")
+    def test_check_links(self, links, **kwargs):
+        mock_request = kwargs["mock_request"]
+        mock_request.head(links[0], headers={**self.headers, "ETag": '"v1"'})
+        mock_request.head(links[1], headers=self.headers, status_code=405)
+        mock_request.get(links[1], headers=self.headers)
+        mock_request.head(links[2], headers=self.headers, status_code=404)
+        mock_request.get(links[2], headers=self.headers, status_code=404)
+
+        checks = LinkChecker().check([LinkCheck(i, url, "api") for i, url in enumerate(links)])
+
+        assert [check.is_valid for check in checks] == [True, True, False]
+        assert isinstance(checks[2].error, InvalidResponseCode)
+        assert caches["default"].get(get_link_validators_key(links[0])) == {"etag": '"v1"'}
+
+    @requests_mock.Mocker(kw="mock_request")
+    def test_conditional_request(self, links, **kwargs):
+        mock_request = kwargs["mock_request"]
+        caches["default"].set(get_link_validators_key(links[0]), {"etag": '"v1"'})
+        mock_request.head(links[0], status_code=304)
+
+        (check,) = LinkChecker().check([LinkCheck(1, links[0], "api")])
+
+        assert check.is_valid
+        assert mock_request.last_request.headers["If-None-Match"] == '"v1"'
+        assert mock_request.call_count == 1
+
+    @requests_mock.Mocker(kw="mock_request")
+    def test_links_of_unreachable_host_are_not_requested(self, **kwargs):
+        mock_request = kwargs["mock_request"]
+        mock_request.head(requests_mock.ANY, exc=requests.exceptions.ConnectTimeout)
+        urls = [f"http://unreachable.mocker-test.com/{i}.json" for i in range(5)]
+
+        with override_settings(LINK_VALIDATION_HOST_MAX_ERRORS=2):
+            checks = LinkChecker(host_concurrency=1).check([LinkCheck(i, url, "api") for i, url in enumerate(urls)])
+
+        assert not any(check.is_valid for check in checks)
+        assert mock_request.call_count == 2
+
+
+@pytest.mark.django_db
+def test_save_link_checks():
+    resources = ResourceFactory.create_batch(2, type="api")
+    values = {res["id"]: res for res in Resource.objects.prefetch_related(None).values("id", "uuid", "link", "format", "type")}
+    checks = [
+        LinkCheck(resources[0].id, resources[0].link, "api"),
+        LinkCheck(resources[1].id, resources[1].link, "api", error=InvalidResponseCode("Invalid response code: 404")),
+    ]
+
+    save_link_checks(checks, values)
+
+    valid, broken = Resource.raw.get(pk=resources[0].pk), Resource.raw.get(pk=resources[1].pk)
+    assert valid.link_tasks_last_status == "SUCCESS"
+    assert broken.link_tasks_last_status == "FAILURE"
+    result = json.loads(broken.link_tasks.latest("date_done").result)
+    assert result["exc_type"] == "InvalidResponseCode"
+    assert result["uuid"] == str(resources[1].uuid)
+    assert valid.link_tasks.count() == 1
+
+
+@pytest.mark.django_db
+def test_validate_links_batch(mocker):
+    resources = ResourceFactory.create_batch(2, type="api")
+    mocker.patch(
+        "mcod.resources.bulk_link_validation._check_link",
+        side_effect=[{}, InvalidResponseCode("Invalid response code: 404")],
+    )
+
+    broken_count = validate_links_batch([resource.id for resource in resources])
+
+    assert broken_count == 1
+    statuses = Resource.raw.filter(pk__in=[resource.id for resource in resources]).values_list(
+        "link_tasks_last_status", flat=True
+    )
+    assert sorted(statuses) == ["FAILURE", "SUCCESS"]
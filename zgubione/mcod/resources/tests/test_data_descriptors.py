@@ -0,0 +1,53 @@
+import uuid
+
+import pytest
+
+from mcod.resources.data_descriptors import (
+    get_compiled,
+    get_descriptor,
+    get_schema_hash,
+    invalidate_descriptor,
+)
+
+
+@pytest.fixture
+def idx_name():
+    name = f"test-descriptor-{uuid.uuid4()}"
+    yield name
+    invalidate_descriptor(name)
+
+
+def test_get_descriptor_is_cached_per_schema(settings, idx_name, mocker):
+    settings.TABULAR_DATA_DESCRIPTOR_CACHE_TIMEOUT = 60
+    build = mocker.Mock(side_effect=lambda: {"index_exists": True, "headers": {"col1": "a"}})
+    schema_hash = get_schema_hash({"fields": [{"name": "a", "type": "string"}]})
+
+    descriptor = get_descriptor(idx_name, schema_hash, build)
+    assert get_descriptor(idx_name, schema_hash, build) == descriptor
+    assert build.call_count == 1
+
+    changed_descriptor = get_descriptor(idx_name, get_schema_hash({"fields": []}), build)
+    assert build.call_count == 2
+    assert changed_descriptor["version"] != descriptor["version"]
+
+    invalidate_descriptor(idx_name)
+    get_descriptor(idx_name, schema_hash, build)
+    assert build.call_count == 3
+
+
+def test_get_schema_hash_ignores_keys_order():
+    assert get_schema_hash({"a": 1, "b": [1, 2]}) == get_schema_hash({"b": [1, 2], "a": 1})
+    assert get_schema_hash(None) != get_schema_hash({})
+
+
+def test_get_compiled_is_lru_cache(settings, mocker):
+    settings.TABULAR_DATA_DESCRIPTOR_LOCAL_CACHE_SIZE = 2
+    version = uuid.uuid4().hex
+    build = mocker.Mock(side_effect=lambda: object())
+
+    first = get_compiled((version, "doc"), build)
+    assert get_compiled((version, "doc"), build) is first
+    get_compiled((version, "api_fields"), build)
+    get_compiled((version, "sort_map"), build)
+    assert get_compiled((version, "doc"), build) is not first
+    assert build.call_count == 4
@@ -0,0 +1,23 @@
+import json
+
+from mcod.resources.data_export import export_data, iter_csv, iter_ndjson
+
+ROWS = [["name", "value"], ["a", 1], ["b, c", None]]
+
+
+def test_iter_csv():
+    assert b"".join(iter_csv(ROWS, buffer_rows=2)) == b'name,value\r\na,1\r\n"b, c",\r\n'
+    assert list(iter_csv([])) == []
+
+
+def test_iter_ndjson():
+    chunks = list(iter_ndjson(ROWS, buffer_rows=1))
+    assert len(chunks) == 2
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [{"name": "a", "value": 1}, {"name": "b, c", "value": None}]
+    assert list(iter_ndjson([])) == []
+
+
+def test_export_data(mocker):
+    data = mocker.Mock(iter_export_rows=mocker.Mock(return_value=iter(ROWS)))
+    assert b"".join(export_data(data, "csv")).startswith(b"name,value\r\n")
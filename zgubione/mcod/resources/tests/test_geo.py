@@ -3,21 +3,27 @@ from pathlib import Path
 from typing import List, Union
 
 import pytest
+import requests
 import requests_mock
 import shapefile
 from django.conf import settings
+from django.core.cache import caches
 
 from mcod.core.tests.fixtures.bdd.common import prepare_file
 from mcod.resources.archives import ArchiveReader
 from mcod.resources.geo import (
+    BatchGeocoder,
     ExtractUAddressError,
     ShapeTransformer,
+    _get_cached_geocodes,
     _has_geotiff_with_world_file,
     analyze_shapefile,
     are_shapefiles,
     clean_house_number,
     extract_coords_from_uaddress,
+    extract_coords_from_uaddresses,
     geocode,
+    geocode_cache_key,
     is_geotiff,
     median_point,
 )
@@ -245,6 +251,44 @@ class TestGeocode:
         result = geocode(**geocoding_kwargs)
         assert result is None
 
+    @requests_mock.Mocker(kw="mock_request")
+    def test_batch_geocoder_deduplicates_queries(self, **kwargs):
+        mock_request = kwargs["mock_request"]
+        geometry = {"type": "Point", "coordinates": [21.008889, 52.238506]}
+        mock_request.get(self.geocoder_url, json={"features": [{"geometry": geometry}]})
+        queries = [
+            {"address": "Królewska 27", "locality": "Warszawa"},
+            {"address": " królewska  27", "locality": "WARSZAWA"},
+        ]
+        result = BatchGeocoder(max_workers=2).resolve(queries)
+        assert result == {geocode_cache_key(**queries[0]): geometry}
+        assert mock_request.call_count == 1
+
+    @requests_mock.Mocker(kw="mock_request")
+    def test_batch_geocoder_does_not_cache_geocoder_errors(self, mocker, **kwargs):
+        mock_request = kwargs["mock_request"]
+        mocker.patch("mcod.resources.geo.settings.GEOCODER_CACHE_TIMEOUT", 60)
+        query = {"address": "Nieistniejąca 1", "locality": "Testowo"}
+        key = geocode_cache_key(**query)
+        mock_request.get(self.geocoder_url, status_code=503)
+        mock_request.get(self.geocoder_text_url + "Nieistniejąca 1 Testowo", exc=requests.ConnectTimeout)
+
+        assert BatchGeocoder(max_workers=1).resolve([query]) == {key: None}
+        assert _get_cached_geocodes([key]) == {}
+
+        mock_request.get(self.geocoder_url, json={"features": []})
+        mock_request.get(self.geocoder_text_url + "Nieistniejąca 1 Testowo", json={"features": []})
+        assert BatchGeocoder(max_workers=1).resolve([query]) == {key: None}
+        assert _get_cached_geocodes([key]) == {key: None}
+        caches[settings.GEOCODER_CACHE_ALIAS].delete(key)
+
+
+def test_geocode_cache_key_is_normalized():
+    assert geocode_cache_key(address="Królewska  27 ", locality="Warszawa") == geocode_cache_key(
+        locality="warszawa", address="królewska 27"
+    )
+    assert geocode_cache_key(address="Królewska 27") != geocode_cache_key(address="Królewska 29")
+
 
 def test_extract_coords_from_uaddress():
     coords = extract_coords_from_uaddress("00060|146501|0918123|0918123|09987|487729|637113|27|")
@@ -257,3 +301,22 @@ def test_extract_coords_from_uaddress_raise_error():
         raise pytest.fail("No exception occurred. Expected: ExtractUAddressError")
     except ExtractUAddressError as err:
         assert err.args[0] == "05075|146501|0918123|0918123|00432|115|"
+
+
+def test_extract_coords_from_uaddresses():
+    uaddress = "00060|146501|0918123|0918123|09987|487729|637113|27|"
+    result = extract_coords_from_uaddresses([uaddress, uaddress, "05075|146501|0918123|0918123|00432|115|"])
+    assert list(result) == [uaddress]
+    assert result[uaddress] == pytest.approx((21.008654028022857, 52.23850135904742))
+
+
+def test_transform_many_matches_point_by_point_transformation():
+    media = Path(__file__).parent / "media" / "test_geo"
+    with ArchiveReader((media / "iglaste_other.tar.xz").as_posix()) as archive_other:
+        prj_path = next(archive_other.get_by_extension("prj"))
+        with open(media / "iglaste.shp", "rb") as shp, open(media / "iglaste.shx", "rb") as shx:
+            shapes = shapefile.Reader(shp=shp, shx=shx).shapes()[:100]
+            transformer = ShapeTransformer(prj_path)
+            result = transformer.transform_many(shapes)
+    expected = [transformer._transformer.transform(*shape.points[0])[::-1] for shape in shapes]
+    assert [geojson["coordinates"] for geojson in result] == pytest.approx(expected)
@@ -2,7 +2,7 @@ import datetime
 
 import pytest
 
-from mcod.resources.indexed_data import prepare_item
+from mcod.resources.indexed_data import TabularDataIngestion, prepare_item, skip_empty
 
 
 @pytest.mark.parametrize(
@@ -18,3 +18,50 @@ from mcod.resources.indexed_data import prepare_item
 )
 def test_prepare_item(value, type, output):
     assert prepare_item(value, type) == {"repr": output, "val": output}
+
+
+def test_skip_empty():
+    source = {
+        "col1": {"repr": None, "val": None},
+        "col2": {"repr": "0", "val": 0},
+        "col3": [],
+        "row_no": 1,
+    }
+    assert skip_empty(source) == {"col2": {"repr": "0", "val": 0}, "row_no": 1}
+
+
+@pytest.fixture
+def ingestion_data(tmp_path, mocker):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,x\n2,y\n3,z\n")
+    data = mocker.MagicMock(resource_format="csv", resource_encoding="utf-8")
+    data.resource.file_data_path = str(path)
+    data.schema = {
+        "fields": [
+            {"name": "a", "type": "integer", "format": "default"},
+            {"name": "b", "type": "string", "format": "default"},
+        ]
+    }
+    data.index.side_effect = lambda rows=None, **kwargs: (len(list(rows)), 0)
+    return data
+
+
+def test_tabular_data_ingestion_feeds_all_stages_from_one_stream(ingestion_data):
+    with TabularDataIngestion(ingestion_data, sample_size=2) as ingestion:
+        ingestion.infer_schema()
+        ingestion.validate()
+        assert ingestion.index(force=True) == (3, 0)
+
+    expected_sample = [["a", "b"], ["1", "x"], ["2", "y"]]
+    ingestion_data.infer_schema.assert_called_once_with(source=expected_sample)
+    ingestion_data.validate.assert_called_once_with(source=expected_sample)
+    assert ingestion.csv_path is None
+
+
+def test_tabular_data_ingestion_writes_csv_conversion(ingestion_data):
+    with TabularDataIngestion(ingestion_data, convert_to_csv=True) as ingestion:
+        ingestion.index(force=True)
+
+    with open(ingestion.csv_path) as f:
+        assert f.read().splitlines() == ["a,b", "1,x", "2,y", "3,z"]
+    ingestion.discard_csv()
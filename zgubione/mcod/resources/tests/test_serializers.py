@@ -0,0 +1,33 @@
+from mcod.core.api import fields
+from mcod.resources.serializers import (
+    GeoApiResponse,
+    GeoFeatureRecord,
+    TableApiAttrs,
+    TableApiResponse,
+    get_geo_api_response_schema,
+    get_table_api_response_schema,
+)
+
+
+def test_table_api_response_schema_is_dedicated_to_fields():
+    schema_1 = get_table_api_response_schema({"col1": fields.String(), "col2": fields.Integer()})
+    schema_2 = get_table_api_response_schema({"col1": fields.Number()})
+
+    assert issubclass(schema_1, TableApiResponse)
+    assert set(schema_1.opts.attrs_schema._declared_fields) == {"col1", "col2"}
+    assert set(schema_2.opts.attrs_schema._declared_fields) == {"col1"}
+    assert schema_1.opts.attrs_schema.opts.object_type == "row"
+    assert schema_1.opts.meta_schema is TableApiResponse.opts.meta_schema
+    assert TableApiAttrs._declared_fields == {}
+    assert TableApiResponse.opts.attrs_schema is TableApiAttrs
+
+
+def test_geo_api_response_schema_is_dedicated_to_fields():
+    schema = get_geo_api_response_schema({"col1": fields.String(), "col2": fields.String()})
+
+    assert issubclass(schema, GeoApiResponse)
+    record_schema = schema.opts.attrs_schema._declared_fields["record"].nested
+    assert record_schema.opts.fields == ("col1", "col2")
+    assert record_schema().dump({"col1": "a", "col2": "b", "col3": "c"}) == {"col1": "a", "col2": "b"}
+    assert schema.opts.attrs_schema.opts.object_type == "geoshape"
+    assert not GeoFeatureRecord.opts.fields
@@ -31,6 +31,7 @@ from mcod.core.api.views import JsonAPIView, RDFView, VocabEntryRDFView, VocabRD
 from mcod.core.versioning import versioned
 from mcod.counters.lib import Counter
 from mcod.lib.encoders import DateTimeToISOEncoder
+from mcod.resources.data_export import export_data
 from mcod.resources.deserializers import (
     ChartApiRequest,
     CreateCommentRequest,
@@ -48,12 +49,13 @@ from mcod.resources.serializers import (
     ChartApiResponse,
     CommentApiResponse,
     GeoApiResponse,
-    GeoFeatureRecord,
     ResourceApiResponse,
     ResourceRDFResponseSchema,
     TableApiResponse,
     VocabEntryRDFResponseSchema,
     VocabRDFResponseSchema,
+    get_geo_api_response_schema,
+    get_table_api_response_schema,
 )
 
 Resource = apps.get_model("resources", "Resource")
@@ -184,7 +186,8 @@ class ResourceTableView(JsonAPIView):
 
         def _queryset_extra(self, queryset, *args, **kwargs):
             sort = self.request.context.cleaned_data.get("sort")
-            return queryset if sort else queryset.sort("_score", "row_no")
+            # row_no is a unique tie-breaker, so sort values of a row can be used as a search_after cursor.
+            return queryset.sort(*queryset._sort, "row_no") if sort else queryset.sort("_score", "row_no")
 
         def _get_resource_instance(self, resource_id):
             cached_resource = getattr(self, "_cached_resource", None)
@@ -203,9 +206,7 @@ class ResourceTableView(JsonAPIView):
 
             if resource.data and resource.data.available:
                 self.search_document = resource.data.doc
-                schema_cls = TableApiResponse
-                _fields = resource.data.get_api_fields()
-                schema_cls.opts.attrs_schema._declared_fields = _fields
+                schema_cls = resource.data.get_api_schema("table_response", get_table_api_response_schema)
                 self.serializer_schema = partial(schema_cls, many=True)
 
                 _data = super()._get_data(cleaned, id, *args, **kwargs)
@@ -269,9 +270,7 @@ class ResourceTableRowView(JsonAPIView):
             resource = self._get_instance(id, *args, **kwargs)
             self.search_document = resource.data.doc
 
-            schema_cls = TableApiResponse
-            _fields = resource.data.get_api_fields()
-            schema_cls.opts.attrs_schema._declared_fields = _fields
+            schema_cls = resource.data.get_api_schema("table_response", get_table_api_response_schema)
             self.serializer_schema = partial(schema_cls, many=True)
             if resource.data and resource.data.available:
                 return self.search_document.get(row_id)
@@ -313,9 +312,8 @@ class ResourceGeoView(JsonAPIView):
             if resource.data and resource.data.available:
                 self.search_document = resource.data.doc
 
-                schema_cls = GeoFeatureRecord
-                schema_cls.opts.fields = resource.data.get_api_fields()
-                self.serializer_schema = partial(GeoApiResponse, many=True)
+                schema_cls = resource.data.get_api_schema("geo_response", get_geo_api_response_schema)
+                self.serializer_schema = partial(schema_cls, many=True)
 
                 data = super()._get_data(cleaned, id, *args, **kwargs)
 
@@ -444,6 +442,26 @@ class ResourceFileDownloadView:
         self.on_request(request, response, id, *args, **kwargs)
 
 
+class ResourceTableExportView:
+    """
+    Streams all rows of the resource's data in the requested format (csv or ndjson).
+    Rows are read from the index with scroll API, so there is no limit of the result window.
+    """
+
+    def on_get(self, request, response, id, export_format, *args, **kwargs):
+        try:
+            resource = Resource.objects.get(pk=id, status="published")
+        except Resource.DoesNotExist:
+            raise falcon.HTTPNotFound
+
+        if not resource.data or not resource.data.available:
+            raise falcon.HTTPNotFound
+
+        response.content_type = settings.RESOURCE_DATA_EXPORT_FORMAT_TO_MIMETYPE[export_format]
+        response.downloadable_as = "resource-{}-data.{}".format(resource.id, export_format)
+        response.stream = export_data(resource.data, export_format)
+
+
 class ResourceTableSpecView:
     def on_get(self, req, resp, id, version=None):
         version = version or str(max(DOC_VERSIONS))
@@ -476,9 +494,7 @@ class ResourceTableSpecView:
             },
         )
 
-        schema_cls = TableApiResponse
-        _fields = resource.data.get_api_fields()
-        schema_cls.opts.attrs_schema._declared_fields = _fields
+        schema_cls = resource.data.get_api_schema("table_response", get_table_api_response_schema)
 
         spec.components.schema("Rows", schema_cls=schema_cls, many=True)
         spec.components.schema("Row", schema_cls=schema_cls, many=False)
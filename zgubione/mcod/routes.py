@@ -138,6 +138,11 @@ routes = [
     ),
     ("/resources/{id:int}/data/doc", res_views.ResourceSwaggerView()),
     ("/resources/{id:int},{slug}/data/doc", res_views.ResourceSwaggerView()),
+    ("/resources/{id:int}/data/export.{export_format:data_export_format}", res_views.ResourceTableExportView()),
+    (
+        "/resources/{id:int},{slug}/data/export.{export_format:data_export_format}",
+        res_views.ResourceTableExportView(),
+    ),
     ("/resources/{id:int}/geo", res_views.ResourceGeoView()),
     ("/resources/{id:int},{slug}/geo", res_views.ResourceGeoView()),
     ("/resources/{id:int},{slug}/comments", res_views.ResourceCommentsView()),
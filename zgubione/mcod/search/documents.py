@@ -62,15 +62,21 @@ class ExtendedDocument(Document):
             visualization_types = ["none"]
         return visualization_types
 
+    def prepare_batch(self, instances):
+        super().prepare_batch(instances)
+        self.batch_data["watchers"] = ModelWatcher.objects.get_from_instances(instances)
+
     def prepare_subscriptions(self, instance):
+        watchers = self.batch_data.get("watchers", {})
         try:
-            watcher = ModelWatcher.objects.get_from_instance(instance)
-            return [
-                {"user_id": subscription.user_id, "subscription_id": subscription.id}
-                for subscription in watcher.subscriptions.all()
-            ]
+            watcher = watchers[instance.id] if instance.id in watchers else ModelWatcher.objects.get_from_instance(instance)
         except ModelWatcher.DoesNotExist:
             return []
+        if watcher is None:
+            return []
+        return [
+            {"user_id": subscription.user_id, "subscription_id": subscription.id} for subscription in watcher.subscriptions.all()
+        ]
 
     def get_queryset(self):
         return super().get_queryset().filter(status="published")
@@ -0,0 +1,186 @@
+"""
+Execution of queries sent to the SPARQL endpoint (`/sparql`).
+
+- queries are normalized (comments and redundant whitespaces are removed), so equivalent queries share the cache,
+- ordered SELECT queries without own LIMIT/OFFSET, VALUES and FROM clauses are paginated by the triple store - every
+  page is fetched with LIMIT/OFFSET added to the query and the number of results is fetched once with a COUNT query
+  (without ORDER BY the order of results isn't guaranteed, so pages fetched separately could overlap),
+- other queries are executed once per normalized query, the result is cached and all pages are served from it,
+- results of CONSTRUCT and DESCRIBE queries are downloaded by streaming the response of the triple store.
+"""
+
+import hashlib
+import io
+import json
+import math
+import re
+import uuid
+
+from django.core.paginator import Paginator
+from rdflib.plugins.sparql.parser import parseQuery
+from rdflib.query import Result
+
+from mcod import settings
+from mcod.core.api.cache import app_cache as cache
+from mcod.core.api.rdf.namespaces import NAMESPACES
+from mcod.lib.rdf.store import get_sparql_store, stream_sparql_query
+from mcod.search.deserializers import SPARQL_FORMATS
+
+QUERY_CACHE_KEY = "sparql-query:{}"
+RESULT_CACHE_KEY = "sparql-result:{}"
+COUNT_CACHE_KEY = "sparql-count:{}"
+PAGE_CACHE_KEY = "sparql-page:{}:{}:{}"
+
+GRAPH_QUERY_TYPES = ("CONSTRUCT", "DESCRIBE")
+STREAMABLE_GRAPH_FORMATS = ("application/rdf+xml", "text/turtle")
+
+# strings and IRIs are left untouched, runs of whitespaces and comments are replaced by a single space.
+_TOKENS_RE = re.compile(
+    r"(?P<string>\"\"\"(?:[^\"\\]|\\.|\"(?!\"\"))*\"\"\"|'''(?:[^'\\]|\\.|'(?!''))*'''"
+    r"|\"(?:[^\"\\\n]|\\.)*\"|'(?:[^'\\\n]|\\.)*')"
+    r"|(?P<iri><[^<>\"{}|^`\\\s]*>)"
+    r"|(?P<space>(?:\s|#[^\n]*)+)"
+)
+_PROLOGUE_RE = re.compile(r"^(?:\s*(?:PREFIX\s+[^\s:]*:\s*<[^>]*>|BASE\s*<[^>]*>))*\s*", re.IGNORECASE)
+
+
+def normalize_query(query):
+    return _TOKENS_RE.sub(lambda m: " " if m.lastgroup == "space" else m.group(0), query).strip()
+
+
+def _parse_query(query):
+    try:
+        return parseQuery(query)[1]
+    except Exception:
+        # query which can't be parsed by rdflib (e.g. with vendor's extensions) is sent to the store as is.
+        return None
+
+
+def _cached(key, build):
+    cached = cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+    value = build()
+    cache.set(key, json.dumps(value), timeout=settings.SPARQL_CACHE_TIMEOUT)
+    return value
+
+
+class SparqlQuery:
+    def __init__(self, query, sparql_format, external_sparql_endpoint=None):
+        self.query = normalize_query(query)
+        self.sparql_format = sparql_format
+        self.return_format = SPARQL_FORMATS[sparql_format]
+        self.external_sparql_endpoint = external_sparql_endpoint
+        self._parsed = _parse_query(self.query)
+        token = hashlib.md5(json.dumps([self.query, sparql_format, external_sparql_endpoint]).encode("utf-8"))
+        self.token = str(uuid.UUID(token.hexdigest()))
+
+    @classmethod
+    def from_token(cls, token):
+        """Returns query saved (see `save`) under the token or None if it expired."""
+        cached = cache.get(QUERY_CACHE_KEY.format(token))
+        return cls(**json.loads(cached)) if cached else None
+
+    def save(self):
+        data = {
+            "query": self.query,
+            "sparql_format": self.sparql_format,
+            "external_sparql_endpoint": self.external_sparql_endpoint,
+        }
+        cache.set(QUERY_CACHE_KEY.format(self.token), json.dumps(data), timeout=settings.SPARQL_CACHE_TIMEOUT)
+
+    @property
+    def query_type(self):
+        return self._parsed.name[: -len("Query")].upper() if self._parsed else None
+
+    @property
+    def is_paginated_by_store(self):
+        return (
+            self.query_type == "SELECT"
+            and self._parsed.get("orderby") is not None
+            and all(self._parsed.get(clause) is None for clause in ("limitoffset", "valuesClause", "datasetClause"))
+        )
+
+    @property
+    def is_streamable(self):
+        return self.query_type in GRAPH_QUERY_TYPES and self.sparql_format in STREAMABLE_GRAPH_FORMATS
+
+    def get_count_query(self):
+        prologue = _PROLOGUE_RE.match(self.query).group(0)
+        return f"{prologue}SELECT (COUNT(*) AS ?count) WHERE {{ {self.query[len(prologue):]} }}"
+
+    def get_page_query(self, page, per_page):
+        return f"{self.query} LIMIT {per_page} OFFSET {(page - 1) * per_page}"
+
+    def _execute(self, query):
+        store = get_sparql_store(
+            readonly=True,
+            return_format=self.return_format,
+            external_sparql_endpoint=self.external_sparql_endpoint,
+        )
+        return store.query(query, initNs=NAMESPACES)
+
+    def _serialize(self, response):
+        _format = "xml" if self.return_format == "application/rdf+xml" else self.return_format
+        _format = self.sparql_format if response.graph else _format
+        return response.serialize(format=_format, encoding="utf-8").decode("utf-8")
+
+    def _fetch_result(self):
+        response = self._execute(self.query)
+        result = self._serialize(response)
+        data = {"result": result, "content_type": self.sparql_format if len(result) else None, "count": len(response)}
+        if response.type == "SELECT":
+            # bindings are kept in the format which can be parsed back to paginate them.
+            data["bindings"] = response.serialize(format="json", encoding="utf-8").decode("utf-8")
+        return data
+
+    def get_result(self):
+        """Whole (cached) result of the query."""
+        return _cached(RESULT_CACHE_KEY.format(self.token), self._fetch_result)
+
+    def get_count(self):
+        def count():
+            response = self._execute(self.get_count_query())
+            return int(response.bindings[0]["count"].toPython()) if response.bindings else 0
+
+        return _cached(COUNT_CACHE_KEY.format(self.token), count)
+
+    def get_page(self, page=1, per_page=20):
+        """
+        Result of the query for the page. Result of queries other than SELECT is not paginated.
+        As in `Paginator.get_page` invalid page number returns the first page and too big - the last one.
+        """
+        page = page if isinstance(page, int) and page > 0 else 1
+        if self.is_paginated_by_store:
+            count = self.get_count()
+            page = min(page, max(math.ceil(count / per_page), 1))
+            return _cached(PAGE_CACHE_KEY.format(self.token, page, per_page), lambda: self._fetch_page(page, per_page, count))
+        data = self.get_result()
+        if "bindings" not in data:
+            return {key: data[key] for key in ("result", "content_type", "count")}
+        return _cached(PAGE_CACHE_KEY.format(self.token, page, per_page), lambda: self._paginate(data, page, per_page))
+
+    def _fetch_page(self, page, per_page, count):
+        result = self._serialize(self._execute(self.get_page_query(page, per_page)))
+        return {
+            "result": result,
+            "content_type": self.sparql_format if len(result) else None,
+            "count": count,
+            "has_previous": page > 1,
+            "has_next": page * per_page < count,
+        }
+
+    def _paginate(self, data, page, per_page):
+        response = Result.parse(io.BytesIO(data["bindings"].encode("utf-8")), format="json")
+        paginator_page = Paginator(response.bindings, per_page).get_page(page)
+        response.bindings = paginator_page
+        return {
+            "result": self._serialize(response),
+            "content_type": data["content_type"],
+            "count": data["count"],
+            "has_previous": paginator_page.has_previous(),
+            "has_next": paginator_page.has_next(),
+        }
+
+    def stream_result(self):
+        return stream_sparql_query(self.query, self.sparql_format, external_sparql_endpoint=self.external_sparql_endpoint)
@@ -0,0 +1,95 @@
+import uuid
+
+import pytest
+
+from mcod.search.sparql import SparqlQuery, normalize_query
+
+
+@pytest.fixture
+def unique_literal():
+    # queries (and so cache keys) are unique in every test.
+    return uuid.uuid4().hex
+
+
+def test_normalize_query():
+    query = """
+    PREFIX dcat: <http://www.w3.org/ns/dcat#>  # comment
+    SELECT *   WHERE {
+        ?s dcat:keyword "a  # b" .
+    }
+    """
+    assert normalize_query(query) == 'PREFIX dcat: <http://www.w3.org/ns/dcat#> SELECT * WHERE { ?s dcat:keyword "a  # b" . }'
+
+
+def test_equivalent_queries_have_the_same_token():
+    query_1 = SparqlQuery("SELECT * WHERE { ?s ?p ?o }", "text/csv")
+    query_2 = SparqlQuery("SELECT *\nWHERE {\n  ?s ?p ?o  # all triples\n}", "text/csv")
+    query_3 = SparqlQuery("SELECT * WHERE { ?s ?p ?o }", "application/sparql-results+json")
+    assert query_1.token == query_2.token
+    assert query_1.token != query_3.token
+
+
+@pytest.mark.parametrize(
+    "q, expected",
+    [
+        ("SELECT * WHERE { ?s ?p ?o } ORDER BY ?s ?p ?o", True),
+        ("SELECT * WHERE { ?s ?p ?o }", False),
+        ("SELECT * WHERE { ?s ?p ?o } ORDER BY ?s LIMIT 10", False),
+        ("SELECT * WHERE { ?s ?p ?o } VALUES ?s { <http://a> }", False),
+        ("SELECT * FROM <http://graph> WHERE { ?s ?p ?o }", False),
+        ("ASK { ?s ?p ?o }", False),
+        ("CONSTRUCT { ?s ?p ?o } WHERE { ?s ?p ?o }", False),
+        ("INVALID SYNTAX", False),
+    ],
+)
+def test_is_paginated_by_store(q, expected):
+    assert SparqlQuery(q, "text/csv").is_paginated_by_store is expected
+
+
+def test_count_and_page_queries():
+    query = SparqlQuery("PREFIX ex: <http://example.com/> SELECT ?s WHERE { ?s ex:p ?o } ORDER BY ?s", "text/csv")
+    assert query.get_count_query() == (
+        "PREFIX ex: <http://example.com/> SELECT (COUNT(*) AS ?count) WHERE { SELECT ?s WHERE { ?s ex:p ?o } ORDER BY ?s }"
+    )
+    assert query.get_page_query(3, 20) == (
+        "PREFIX ex: <http://example.com/> SELECT ?s WHERE { ?s ex:p ?o } ORDER BY ?s LIMIT 20 OFFSET 40"
+    )
+
+
+def test_select_pages_are_fetched_with_limit_and_offset(mocker, unique_literal):
+    query = SparqlQuery(f'SELECT * WHERE {{ ?s ?p "{unique_literal}" }} ORDER BY ?s ?p', "text/csv")
+    count = mocker.patch.object(SparqlQuery, "get_count", return_value=45)
+    execute = mocker.patch.object(SparqlQuery, "_execute")
+    mocker.patch.object(SparqlQuery, "_serialize", return_value="s,p\r\n")
+
+    page = query.get_page(5, 20)
+    query.get_page(3, 20)
+
+    assert page == {"result": "s,p\r\n", "content_type": "text/csv", "count": 45, "has_previous": True, "has_next": False}
+    execute.assert_called_once_with(query.get_page_query(3, 20))
+    assert count.call_count == 2
+
+
+def test_result_is_fetched_once_for_all_pages(mocker, unique_literal):
+    query = SparqlQuery(f'SELECT * WHERE {{ ?s ?p "{unique_literal}" }} LIMIT 50', "text/csv")
+    fetch = mocker.patch.object(
+        SparqlQuery,
+        "_fetch_result",
+        return_value={"result": "s,p\r\n", "content_type": "text/csv", "count": 50, "bindings": "{}"},
+    )
+    paginate = mocker.patch.object(SparqlQuery, "_paginate", side_effect=lambda data, page, per_page: {"page": page})
+
+    assert [query.get_page(page, 20) for page in (1, 2, 3)] == [{"page": 1}, {"page": 2}, {"page": 3}]
+    fetch.assert_called_once()
+    assert paginate.call_count == 3
+
+
+def test_query_is_restored_from_token(unique_literal):
+    query = SparqlQuery(f'CONSTRUCT {{ ?s ?p "{unique_literal}" }} WHERE {{ ?s ?p ?o }}', "text/turtle", "kronika")
+    assert SparqlQuery.from_token(query.token) is None
+
+    query.save()
+
+    restored = SparqlQuery.from_token(query.token)
+    assert (restored.query, restored.sparql_format, restored.external_sparql_endpoint) == (query.query, "text/turtle", "kronika")
+    assert restored.is_streamable
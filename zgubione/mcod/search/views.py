@@ -1,18 +1,13 @@
-import hashlib
-import json
 import logging
 import mimetypes
-import uuid
 from collections import namedtuple
 from functools import partial
 
 import falcon
-from django.core.paginator import Paginator
 from django.utils.translation import gettext_lazy as _
 from elasticsearch_dsl import A, Search
 
 from mcod import settings
-from mcod.core.api.cache import app_cache as cache
 from mcod.core.api.handlers import BaseHdlr, RetrieveManyHdlr, SearchHdlr, SubscriptionSearchHdlr
 from mcod.core.api.hooks import login_optional
 from mcod.core.api.limiter import limiter
@@ -20,19 +15,14 @@ from mcod.core.api.rdf.namespaces import NAMESPACES
 from mcod.core.api.schemas import ListingSchema
 from mcod.core.api.views import BaseView, JsonAPIView
 from mcod.core.versioning import versioned
-from mcod.lib.rdf.store import get_sparql_store
-from mcod.search.deserializers import (
-    SPARQL_FORMATS,
-    ApiSearchRequest,
-    ApiSuggestRequest,
-    SparqlRequest,
-)
+from mcod.search.deserializers import ApiSearchRequest, ApiSuggestRequest, SparqlRequest
 from mcod.search.serializers import (
     CommonObjectResponse,
     SparqlApiResponse,
     SparqlNamespaceApiResponse,
     SparqlResponseSchema,
 )
+from mcod.search.sparql import SparqlQuery
 from mcod.search.utils import get_sparql_limiter_key
 
 logger = logging.getLogger("mcod")
@@ -208,31 +198,24 @@ class SparqlView(BaseView):
         def _get_data(self, cleaned, *args, **kwargs):
             data = cleaned["data"]["attributes"]
             # https://www.w3.org/TR/2013/REC-sparql11-protocol-20130321/#query-success
-            updated = json.dumps(data)
-            cache_key = hashlib.md5()
-            cache_key.update(updated.encode("utf-8"))
-            cache_key = str(uuid.UUID(cache_key.hexdigest()))
-            cached = cache.get(cache_key)
-            sparql_resp = json.loads(cached) if cached else None
-            if not sparql_resp:
-                sparql_resp = self.make_sparql_request(data)
-                cache.set(
-                    cache_key,
-                    json.dumps(sparql_resp),
-                    timeout=settings.SPARQL_CACHE_TIMEOUT,
-                )
-            result = sparql_resp["page_result"] if "page_result" in sparql_resp else sparql_resp["result"]
+            try:
+                query = SparqlQuery(data["q"], data["format"], data.get("external_sparql_endpoint"))
+                sparql_resp = query.get_page(data.get("page", 1), data.get("per_page", 20))
+            except Exception as exc:
+                logger.debug(exc)
+                raise falcon.HTTPBadRequest(description=_("Bad request"))
+            query.save()
             SparqlResponse = namedtuple(
                 "SparqlResponse",
                 "id result has_previous has_next content_type download_url count",
             )
             return SparqlResponse(
-                id=cache_key,
-                result=result,
+                id=query.token,
+                result=sparql_resp["result"],
                 has_previous=sparql_resp.get("has_previous", False),
                 has_next=sparql_resp.get("has_next", False),
                 content_type=sparql_resp["content_type"],
-                download_url=f"{settings.API_URL}/sparql/{cache_key}",
+                download_url=f"{settings.API_URL}/sparql/{query.token}",
                 count=sparql_resp["count"],
             )
 
@@ -241,43 +224,6 @@ class SparqlView(BaseView):
             meta["count"] = self.response.context.data.count
             return meta
 
-        def make_sparql_request(self, data):
-            query = data["q"]
-            sparql_format = data["format"]
-            return_format = SPARQL_FORMATS[sparql_format]
-            try:
-                store = get_sparql_store(
-                    readonly=True,
-                    return_format=return_format,
-                    external_sparql_endpoint=data.get("external_sparql_endpoint"),
-                )
-                response = store.query(query, initNs=NAMESPACES)
-                _format = "xml" if return_format == "application/rdf+xml" else return_format
-                _format = sparql_format if response.graph else _format
-                result = response.serialize(format=_format, encoding="utf-8")
-                content_type = sparql_format if len(result) else None
-                resp = {
-                    "result": result.decode("utf-8"),
-                    "content_type": content_type,
-                    "count": len(response),
-                }
-                if response.type == "SELECT":
-                    paginator = Paginator(response.bindings, data.get("per_page", 20))
-                    page = paginator.get_page(data.get("page", 1))
-                    response.bindings = page
-                    page_result = response.serialize(format=_format)
-                    resp.update(
-                        {
-                            "page_result": page_result.decode("utf-8"),
-                            "has_previous": page.has_previous(),
-                            "has_next": page.has_next(),
-                        }
-                    )
-                return resp
-            except Exception as exc:
-                logger.debug(exc)
-                raise falcon.HTTPBadRequest(description=_("Bad request"))
-
 
 class SparqlDownloadView(BaseView):
 
@@ -290,14 +236,22 @@ class SparqlDownloadView(BaseView):
         serializer_schema = SparqlResponseSchema
 
         def _get_data(self, cleaned, *args, **kwargs):
-            cached = cache.get(str(kwargs["token"]))
-            data = json.loads(cached) if cached else None
-            if not data:
+            query = SparqlQuery.from_token(str(kwargs["token"]))
+            if not query:
                 raise falcon.HTTPNotFound
-            result = data.get("result")
-            content_type = data.get("content_type")
-            if result:
-                self.response.context.data = result.encode("utf-8")
+            self.response.context.data = None
+            try:
+                if query.is_streamable:
+                    self.response.stream = query.stream_result()
+                    content_type = query.sparql_format
+                else:
+                    data = query.get_result()
+                    if data["result"]:
+                        self.response.context.data = data["result"].encode("utf-8")
+                    content_type = data["content_type"]
+            except Exception as exc:
+                logger.debug(exc)
+                raise falcon.HTTPBadRequest(description=_("Bad request"))
             if content_type:
                 self.response.content_type = content_type
                 ext = self._get_extension_for_content_type(content_type)
@@ -371,6 +371,10 @@ DGA_RESOURCE_CREATION_STAGING_ROOT = str(ROOT_DIR.path(MEDIA_ROOT, "dga_temp"))
 BROKEN_LINKS_CREATION_STAGING_ROOT = str(ROOT_DIR.path(MEDIA_ROOT, "broken_links_temp"))
 MAIN_DGA_RESOURCE_XLSX_CREATION_ROOT = str(ROOT_DIR.path(MEDIA_ROOT, "main_dga"))
 
+# Files served by the API (catalogs, dataset archives) are sent by nginx from the internal location.
+FILE_RESPONSE_X_ACCEL_REDIRECT = env.bool("FILE_RESPONSE_X_ACCEL_REDIRECT", default=False)
+FILE_RESPONSE_X_ACCEL_LOCATIONS = {MEDIA_ROOT: "/protected/media/"}
+
 MEDIA_URL = "/media/"
 ACADEMY_URL = "%s%s" % (MEDIA_URL, "academy")
 MEETINGS_URL = "%s%s" % (MEDIA_URL, "meetings")
@@ -419,6 +423,10 @@ SPARQL_UPDATE_ENDPOINT = f"{FUSEKI_URL}/{FUSEKI_DATASET}/update"
 SPARQL_USER = env("SPARQL_USER", default="admin")
 SPARQL_PASSWORD = env("ADMIN_PASSWORD", default="Britenet.1")
 SPARQL_CACHE_TIMEOUT = env("SPARQL_CACHE_TIMEOUT", default=60)  # in secs.
+SPARQL_STREAM_TIMEOUT = env.int("SPARQL_STREAM_TIMEOUT", default=30)  # in secs.
+SPARQL_UPDATE_QUEUE_ENABLED = env.bool("SPARQL_UPDATE_QUEUE_ENABLED", default=True)
+SPARQL_UPDATE_QUEUE_FLUSH_INTERVAL = env.int("SPARQL_UPDATE_QUEUE_FLUSH_INTERVAL", default=10)  # in secs.
+SPARQL_BATCH_MAX_TRIPLES = env.int("SPARQL_BATCH_MAX_TRIPLES", default=5000)
 REDIS_URL = env("REDIS_URL", default="redis://mcod-redis:6379")
 
 CACHES = {
@@ -769,9 +777,27 @@ ELASTICSEARCH_INDEX_NAMES = OrderedDict(
 )
 
 ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = "mcod.core.api.search.signals.AsyncSignalProcessor"
+ELASTICSEARCH_UPDATE_QUEUE_ENABLED = env.bool("ELASTICSEARCH_UPDATE_QUEUE_ENABLED", default=True)
+ELASTICSEARCH_UPDATE_QUEUE_FLUSH_INTERVAL = env.int("ELASTICSEARCH_UPDATE_QUEUE_FLUSH_INTERVAL", default=10)
 
 ELASTICSEARCH_DSL_INDEX_SETTINGS = {"number_of_shards": 1, "number_of_replicas": 1}
 
+RESOURCE_DATA_PARALLEL_INDEXING = env.bool("RESOURCE_DATA_PARALLEL_INDEXING", True)
+RESOURCE_DATA_INDEXING_THREAD_COUNT = env.int("RESOURCE_DATA_INDEXING_THREAD_COUNT", default=4)
+RESOURCE_DATA_INDEXING_MAX_CHUNK_BYTES = env.int("RESOURCE_DATA_INDEXING_MAX_CHUNK_BYTES", default=10 * 1024 * 1024)
+RESOURCE_DATA_INDEXING_MAX_CHUNK_ROWS = env.int("RESOURCE_DATA_INDEXING_MAX_CHUNK_ROWS", default=20000)
+
+TABULAR_DATA_DESCRIPTOR_CACHE_ALIAS = "default"
+TABULAR_DATA_DESCRIPTOR_CACHE_TIMEOUT = env.int("TABULAR_DATA_DESCRIPTOR_CACHE_TIMEOUT", default=3600)
+TABULAR_DATA_DESCRIPTOR_LOCAL_CACHE_SIZE = env.int("TABULAR_DATA_DESCRIPTOR_LOCAL_CACHE_SIZE", default=256)
+
+RESOURCE_DATA_EXPORT_FORMAT_TO_MIMETYPE = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+RESOURCE_DATA_EXPORT_CHUNK_SIZE = env.int("RESOURCE_DATA_EXPORT_CHUNK_SIZE", default=1000)
+RESOURCE_DATA_EXPORT_SCROLL = env("RESOURCE_DATA_EXPORT_SCROLL", default="5m")
+
 ELASTICSEARCH_DSL_SEARCH_INDEX_SETTINGS = {
     "number_of_shards": 1,
     "number_of_replicas": 1,
@@ -825,10 +851,12 @@ CELERY_TASK_ROUTES = {
     "mcod.core.api.rdf.tasks.delete_graph_task": {"queue": "graphs"},
     "mcod.core.api.rdf.tasks.delete_graph_with_related_update_task": {"queue": "graphs"},
     "mcod.core.api.rdf.tasks.delete_sub_graphs": {"queue": "graphs"},
+    "mcod.core.api.rdf.tasks.flush_graph_update_queue_task": {"queue": "graphs"},
     "mcod.core.api.search.tasks.bulk_delete_documents_task": {"queue": "indexing"},
     "mcod.core.api.search.tasks.delete_document_task": {"queue": "indexing"},
     "mcod.core.api.search.tasks.delete_with_related_task": {"queue": "indexing"},
     "mcod.core.api.search.tasks.delete_related_documents_task": {"queue": "indexing"},
+    "mcod.core.api.search.tasks.flush_update_queue_task": {"queue": "indexing"},
     "mcod.core.api.search.tasks.null_field_in_related_task": {"queue": "indexing"},
     "mcod.core.api.search.tasks.update_document_task": {"queue": "indexing"},
     "mcod.core.api.search.tasks.update_related_task": {"queue": "indexing"},
@@ -843,6 +871,7 @@ CELERY_TASK_ROUTES = {
     "mcod.harvester.tasks.validate_xml_url_task": {"queue": "harvester"},
     "mcod.newsletter.tasks.remove_inactive_subscription": {"queue": "newsletter"},
     "mcod.newsletter.tasks.send_newsletter_mail": {"queue": "newsletter"},
+    "mcod.newsletter.tasks.send_newsletter_mails": {"queue": "newsletter"},
     "mcod.newsletter.tasks.send_subscription_confirm_mail": {"queue": "newsletter"},
     "mcod.reports.tasks.create_daily_resources_report": {"queue": "reports"},
     "mcod.reports.tasks.create_resources_report_task": {"queue": "reports"},
@@ -873,6 +902,7 @@ CELERY_TASK_ROUTES = {
     "mcod.resources.tasks.update_last_day_data_date": {"queue": "resources"},
     "mcod.resources.tasks.update_resource_with_archive_format": {"queue": "resources"},
     "mcod.resources.tasks.validate_link": {"queue": "resources"},
+    "mcod.resources.tasks.validate_links_batch": {"queue": "resources"},
     "mcod.schedules.tasks.send_admin_notification_task": {"queue": "notifications"},
     "mcod.schedules.tasks.update_notifications_task": {"queue": "notifications"},
     "mcod.showcases.tasks.create_showcase_proposal_task": {"queue": "showcases"},
@@ -892,6 +922,7 @@ CELERY_TASK_ROUTES = {
     "mcod.watchers.tasks.update_notifications_status_task": {"queue": "watchers"},
     "mcod.watchers.tasks.update_notifications_task": {"queue": "watchers"},
     "mcod.watchers.tasks.query_watcher_updated_task": {"queue": "watchers"},
+    "mcod.watchers.tasks.send_subscriptions_reports_task": {"queue": "watchers"},
 }
 
 CELERY_SINGLETON_BACKEND_URL = REDIS_URL
@@ -1353,6 +1384,12 @@ COUNTED_MODELS = {
     "resources.Resource": {"status": "published"},
     "cms.NewsPage": {"live": True},
 }
+# views and downloads are sent to redis from the api process in batches, at most every N seconds.
+COUNTERS_BUFFER_FLUSH_INTERVAL = env.float("COUNTERS_BUFFER_FLUSH_INTERVAL", default=5)
+# daily statistics for the dashboards are rebuilt every night and updated every N seconds in the meantime.
+DAILY_STATS_UPDATE_INTERVAL = env.int("DAILY_STATS_UPDATE_INTERVAL", default=600)
+# dashboards dataframes are shared between users until the next update of daily statistics.
+STATS_DATAFRAME_CACHE_TIMEOUT = env.int("STATS_DATAFRAME_CACHE_TIMEOUT", default=24 * 60 * 60)
 SEARCH_PATH = "/search"
 
 JSONAPI_SCHEMA_PATH = str(DATA_DIR.path("jsonapi.config.json"))
@@ -1845,6 +1882,12 @@ WAGTAILADMIN_RICH_TEXT_EDITORS = {
 GEOCODER_URL = env("GEOCODER_URL", default="http://geocoder.mcod.local")
 GEOCODER_USER = env("GEOCODER_USER", default="geouser")
 GEOCODER_PASS = env("GEOCODER_PASS", default="1234")
+GEOCODER_CACHE_ALIAS = "default"
+GEOCODER_CACHE_TIMEOUT = env.int("GEOCODER_CACHE_TIMEOUT", default=30 * 24 * 3600)  # 30 days.
+GEOCODER_NEGATIVE_CACHE_TIMEOUT = env.int("GEOCODER_NEGATIVE_CACHE_TIMEOUT", default=24 * 3600)  # 1 day.
+GEOCODER_MAX_WORKERS = env.int("GEOCODER_MAX_WORKERS", default=8)
+GEOCODER_TIMEOUT = env.int("GEOCODER_TIMEOUT", default=10)  # seconds.
+GEOCODER_BATCH_SIZE = env.int("GEOCODER_BATCH_SIZE", default=1000)
 PLACEHOLDER_URL = env("PLACEHOLDER_URL", default="http://placeholder.mcod.local")
 
 MAX_TAG_LENGTH = 100
@@ -2023,6 +2066,7 @@ CKAN_LICENSES_WHITELIST = {
 }
 
 CSV_CATALOG_BATCH_SIZE = env("CSV_CATALOG_BATCH_SIZE", default=20000)
+CATALOG_METADATA_CHUNK_SIZE = env.int("CATALOG_METADATA_CHUNK_SIZE", default=500)
 
 DISCOURSE_FORUM_ENABLED = env("DISCOURSE_FORUM_ENABLED", default=True)
 
@@ -2057,6 +2101,8 @@ ZABBIX_API = {
 DEFAULT_REGION_ID = 85633723
 
 DATASET_ARCHIVE_FILES_TASK_DELAY = env("DATASET_ARCHIVE_FILES_TASK_DELAY", default=180)
+# files in these formats are already compressed, so they are stored in dataset archives without compression.
+DATASET_ARCHIVE_STORED_EXTENSIONS = ("7z", "docx", "gz", "jpeg", "jpg", "ods", "odt", "png", "pptx", "rar", "xlsx", "zip")
 DATASET_IS_PROMOTED_LIMIT = env("DATASET_IS_PROMOTED_LIMIT", default=5)
 
 ALLOWED_MINIMUM_SPACE = 1024 * 1024 * 1024 * env("ALLOWED_MINIMUM_FREE_GB", default=20)
@@ -2141,3 +2187,29 @@ HEALTH_STATUS_SLEEP_TIME = env.int("HEALTH_STATUS_SLEEP_TIME", default=600)  # d
 HEALTH_CHECK = env.bool("HEALTH_CHECK", default=True)
 
 BROKEN_LINKS_EXCLUDE_DEVELOPERS = env.bool("BROKEN_LINKS_EXCLUDE_DEVELOPERS", True)
+# links of resources are validated in batches, with limited number of concurrent requests (in total and per host).
+LINK_VALIDATION_BATCH_SIZE = env.int("LINK_VALIDATION_BATCH_SIZE", default=2000)
+LINK_VALIDATION_CONCURRENCY = env.int("LINK_VALIDATION_CONCURRENCY", default=50)
+LINK_VALIDATION_HOST_CONCURRENCY = env.int("LINK_VALIDATION_HOST_CONCURRENCY", default=4)
+LINK_VALIDATION_HOST_MAX_ERRORS = env.int("LINK_VALIDATION_HOST_MAX_ERRORS", default=3)
+LINK_VALIDATION_CONNECT_TIMEOUT = env.int("LINK_VALIDATION_CONNECT_TIMEOUT", default=10)
+LINK_VALIDATION_READ_TIMEOUT = env.int("LINK_VALIDATION_READ_TIMEOUT", default=30)
+
+# rows of reports are fetched from the database and written to files in chunks.
+REPORTS_EXPORT_CHUNK_SIZE = env.int("REPORTS_EXPORT_CHUNK_SIZE", default=2000)
+DAILY_RESOURCES_REPORT_COMPRESS = env.bool("DAILY_RESOURCES_REPORT_COMPRESS", default=False)
+
+# saved search queries of watchers are evaluated by multi search requests to Elasticsearch.
+SEARCH_QUERY_WATCHERS_BATCH_SIZE = env.int("SEARCH_QUERY_WATCHERS_BATCH_SIZE", default=100)
+
+# mails of newsletters and subscriptions reports are sent in batches, through one connection per batch.
+NEWSLETTER_MAILS_BATCH_SIZE = env.int("NEWSLETTER_MAILS_BATCH_SIZE", default=200)
+SUBSCRIPTIONS_REPORTS_BATCH_SIZE = env.int("SUBSCRIPTIONS_REPORTS_BATCH_SIZE", default=200)
+
+# audit log entries created in a transaction are saved with one query on commit.
+AUDITLOG_BUFFER_ENABLED = env.bool("AUDITLOG_BUFFER_ENABLED", default=True)
+
+# number of log entries applied at once to the history of availability of resources.
+RESOURCES_AVAILABILITY_BATCH_SIZE = env.int("RESOURCES_AVAILABILITY_BATCH_SIZE", default=10000)
+# minutes - log entries younger than that are applied by the next update (their transactions may be still open).
+RESOURCES_AVAILABILITY_LAG = env.int("RESOURCES_AVAILABILITY_LAG", default=60)
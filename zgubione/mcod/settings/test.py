@@ -23,8 +23,17 @@ ELASTICSEARCH_DSL_INDEX_SETTINGS = {"number_of_shards": 1, "number_of_replicas":
 
 ELASTICSEARCH_HISTORIES_IDX_SETTINGS = {"number_of_shards": 1, "number_of_replicas": 0}
 
+ELASTICSEARCH_UPDATE_QUEUE_ENABLED = False
+SPARQL_UPDATE_QUEUE_ENABLED = False
+COUNTERS_BUFFER_FLUSH_INTERVAL = 0
+AUDITLOG_BUFFER_ENABLED = False  # tests are run in transactions which are never committed.
+
 LANGUAGE_CODE = "pl"
 
+GEOCODER_CACHE_TIMEOUT = 0  # geocoder responses are mocked differently across tests.
+TABULAR_DATA_DESCRIPTOR_CACHE_TIMEOUT = 0  # resource data indexes are created and removed directly in tests.
+STATS_DATAFRAME_CACHE_TIMEOUT = 0  # daily statistics of different test databases share the version key.
+
 
 def get_es_index_names():
     import uuid
@@ -111,6 +120,7 @@ RESOURCES_URL = "%s%s" % (MEDIA_URL, "resources")
 SHOWCASES_URL = "%s%s" % (MEDIA_URL, "showcases")
 
 CELERY_TASK_ALWAYS_EAGER = True
+DATASET_ARCHIVE_FILES_TASK_DELAY = 0  # archives are rebuilt immediately (requests are not debounced).
 CELERY_TASK_DEFAULT_QUEUE = "mcod"
 CELERY_TASK_QUEUES = {
     Queue("test"),
@@ -1,6 +1,8 @@
 import logging
 import time
 from enum import Enum
+from itertools import groupby
+from operator import attrgetter
 from typing import List, Union
 from uuid import uuid4
 
@@ -17,6 +19,7 @@ from django.contrib.auth.signals import user_logged_out
 from django.contrib.postgres.fields import JSONField
 from django.contrib.sessions.backends.cache import KEY_PREFIX
 from django.core.cache import caches
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.core.paginator import Paginator
 from django.db import models, transaction
 from django.db.models import Case, Count, When
@@ -728,6 +731,24 @@ class User(
             html_message=msg_html,
         )
 
+    def _get_subscriptions_report_mail(self, notifications, date_from, connection=None):
+        context = {
+            "notifications": notifications,
+            "date_from": date_from,
+            "base_url": settings.BASE_URL,
+        }
+        with override(self.lang):
+            context["base_url_with_lang"] = f"{settings.BASE_URL}/{self.lang}"
+            mail = EmailMultiAlternatives(
+                str(_("Report of activity of observed objects on the dane.gov.pl portal")),
+                render_to_string("mails/subscriptions-daily.txt", context=context),
+                config.FOLLOWINGS_EMAIL,
+                [self.email],
+                connection=connection,
+            )
+            mail.attach_alternative(render_to_string("mails/subscriptions-daily.html", context=context), "text/html")
+        return mail
+
     def send_subscriptions_report(self, date_from, date_till):
         if self.subscriptions_report_enabled:
             notifications = Notification.objects.filter(
@@ -735,23 +756,32 @@ class User(
             ).order_by("created")
 
             if notifications:
-                context = {
-                    "notifications": notifications,
-                    "date_from": date_from,
-                    "base_url": settings.BASE_URL,
-                }
-                with override(self.lang):
-                    context["base_url_with_lang"] = f"{settings.BASE_URL}/{self.lang}"
-                    msg_plain = render_to_string("mails/subscriptions-daily.txt", context=context)
-                    msg_html = render_to_string("mails/subscriptions-daily.html", context=context)
-
-                    self.send_mail(
-                        _("Report of activity of observed objects on the dane.gov.pl portal"),
-                        msg_plain,
-                        config.FOLLOWINGS_EMAIL,
-                        [self.email],
-                        html_message=msg_html,
-                    )
+                connection = get_connection(settings.EMAIL_BACKEND)
+                self._get_subscriptions_report_mail(notifications, date_from, connection=connection).send()
+
+    @classmethod
+    def send_subscriptions_reports(cls, users_ids, date_from, date_till):
+        """
+        Sends reports of notifications to many users at once - notifications of all the users are fetched
+        by one query and mails are sent through one connection. Returns number of sent mails.
+        """
+        notifications = (
+            Notification.objects.filter(subscription__user_id__in=users_ids, created__gte=date_from, created__lt=date_till)
+            .select_related("subscription__user", "subscription__watcher")
+            .order_by("subscription__user_id", "created")
+        )
+        sent_count = 0
+        with get_connection(settings.EMAIL_BACKEND) as connection:
+            for user_id, user_notifications in groupby(notifications.iterator(), key=attrgetter("subscription.user_id")):
+                user_notifications = list(user_notifications)
+                user = user_notifications[0].subscription.user
+                if not user.subscriptions_report_enabled:
+                    continue
+                try:
+                    sent_count += user._get_subscriptions_report_mail(user_notifications, date_from, connection).send()
+                except Exception as exc:
+                    logger.error(f"Subscriptions report of user {user_id} could not be sent: {exc}")
+        return sent_count
 
     @property
     def has_from_agent_changed(self):
@@ -1,3 +1,4 @@
+from collections import defaultdict
 from operator import itemgetter
 from urllib.parse import parse_qsl, urlsplit, urlunsplit
 
@@ -205,12 +206,33 @@ class ModelWatcherManager(models.Manager):
 
         return False
 
-    def get_from_instance(self, instance):
+    @staticmethod
+    def _get_object_name(instance):
         meta = instance._meta
         _object_name = meta.concrete_model._meta.object_name if meta.proxy else meta.object_name
-        object_name = "{}.{}".format(meta.app_label, _object_name)
+        return "{}.{}".format(meta.app_label, _object_name)
 
-        return self.get(object_name=object_name, object_ident=str(instance.id))
+    def get_from_instance(self, instance):
+        return self.get(object_name=self._get_object_name(instance), object_ident=str(instance.id))
+
+    def get_from_instances(self, instances):
+        """
+        Returns watchers (with prefetched subscriptions) by ids of the instances, or None for instances without watcher.
+        Instances with more than one watcher are omitted.
+        """
+        watchers = defaultdict(list)
+        queryset = self.filter(
+            object_name__in={self._get_object_name(instance) for instance in instances},
+            object_ident__in=[str(instance.id) for instance in instances],
+        )
+        for watcher in queryset.prefetch_related("subscriptions"):
+            watchers[(watcher.object_name, watcher.object_ident)].append(watcher)
+        result = {}
+        for instance in instances:
+            instance_watchers = watchers.get((self._get_object_name(instance), str(instance.id)), [])
+            if len(instance_watchers) < 2:
+                result[instance.id] = instance_watchers[0] if instance_watchers else None
+        return result
 
     def get_or_create_from_instance(self, instance):
         created = False
@@ -254,24 +276,35 @@ class SearchQueryWatcherManager(models.Manager):
 
         return _headers
 
+    @staticmethod
+    def _get_request_headers(watcher):
+        _headers = watcher.customfields.get("headers") or {}
+        return {
+            "User-Agent": "mcod-internal",
+            "Accept-Language": _headers.get("lang") or settings.LANGUAGE_CODE,
+            "X-API-VERSION": _headers.get("api_version") or str(CURRENT_VERSION),
+        }
+
+    def _fetch_ref_value(self, watcher):
+        int_url, ext_url = urlsplit(settings.API_URL_INTERNAL), urlsplit(watcher.object_ident)
+        ext_url = ext_url._replace(scheme=int_url.scheme)._replace(netloc=int_url.netloc)
+        _url = urlunsplit(ext_url)
+        response = requests.get(_url, headers=self._get_request_headers(watcher), verify=False, timeout=(3.0, 5.0))
+        if response.status_code != 200:
+            return None
+        return dpath.util.get(response.json(), watcher.ref_field)
+
     def reload(self):
-        query = self.filter(object_name="query", is_active=True, ref_field__isnull=False)
-        for watcher in query:
-            int_url, ext_url = urlsplit(settings.API_URL_INTERNAL), urlsplit(watcher.object_ident)
-            ext_url = ext_url._replace(scheme=int_url.scheme)._replace(netloc=int_url.netloc)
-            _url = urlunsplit(ext_url)
-            _headers = watcher.customfields.get("headers") or {}
-            headers = {
-                "User-Agent": "mcod-internal",
-                "Accept-Language": _headers.get("lang") or settings.LANGUAGE_CODE,
-                "X-API-VERSION": _headers.get("api_version") or str(CURRENT_VERSION),
-            }
-            response = requests.get(_url, headers=headers, verify=False, timeout=(3.0, 5.0))
-            if response.status_code != 200:
-                continue
+        from mcod.watchers.query_evaluation import evaluate_query_watchers
 
+        query = list(self.filter(object_name="query", is_active=True, ref_field__isnull=False))
+        # watchers of searches which can't be evaluated directly in Elasticsearch are checked by the API.
+        counts = evaluate_query_watchers(query)
+        for watcher in query:
             try:
-                field_value = dpath.util.get(response.json(), watcher.ref_field)
+                field_value = counts[watcher.id] if watcher.id in counts else self._fetch_ref_value(watcher)
+                if field_value is None:
+                    continue
                 new_value = int(field_value)
                 old_value = int(watcher.ref_value)
 
@@ -280,7 +313,7 @@ class SearchQueryWatcherManager(models.Manager):
                     SearchQueryWatcher.objects.update_from_url(
                         watcher.object_ident,
                         new_value,
-                        headers=headers,
+                        headers=self._get_request_headers(watcher),
                         obj_state=obj_state,
                         notify_subscribers=True,
                     )
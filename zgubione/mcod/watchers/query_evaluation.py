@@ -0,0 +1,166 @@
+"""
+Evaluation of search query watchers directly in Elasticsearch.
+
+URL of the watched search is resolved to the search view of the API and translated into the Elasticsearch
+query by the deserializer of the view, the same way as when the API handles the request. The query is built
+once and stored in the watcher's customfields. Watchers of identical queries (e.g. differing only in page
+or sorting) are evaluated once - queries are sent in batches of `SEARCH_QUERY_WATCHERS_BATCH_SIZE`
+by multi search requests with `size=0`, as only the number of results is compared.
+"""
+
+import json
+import logging
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import falcon
+from django.apps import apps
+from django.conf import settings
+from django.utils import translation
+from elasticsearch import TransportError
+from elasticsearch_dsl import MultiSearch, Search
+from falcon.routing import CompiledRouter
+from falcon.testing import create_environ
+from marshmallow import ValidationError
+
+from mcod.core.api.converters import (
+    DataExportFormatConverter,
+    ExportFormatConverter,
+    RDFFormatConverter,
+)
+from mcod.core.api.handlers import SubscriptionSearchHdlr
+from mcod.core.versioning import VERSIONS
+
+logger = logging.getLogger("mcod")
+
+CURRENT_VERSION = max(VERSIONS)
+# increase to rebuild stored queries after changes of the search deserializers.
+QUERY_VERSION = 1
+# parts of the search request affecting the number of results.
+COUNTED_QUERY_PARTS = ("query", "post_filter", "min_score")
+
+
+class UnsupportedQuery(Exception):
+    pass
+
+
+@lru_cache()
+def _get_router() -> CompiledRouter:
+    from mcod.routes import routes
+
+    router = CompiledRouter()
+    router.options.converters["export_format"] = ExportFormatConverter
+    router.options.converters["rdf_format"] = RDFFormatConverter
+    router.options.converters["data_export_format"] = DataExportFormatConverter
+    for route in routes:
+        suffix = route[2] if len(route) > 2 else None
+        router.add_route(*route[:2], suffix=suffix)
+    return router
+
+
+def build_query(url: str, headers: Optional[dict] = None) -> dict:
+    """
+    Returns the Elasticsearch query (index and body) counting results of the search at `url`. `body` is None
+    if the API would reject the request. Raises UnsupportedQuery if `url` is not a public search of the API.
+    """
+    headers = headers or {}
+    url_split = urlsplit(url)
+    path = url_split.path.rstrip("/") or "/"
+    found = _get_router().find(path)
+    if not found:
+        raise UnsupportedQuery(f"{path} is not a path of the API")
+    view, method_map, params, _ = found
+    handler_class = getattr(view, "GET", None)
+    is_search = isinstance(handler_class, type) and issubclass(handler_class, SubscriptionSearchHdlr)
+    if not is_search or method_map.get("GET") != getattr(view, "on_get", None):
+        raise UnsupportedQuery(f"{path} is not a search of the API")
+
+    api_version = params.pop("api_version", None) or headers.get("api_version") or str(CURRENT_VERSION)
+    environ = create_environ(path=path, query_string=url_split.query, headers={"X-API-VERSION": api_version})
+    request, response = falcon.Request(environ), falcon.Response()
+    request.api_version = api_version
+    request.language = (request.params.get("lang") or headers.get("lang") or settings.LANGUAGE_CODE).lower()
+    query = {"version": QUERY_VERSION, "index": None, "body": None}
+    with translation.override(request.language):
+        handler = handler_class(request, response)
+        try:
+            request.context.cleaned_data = handler.clean(**params)
+        except (falcon.HTTPError, ValidationError):
+            return query
+        search = handler._get_queryset(request.context.cleaned_data, **params)
+
+    body = {key: value for key, value in search.to_dict().items() if key in COUNTED_QUERY_PARTS}
+    query.update(index=",".join(search._index or []), body={**body, "size": 0})
+    return query
+
+
+def count_queries(queries: List[dict]) -> List[Optional[int]]:
+    """Returns numbers of results of the queries (None if the query failed), sending them in batches."""
+    counts = []
+    batch_size = settings.SEARCH_QUERY_WATCHERS_BATCH_SIZE
+    for start in range(0, len(queries), batch_size):
+        batch = queries[start : start + batch_size]
+        multi_search = MultiSearch()
+        for query in batch:
+            multi_search = multi_search.add(Search(index=query["index"]).update_from_dict(query["body"]))
+        try:
+            responses = multi_search.execute(raise_on_error=False)
+        except TransportError as exc:
+            logger.error(f"Search query watchers could not be evaluated: {exc}")
+            counts.extend([None] * len(batch))
+            continue
+        counts.extend(_get_total(response) if response is not None else None for response in responses)
+    return counts
+
+
+def _get_total(response) -> int:
+    total = response.hits.total
+    return total if isinstance(total, int) else total["value"]
+
+
+def _build_watcher_query(watcher) -> Optional[dict]:
+    """Builds and sets query of the watcher. None means that the watcher must be evaluated by the API."""
+    try:
+        query = build_query(watcher.object_ident, watcher.customfields.get("headers"))
+    except UnsupportedQuery:
+        return None
+    except Exception:
+        # failure of a single watcher mustn't stop evaluation of the others.
+        logger.exception(f"Query of watcher {watcher.id} could not be built, it will be evaluated by the API.")
+        return None
+    watcher.customfields = {**watcher.customfields, "query": query}
+    return query
+
+
+def evaluate_query_watchers(watchers: Iterable) -> Dict[int, Optional[int]]:
+    """
+    Returns current numbers of results by ids of the watchers (None if the query is invalid or failed).
+    Watchers which can't be evaluated directly in Elasticsearch are omitted.
+    """
+    Watcher = apps.get_model("watchers", "Watcher")
+    watchers_by_query = defaultdict(list)
+    queries = {}
+    changed = []
+    for watcher in watchers:
+        if watcher.ref_field != "/meta/count":
+            continue
+        watcher.customfields = watcher.customfields or {}
+        query = watcher.customfields.get("query")
+        if not query or query.get("version") != QUERY_VERSION:
+            query = _build_watcher_query(watcher)
+            if query is None:
+                continue
+            changed.append(watcher)
+        key = json.dumps({"index": query["index"], "body": query["body"]}, sort_keys=True)
+        watchers_by_query[key].append(watcher.id)
+        queries[key] = query
+
+    if changed:
+        Watcher.objects.bulk_update(changed, ["customfields"], batch_size=settings.SEARCH_QUERY_WATCHERS_BATCH_SIZE)
+
+    valid_keys = [key for key, query in queries.items() if query["body"] is not None]
+    counts = dict(zip(valid_keys, count_queries([queries[key] for key in valid_keys])))
+    logger.debug(f"{len(queries)} distinct queries of {sum(map(len, watchers_by_query.values()))} watchers evaluated.")
+    return {watcher_id: counts.get(key) for key, ids in watchers_by_query.items() for watcher_id in ids}
@@ -2,7 +2,9 @@ from datetime import date
 
 import pytz
 from django.apps import apps
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.utils.dateparse import parse_datetime
 from django.utils.timezone import datetime, timedelta
 
 from mcod.core.tasks import extended_shared_task
@@ -116,9 +118,32 @@ def query_watcher_updated_task(watcher_id, notification_type, prev_value):
 
 @extended_shared_task
 def send_report_from_subscriptions():
-    User = get_user_model()
+    Notification = apps.get_model("watchers", "Notification")
+    if not settings.ENABLE_SUBSCRIPTIONS_EMAIL_REPORTS:
+        return {}
     date_till = datetime.combine(date.today(), datetime.min.time()).replace(tzinfo=pytz.utc)
     date_from = date_till - timedelta(days=1)
-    for user in User.objects.filter(state="active"):
-        user.send_subscriptions_report(date_from, date_till)
-    return {}
+    users_ids = list(
+        Notification.objects.filter(
+            created__gte=date_from,
+            created__lt=date_till,
+            subscription__user__state="active",
+            subscription__user__subscriptions_report_opt_in__isnull=False,
+        )
+        .order_by("subscription__user_id")
+        .values_list("subscription__user_id", flat=True)
+        .distinct()
+    )
+    batch_size = settings.SUBSCRIPTIONS_REPORTS_BATCH_SIZE
+    for start in range(0, len(users_ids), batch_size):
+        send_subscriptions_reports_task.s(
+            users_ids[start : start + batch_size], date_from.isoformat(), date_till.isoformat()
+        ).apply_async()
+    return {"users": len(users_ids)}
+
+
+@extended_shared_task
+def send_subscriptions_reports_task(users_ids, date_from, date_till):
+    User = get_user_model()
+    sent_count = User.send_subscriptions_reports(users_ids, parse_datetime(date_from), parse_datetime(date_till))
+    return {"sent": sent_count}
@@ -96,3 +96,20 @@ Feature: Query Watcher
     And api's response body field /data/0/attributes/ref_value is 1
     And api's response body field /data/0/relationships/subscribed_object/data/id is /search?advanced=all&model[terms]=dataset&page=1&per_page=20&q=creative&sort=relevance
     And api's response body field /data/0/relationships/subscribed_object/data/type is query
+
+  Scenario: query watchers of the same search are evaluated once directly in elasticsearch
+    Given logged active user
+    And dataset created with params {"id": 2114, "title": "Creative Name"}
+    And dataset created with params {"id": 2115, "title": "Creative Title"}
+
+    And query subscription with id 998 for url /datasets?q=creative&page=1&per_page=20&sort=title with 2 results
+    And query subscription with id 999 for url /datasets?q=creative&page=2&per_page=5&sort=-title with 2 results
+
+    When set status to draft on dataset with id 2114
+    And trigger query watcher update evaluating 1 queries without api requests
+
+    Then api request path is /auth/notifications
+    And send api request and fetch the response
+    And api's response body field /meta/count is 2
+    And api's response body field /data/0/attributes/notification_type is result_count_decresed
+    And api's response body field /data/0/attributes/ref_value is 1
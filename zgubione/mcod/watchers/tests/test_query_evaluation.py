@@ -0,0 +1,12 @@
+from mcod.watchers import query_evaluation
+from mcod.watchers.factories import SearchQueryWatcherFactory
+
+
+def test_watcher_is_left_for_the_api_if_its_query_cannot_be_built(mocker):
+    watcher = SearchQueryWatcherFactory.build(id=1, object_ident="http://api.test/datasets?q=a", ref_field="/meta/count")
+    mocker.patch.object(query_evaluation, "build_query", side_effect=AttributeError)
+    count_queries = mocker.patch.object(query_evaluation, "count_queries", return_value=[])
+
+    assert query_evaluation.evaluate_query_watchers([watcher]) == {}
+    assert "query" not in watcher.customfields
+    count_queries.assert_called_once_with([])
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.utils import timezone
+
+from mcod.users.factories import UserFactory
+from mcod.watchers.factories import SearchQueryWatcherFactory
+from mcod.watchers.models import Notification, Subscription
+from mcod.watchers.tasks import send_report_from_subscriptions
+
+
+def create_notification(user, created):
+    watcher = SearchQueryWatcherFactory.create(object_name="query", ref_field="/meta/count", ref_value=1)
+    subscription = Subscription.objects.create(user=user, watcher=watcher, name=f"query-{user.id}")
+    return Notification.objects.create(
+        subscription=subscription,
+        notification_type="result_count_incresed",
+        status="new",
+        ref_value=1,
+        created=created,
+    )
+
+
+@pytest.mark.django_db
+def test_send_report_from_subscriptions_in_batches(mocker, settings):
+    settings.SUBSCRIPTIONS_REPORTS_BATCH_SIZE = 2
+    yesterday = timezone.now() - timedelta(days=1)
+    users = UserFactory.create_batch(3, state="active", subscriptions_report_opt_in=timezone.now())
+    opted_out_user = UserFactory.create(state="active", subscriptions_report_opt_in=None)
+    for user in [*users, opted_out_user]:
+        create_notification(user, yesterday)
+    create_notification(users[0], yesterday - timedelta(days=1))
+    send_reports = mocker.patch("mcod.watchers.tasks.send_subscriptions_reports_task.s")
+
+    result = send_report_from_subscriptions()
+
+    assert result == {"users": 3}
+    assert [call.args[0] for call in send_reports.call_args_list] == [[users[0].id, users[1].id], [users[2].id]]
+
+
+@pytest.mark.django_db
+def test_send_subscriptions_reports(django_assert_max_num_queries):
+    yesterday = timezone.now() - timedelta(days=1)
+    users = UserFactory.create_batch(2, state="active", subscriptions_report_opt_in=timezone.now())
+    for user in users:
+        create_notification(user, yesterday)
+
+    with django_assert_max_num_queries(2):
+        sent_count = users[0].send_subscriptions_reports(
+            [user.id for user in users], yesterday - timedelta(hours=1), timezone.now()
+        )
+
+    assert sent_count == 2
+    assert sorted(message.to[0] for message in mail.outbox) == sorted(user.email for user in users)